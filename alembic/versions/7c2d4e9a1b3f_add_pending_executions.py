@@ -0,0 +1,45 @@
+"""add pending executions for judge0 callback mode
+
+Revision ID: 7c2d4e9a1b3f
+Revises: 35fca2916818
+Create Date: 2026-10-17 09:12:41.204113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d4e9a1b3f'
+down_revision: Union[str, None] = '35fca2916818'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pending_executions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('grading_run_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('io_test_case_id', sa.Integer(), nullable=True),
+    sa.Column('token', sa.String(length=64), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint("kind IN ('io', 'unit')", name='ck_pending_executions_kind'),
+    sa.ForeignKeyConstraint(['grading_run_id'], ['grading_runs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['io_test_case_id'], ['io_test_cases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('grading_run_id', 'position', name='uq_pending_executions_run_position')
+    )
+    op.create_index(op.f('ix_pending_executions_grading_run_id'), 'pending_executions', ['grading_run_id'], unique=False)
+    op.create_index(op.f('ix_pending_executions_token'), 'pending_executions', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pending_executions_token'), table_name='pending_executions')
+    op.drop_index(op.f('ix_pending_executions_grading_run_id'), table_name='pending_executions')
+    op.drop_table('pending_executions')
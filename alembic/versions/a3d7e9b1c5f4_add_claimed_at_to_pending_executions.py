@@ -0,0 +1,25 @@
+"""add claimed_at (poller lease) to pending_executions
+
+Revision ID: a3d7e9b1c5f4
+Revises: f1c8a3e6d9b2
+Create Date: 2026-10-20 11:02:17.554093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7e9b1c5f4'
+down_revision: Union[str, None] = 'f1c8a3e6d9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('pending_executions', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pending_executions', 'claimed_at')
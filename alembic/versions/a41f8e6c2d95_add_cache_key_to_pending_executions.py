@@ -0,0 +1,26 @@
+"""add cache key to pending executions
+
+Revision ID: a41f8e6c2d95
+Revises: 7c2d4e9a1b3f
+Create Date: 2026-10-17 10:03:18.552907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f8e6c2d95'
+down_revision: Union[str, None] = '7c2d4e9a1b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('pending_executions', sa.Column('cache_key', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pending_executions', 'cache_key')
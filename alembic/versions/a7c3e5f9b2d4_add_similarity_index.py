@@ -0,0 +1,77 @@
+"""add similarity index (minhash fingerprints, lsh buckets, candidate pairs)
+
+Revision ID: a7c3e5f9b2d4
+Revises: f4b7d1e8a6c2
+Create Date: 2026-10-17 17:32:08.671245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f9b2d4'
+down_revision: Union[str, None] = 'f4b7d1e8a6c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('submission_fingerprints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('signature', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('shingle_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('submission_id')
+    )
+    op.create_index(op.f('ix_submission_fingerprints_assignment_id'), 'submission_fingerprints', ['assignment_id'], unique=False)
+
+    op.create_table('similarity_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('band', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.String(length=16), nullable=False),
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_similarity_buckets_lookup', 'similarity_buckets', ['assignment_id', 'band', 'bucket'], unique=False)
+    op.create_index(op.f('ix_similarity_buckets_submission_id'), 'similarity_buckets', ['submission_id'], unique=False)
+
+    op.create_table('similarity_pairs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('submission_a_id', sa.Integer(), nullable=False),
+    sa.Column('submission_b_id', sa.Integer(), nullable=False),
+    sa.Column('similarity', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('submission_a_id < submission_b_id', name='ck_similarity_pairs_order'),
+    sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_a_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_b_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('submission_a_id', 'submission_b_id', name='uq_similarity_pairs_submissions')
+    )
+    op.create_index(op.f('ix_similarity_pairs_assignment_id'), 'similarity_pairs', ['assignment_id'], unique=False)
+    op.create_index(op.f('ix_similarity_pairs_submission_b_id'), 'similarity_pairs', ['submission_b_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_similarity_pairs_submission_b_id'), table_name='similarity_pairs')
+    op.drop_index(op.f('ix_similarity_pairs_assignment_id'), table_name='similarity_pairs')
+    op.drop_table('similarity_pairs')
+    op.drop_index(op.f('ix_similarity_buckets_submission_id'), table_name='similarity_buckets')
+    op.drop_index('ix_similarity_buckets_lookup', table_name='similarity_buckets')
+    op.drop_table('similarity_buckets')
+    op.drop_index(op.f('ix_submission_fingerprints_assignment_id'), table_name='submission_fingerprints')
+    op.drop_table('submission_fingerprints')
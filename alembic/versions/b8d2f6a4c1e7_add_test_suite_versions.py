@@ -0,0 +1,40 @@
+"""add test suite versions for incremental regrade
+
+Revision ID: b8d2f6a4c1e7
+Revises: a7c3e5f9b2d4
+Create Date: 2026-10-17 18:47:55.302816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f6a4c1e7'
+down_revision: Union[str, None] = 'a7c3e5f9b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'io_test_cases',
+        sa.Column('input_version', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.add_column(
+        'unit_test_specs',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.add_column('grading_runs', sa.Column('grading_version', sa.Integer(), nullable=True))
+    op.add_column('grading_runs', sa.Column('unit_spec_version', sa.Integer(), nullable=True))
+    op.add_column('test_case_results', sa.Column('input_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_case_results', 'input_version')
+    op.drop_column('grading_runs', 'unit_spec_version')
+    op.drop_column('grading_runs', 'grading_version')
+    op.drop_column('unit_test_specs', 'version')
+    op.drop_column('io_test_cases', 'input_version')
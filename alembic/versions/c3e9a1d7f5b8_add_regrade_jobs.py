@@ -0,0 +1,54 @@
+"""add regrade jobs
+
+Revision ID: c3e9a1d7f5b8
+Revises: b8d2f6a4c1e7
+Create Date: 2026-10-17 20:11:26.448307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e9a1d7f5b8'
+down_revision: Union[str, None] = 'b8d2f6a4c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('regrade_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('full', sa.Boolean(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('cursor', sa.Integer(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint("scope IN ('all', 'latest')", name='ck_regrade_jobs_scope'),
+    sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_regrade_jobs_assignment_id'), 'regrade_jobs', ['assignment_id'], unique=False)
+    op.create_index(
+        'uq_regrade_jobs_active_assignment',
+        'regrade_jobs',
+        ['assignment_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_regrade_jobs_active_assignment', table_name='regrade_jobs')
+    op.drop_index(op.f('ix_regrade_jobs_assignment_id'), table_name='regrade_jobs')
+    op.drop_table('regrade_jobs')
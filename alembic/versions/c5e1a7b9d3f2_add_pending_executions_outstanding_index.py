@@ -0,0 +1,32 @@
+"""add pending executions outstanding index
+
+Revision ID: c5e1a7b9d3f2
+Revises: a41f8e6c2d95
+Create Date: 2026-10-17 11:20:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a7b9d3f2'
+down_revision: Union[str, None] = 'a41f8e6c2d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_pending_executions_outstanding',
+        'pending_executions',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('completed_at IS NULL AND token IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_executions_outstanding', table_name='pending_executions')
@@ -0,0 +1,148 @@
+"""add content-addressed code blobs for submission source
+
+Existing submissions are moved into code_blobs in batches of BATCH_SIZE
+rows (keyset by id), one distinct blob per SHA-256, then
+submissions.code_text is dropped. The space of the dropped column is only
+returned to the OS by a VACUUM FULL (or pg_repack) of submissions.
+
+Revision ID: d6a2f8c4e1b9
+Revises: c3e9a1d7f5b8
+Create Date: 2026-10-17 21:48:53.207614
+
+"""
+import hashlib
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a2f8c4e1b9'
+down_revision: Union[str, None] = 'c3e9a1d7f5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+code_blobs = sa.table(
+    'code_blobs',
+    sa.column('sha256', sa.String),
+    sa.column('encoding', sa.String),
+    sa.column('data', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+)
+
+
+def _encode(raw: bytes):
+    # Same policy as app.services.code_storage.encode
+    compression = os.getenv('CODE_BLOB_COMPRESSION', 'zstd')
+    min_bytes = int(os.getenv('CODE_BLOB_COMPRESSION_MIN_BYTES', '512'))
+    if compression == 'zstd' and zstandard is not None and len(raw) >= min_bytes:
+        level = int(os.getenv('CODE_BLOB_ZSTD_LEVEL', '3'))
+        packed = zstandard.ZstdCompressor(level=level).compress(raw)
+        if len(packed) < len(raw):
+            return 'zstd', packed
+    return 'plain', raw
+
+
+def _decode(encoding: str, data: bytes, size: int) -> str:
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size).decode('utf-8')
+    return bytes(data).decode('utf-8')
+
+
+def upgrade() -> None:
+    op.create_table('code_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('encoding', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("encoding IN ('plain', 'zstd')", name='ck_code_blobs_encoding'),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.add_column('submissions', sa.Column('code_sha256', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                'SELECT id, code_text FROM submissions WHERE id > :last_id ORDER BY id LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        blobs = {}
+        updates = []
+        for row in rows:
+            raw = row.code_text.encode('utf-8')
+            sha = hashlib.sha256(raw).hexdigest()
+            if sha not in blobs:
+                encoding, data = _encode(raw)
+                blobs[sha] = {'sha256': sha, 'encoding': encoding, 'data': data, 'size': len(raw)}
+            updates.append({'row_id': row.id, 'sha': sha})
+
+        conn.execute(
+            postgresql.insert(code_blobs).on_conflict_do_nothing(index_elements=['sha256']),
+            list(blobs.values()),
+        )
+        conn.execute(
+            sa.text('UPDATE submissions SET code_sha256 = :sha WHERE id = :row_id'),
+            updates,
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('submissions', 'code_sha256', existing_type=sa.String(length=64), nullable=False)
+    op.create_foreign_key('submissions_code_sha256_fkey', 'submissions', 'code_blobs', ['code_sha256'], ['sha256'])
+    op.create_index(op.f('ix_submissions_code_sha256'), 'submissions', ['code_sha256'], unique=False)
+    op.drop_column('submissions', 'code_text')
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    # Check before touching the schema: zstd blobs cannot be restored
+    # into code_text without the zstandard package
+    if zstandard is None and conn.execute(
+        sa.text("SELECT 1 FROM code_blobs WHERE encoding = 'zstd' LIMIT 1")
+    ).first() is not None:
+        raise RuntimeError(
+            'code_blobs holds zstd-compressed rows but the zstandard package is not '
+            'installed; install it (pip install zstandard) before downgrading'
+        )
+
+    op.add_column('submissions', sa.Column('code_text', sa.Text(), nullable=True))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                'SELECT s.id, b.encoding, b.data, b.size FROM submissions s '
+                'JOIN code_blobs b ON b.sha256 = s.code_sha256 '
+                'WHERE s.id > :last_id ORDER BY s.id LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        conn.execute(
+            sa.text('UPDATE submissions SET code_text = :code_text WHERE id = :row_id'),
+            [{'row_id': row.id, 'code_text': _decode(row.encoding, row.data, row.size)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('submissions', 'code_text', existing_type=sa.Text(), nullable=False)
+    op.drop_index(op.f('ix_submissions_code_sha256'), table_name='submissions')
+    op.drop_constraint('submissions_code_sha256_fkey', 'submissions', type_='foreignkey')
+    op.drop_column('submissions', 'code_sha256')
+    op.drop_table('code_blobs')
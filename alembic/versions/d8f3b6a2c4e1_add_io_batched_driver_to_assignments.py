@@ -0,0 +1,29 @@
+"""add io batched driver to assignments
+
+Revision ID: d8f3b6a2c4e1
+Revises: c5e1a7b9d3f2
+Create Date: 2026-10-17 12:05:12.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b6a2c4e1'
+down_revision: Union[str, None] = 'c5e1a7b9d3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'assignments',
+        sa.Column('io_batched_driver', sa.Boolean(), server_default='false', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('assignments', 'io_batched_driver')
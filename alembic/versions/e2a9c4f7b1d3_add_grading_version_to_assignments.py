@@ -0,0 +1,29 @@
+"""add grading version to assignments
+
+Revision ID: e2a9c4f7b1d3
+Revises: d8f3b6a2c4e1
+Create Date: 2026-10-17 14:21:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c4f7b1d3'
+down_revision: Union[str, None] = 'd8f3b6a2c4e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'assignments',
+        sa.Column('grading_version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('assignments', 'grading_version')
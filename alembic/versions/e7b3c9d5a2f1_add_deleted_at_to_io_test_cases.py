@@ -0,0 +1,25 @@
+"""add deleted_at to io_test_cases (soft delete)
+
+Revision ID: e7b3c9d5a2f1
+Revises: d6a2f8c4e1b9
+Create Date: 2026-10-18 10:14:37.519824
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9d5a2f1'
+down_revision: Union[str, None] = 'd6a2f8c4e1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('io_test_cases', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('io_test_cases', 'deleted_at')
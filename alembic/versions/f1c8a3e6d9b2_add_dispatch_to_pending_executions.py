@@ -0,0 +1,30 @@
+"""add dispatched cases, driver delimiter and limits to pending_executions
+
+Revision ID: f1c8a3e6d9b2
+Revises: e7b3c9d5a2f1
+Create Date: 2026-10-19 09:26:41.308517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8a3e6d9b2'
+down_revision: Union[str, None] = 'e7b3c9d5a2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('pending_executions', sa.Column('cases', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('pending_executions', sa.Column('driver_delimiter', sa.String(length=64), nullable=True))
+    op.add_column('pending_executions', sa.Column('limits', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pending_executions', 'limits')
+    op.drop_column('pending_executions', 'driver_delimiter')
+    op.drop_column('pending_executions', 'cases')
@@ -0,0 +1,29 @@
+"""add hard gate to static rules
+
+Revision ID: f4b7d1e8a6c2
+Revises: e2a9c4f7b1d3
+Create Date: 2026-10-17 16:05:12.540931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7d1e8a6c2'
+down_revision: Union[str, None] = 'e2a9c4f7b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'static_rules',
+        sa.Column('hard_gate', sa.Boolean(), server_default='false', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('static_rules', 'hard_gate')
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,10 +14,18 @@ celery_app = Celery(
     backend=CELERY_RESULT_BACKEND,
     include=[
         "app.tasks.grading",
+        "app.tasks.poller",
+        "app.tasks.regrade",
+        "app.tasks.similarity",
     ],
 )
 
+# Bulk regrades run on their own queue (and worker) so fresh submissions
+# never wait behind them
+REGRADE_QUEUE = os.getenv("REGRADE_QUEUE", "regrade")
+
 celery_app.conf.update(
+    task_routes={"app.tasks.regrade.*": {"queue": REGRADE_QUEUE}},
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
@@ -24,3 +33,32 @@ celery_app.conf.update(
     enable_utc=False,
     task_track_started=True,
 )
+
+# GRADING_MODE=poller: centralized Judge0 token polling, scheduled only in
+# that mode. Ticks expire instead of piling up when workers are busy.
+if os.getenv("GRADING_MODE", "inline") == "poller":
+    _POLLER_INTERVAL = float(os.getenv("JUDGE0_POLLER_INTERVAL_SECONDS", "1"))
+    celery_app.conf.beat_schedule = {
+        "poll-pending-executions": {
+            "task": "app.tasks.poller.poll_pending_executions",
+            "schedule": _POLLER_INTERVAL,
+            "options": {"expires": max(1.0, _POLLER_INTERVAL)},
+        },
+    }
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    # Per-process resources must be created after fork, never inherited
+    from app.services import judge0_client
+
+    judge0_client.init_client()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    from app.services import execution_backend, judge0_client, static_analysis
+
+    execution_backend.close_backend()
+    judge0_client.close_client()
+    static_analysis.close_pool()
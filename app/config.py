@@ -126,16 +126,139 @@ class Settings(BaseSettings):
     celery_result_backend: Optional[str] = Field(default=None, alias="CELERY_RESULT_BACKEND")
 
     # Judge0
-    judge0_base_url: str = Field(..., alias="JUDGE0_BASE_URL")
+    judge0_base_url: Optional[str] = Field(default=None, alias="JUDGE0_BASE_URL")
     judge0_api_key: str | None = Field(default=None, alias="JUDGE0_API_KEY")
     judge0_rapidapi_host: str | None = Field(default=None, alias="JUDGE0_RAPIDAPI_HOST")
 
+    # Several self-hosted instances: "http://a:2358|3,http://b:2358|1" (url|weight).
+    # Takes precedence over JUDGE0_BASE_URL.
+    judge0_endpoints: Optional[str] = Field(default=None, alias="JUDGE0_ENDPOINTS")
+    judge0_probe_interval_seconds: float = Field(default=10.0, alias="JUDGE0_PROBE_INTERVAL_SECONDS")
+    judge0_probe_timeout_seconds: float = Field(default=2.0, alias="JUDGE0_PROBE_TIMEOUT_SECONDS")
+    judge0_eject_after_failures: int = Field(default=3, alias="JUDGE0_EJECT_AFTER_FAILURES")
+    judge0_eject_seconds: float = Field(default=30.0, alias="JUDGE0_EJECT_SECONDS")
+
     judge0_language_id: int = Field(default=71, alias="JUDGE0_LANGUAGE_ID")
 
     judge0_poll_timeout_seconds: int = Field(default=15, alias="JUDGE0_POLL_TIMEOUT_SECONDS")
     judge0_poll_interval_seconds: float = Field(default=0.8, alias="JUDGE0_POLL_INTERVAL_SECONDS")
     judge0_poll_max_interval_seconds: float = Field(default=2.0, alias="JUDGE0_POLL_MAX_INTERVAL_SECONDS")
 
+    # Per-execution limits sent with every submission (from the assignment's
+    # max_runtime_ms / max_memory_kb, clamped to the Judge0 server maximums);
+    # the poll deadline is the wall limit plus a grace period for queueing
+    judge0_wall_time_factor: float = Field(default=2.0, alias="JUDGE0_WALL_TIME_FACTOR")
+    judge0_max_cpu_time_limit: float = Field(default=15.0, alias="JUDGE0_MAX_CPU_TIME_LIMIT")
+    judge0_max_wall_time_limit: float = Field(default=20.0, alias="JUDGE0_MAX_WALL_TIME_LIMIT")
+    judge0_max_memory_limit: int = Field(default=512000, alias="JUDGE0_MAX_MEMORY_LIMIT")
+    judge0_max_output_kb: int = Field(default=1024, alias="JUDGE0_MAX_OUTPUT_KB")
+    judge0_poll_grace_seconds: float = Field(default=10.0, alias="JUDGE0_POLL_GRACE_SECONDS")
+
+    judge0_batch_enabled: bool = Field(default=True, alias="JUDGE0_BATCH_ENABLED")
+    judge0_batch_max_size: int = Field(default=20, alias="JUDGE0_BATCH_MAX_SIZE")
+    judge0_max_concurrency: int = Field(default=10, alias="JUDGE0_MAX_CONCURRENCY")
+
+    # Judge0 HTTP session (one pooled client per worker process)
+    judge0_http2: bool = Field(default=False, alias="JUDGE0_HTTP2")
+    judge0_pool_max_connections: int = Field(default=20, alias="JUDGE0_POOL_MAX_CONNECTIONS")
+    judge0_pool_max_keepalive: int = Field(default=10, alias="JUDGE0_POOL_MAX_KEEPALIVE")
+    judge0_keepalive_expiry_seconds: float = Field(default=30.0, alias="JUDGE0_KEEPALIVE_EXPIRY_SECONDS")
+    judge0_connect_timeout_seconds: float = Field(default=5.0, alias="JUDGE0_CONNECT_TIMEOUT_SECONDS")
+    judge0_read_timeout_seconds: float = Field(default=10.0, alias="JUDGE0_READ_TIMEOUT_SECONDS")
+    judge0_pool_timeout_seconds: float = Field(default=5.0, alias="JUDGE0_POOL_TIMEOUT_SECONDS")
+
+    # Cluster-wide Judge0 governor (Redis token bucket + in-flight semaphore)
+    judge0_governor_enabled: bool = Field(default=True, alias="JUDGE0_GOVERNOR_ENABLED")
+    judge0_rate_limit_per_second: float = Field(default=20.0, alias="JUDGE0_RATE_LIMIT_PER_SECOND")
+    judge0_rate_limit_burst: int = Field(default=40, alias="JUDGE0_RATE_LIMIT_BURST")
+    judge0_max_in_flight: int = Field(default=50, alias="JUDGE0_MAX_IN_FLIGHT")
+    judge0_in_flight_lease_seconds: int = Field(default=120, alias="JUDGE0_IN_FLIGHT_LEASE_SECONDS")
+    judge0_governor_max_wait_seconds: int = Field(default=60, alias="JUDGE0_GOVERNOR_MAX_WAIT_SECONDS")
+
+    # Judge0 retries + circuit breaker (breaker state shared via Redis)
+    judge0_retry_max_attempts: int = Field(default=3, alias="JUDGE0_RETRY_MAX_ATTEMPTS")
+    judge0_retry_base_delay_seconds: float = Field(default=0.25, alias="JUDGE0_RETRY_BASE_DELAY_SECONDS")
+    judge0_retry_max_delay_seconds: float = Field(default=4.0, alias="JUDGE0_RETRY_MAX_DELAY_SECONDS")
+    judge0_breaker_enabled: bool = Field(default=True, alias="JUDGE0_BREAKER_ENABLED")
+    judge0_breaker_failure_threshold: int = Field(default=10, alias="JUDGE0_BREAKER_FAILURE_THRESHOLD")
+    judge0_breaker_window_seconds: int = Field(default=30, alias="JUDGE0_BREAKER_WINDOW_SECONDS")
+    judge0_breaker_cooldown_seconds: int = Field(default=30, alias="JUDGE0_BREAKER_COOLDOWN_SECONDS")
+
+    # Execution backend: judge0 (remote) | local (pre-forked rlimited sandbox,
+    # dev/CI only: refused with ENV=prod)
+    execution_backend: str = Field(default="judge0", alias="EXECUTION_BACKEND")
+    local_sandbox_workers: int = Field(default=0, alias="LOCAL_SANDBOX_WORKERS")  # 0 = cpu count
+    local_sandbox_cpu_seconds: float = Field(default=2.0, alias="LOCAL_SANDBOX_CPU_SECONDS")
+    local_sandbox_wall_seconds: float = Field(default=5.0, alias="LOCAL_SANDBOX_WALL_SECONDS")
+    local_sandbox_memory_mb: int = Field(default=256, alias="LOCAL_SANDBOX_MEMORY_MB")
+    local_sandbox_max_file_kb: int = Field(default=1024, alias="LOCAL_SANDBOX_MAX_FILE_KB")
+
+    # Batched IO driver (assignments with io_batched_driver): cases per execution
+    io_driver_max_cases: int = Field(default=50, alias="IO_DRIVER_MAX_CASES")
+
+    # Per-worker LRU of assignment grading bundles (tests, unit spec, rules, limits)
+    grading_bundle_cache_size: int = Field(default=256, alias="GRADING_BUNDLE_CACHE_SIZE")
+
+    # Bulk regrade jobs: submissions per wave (their executions go out
+    # together) and the pause between waves, on the regrade queue
+    regrade_wave_size: int = Field(default=50, alias="REGRADE_WAVE_SIZE")
+    regrade_wave_interval_seconds: float = Field(default=5.0, alias="REGRADE_WAVE_INTERVAL_SECONDS")
+
+    # Execution result cache (in-process L1 + Redis L2)
+    execution_cache_enabled: bool = Field(default=True, alias="EXECUTION_CACHE_ENABLED")
+    execution_cache_redis_enabled: bool = Field(default=True, alias="EXECUTION_CACHE_REDIS_ENABLED")
+    execution_cache_ttl_seconds: int = Field(default=86400, alias="EXECUTION_CACHE_TTL_SECONDS")
+    execution_cache_l1_size: int = Field(default=1024, alias="EXECUTION_CACHE_L1_SIZE")
+    cache_redis_url: Optional[str] = Field(default=None, alias="CACHE_REDIS_URL")
+
+    # Pre-flight compile() of submissions: in the grader (syntax errors fail
+    # every test without executing anything) and at upload (422)
+    preflight_enabled: bool = Field(default=True, alias="PREFLIGHT_ENABLED")
+    submission_syntax_check_on_upload: bool = Field(default=True, alias="SUBMISSION_SYNTAX_CHECK_ON_UPLOAD")
+
+    # Static analysis (single AST pass) in a per-worker process pool;
+    # 0 workers analyzes inline in the grading task. Opt-in, and only
+    # effective with --pool=threads or solo: Celery prefork children are
+    # daemonic and cannot start a pool, so they always analyze inline
+    static_analysis_workers: int = Field(default=0, alias="STATIC_ANALYSIS_WORKERS")
+    static_analysis_timeout_seconds: float = Field(default=10.0, alias="STATIC_ANALYSIS_TIMEOUT_SECONDS")
+
+    # Static analysis result cache, keyed by code SHA-256 + rule hash
+    # (in-process L1 + Redis L2)
+    static_analysis_cache_enabled: bool = Field(default=True, alias="STATIC_ANALYSIS_CACHE_ENABLED")
+    static_analysis_cache_redis_enabled: bool = Field(default=True, alias="STATIC_ANALYSIS_CACHE_REDIS_ENABLED")
+    static_analysis_cache_ttl_seconds: int = Field(default=86400, alias="STATIC_ANALYSIS_CACHE_TTL_SECONDS")
+    static_analysis_cache_l1_size: int = Field(default=1024, alias="STATIC_ANALYSIS_CACHE_L1_SIZE")
+    # Reject hard-gated submissions at upload (422) as well as in the grader
+    submission_static_gate_on_upload: bool = Field(default=True, alias="SUBMISSION_STATIC_GATE_ON_UPLOAD")
+
+    # Near-duplicate detection: MinHash signatures of normalized tokens in a
+    # per-assignment LSH index (bands must divide num_perm)
+    similarity_enabled: bool = Field(default=True, alias="SIMILARITY_ENABLED")
+    similarity_num_perm: int = Field(default=128, alias="SIMILARITY_NUM_PERM")
+    similarity_bands: int = Field(default=32, alias="SIMILARITY_BANDS")
+    similarity_shingle_size: int = Field(default=5, alias="SIMILARITY_SHINGLE_SIZE")
+    similarity_min_score: float = Field(default=0.5, alias="SIMILARITY_MIN_SCORE")
+
+    # Submission source in content-addressed blobs (SHA-256); zstd needs the
+    # optional zstandard package, otherwise blobs are stored plain
+    code_blob_compression: str = Field(default="zstd", alias="CODE_BLOB_COMPRESSION")
+    code_blob_compression_min_bytes: int = Field(default=512, alias="CODE_BLOB_COMPRESSION_MIN_BYTES")
+    code_blob_zstd_level: int = Field(default=3, alias="CODE_BLOB_ZSTD_LEVEL")
+
+    # Grading pipeline
+    # inline: grade_submission executes and waits for every test
+    # callback: Judge0 PUTs results to JUDGE0_CALLBACK_BASE_URL, polling is the fallback
+    # poller: a beat-driven task polls outstanding tokens of all runs in batches
+    # chord: one Celery task per execution (any worker), aggregated by a chord callback
+    grading_mode: str = Field(default="inline", alias="GRADING_MODE")
+    judge0_callback_base_url: Optional[str] = Field(default=None, alias="JUDGE0_CALLBACK_BASE_URL")
+    judge0_callback_fallback_seconds: int = Field(default=30, alias="JUDGE0_CALLBACK_FALLBACK_SECONDS")
+    judge0_poller_interval_seconds: float = Field(default=1.0, alias="JUDGE0_POLLER_INTERVAL_SECONDS")
+    judge0_poller_batch_size: int = Field(default=200, alias="JUDGE0_POLLER_BATCH_SIZE")
+    judge0_poller_max_age_seconds: int = Field(default=300, alias="JUDGE0_POLLER_MAX_AGE_SECONDS")
+    judge0_poller_lease_seconds: int = Field(default=60, alias="JUDGE0_POLLER_LEASE_SECONDS")
+
     # JWT / Auth
     jwt_secret_key: str = Field(..., alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
@@ -154,6 +277,25 @@ class Settings(BaseSettings):
         if self.log_level.upper() not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
             raise ValueError("Invalid LOG_LEVEL")
 
+        if not self.judge0_base_url and not self.judge0_endpoints:
+            raise ValueError("Either JUDGE0_BASE_URL or JUDGE0_ENDPOINTS must be set")
+
+        if self.execution_backend not in ["judge0", "local"]:
+            raise ValueError("EXECUTION_BACKEND must be one of: judge0, local")
+
+        # The local sandbox shares the worker's kernel, user and filesystem
+        if self.execution_backend == "local" and self.env == "prod":
+            raise ValueError("EXECUTION_BACKEND=local is for dev and CI only, not ENV=prod")
+
+        if self.grading_mode not in ["inline", "callback", "poller", "chord"]:
+            raise ValueError("GRADING_MODE must be one of: inline, callback, poller, chord")
+
+        if self.similarity_bands < 1 or self.similarity_num_perm % self.similarity_bands:
+            raise ValueError("SIMILARITY_BANDS must divide SIMILARITY_NUM_PERM")
+
+        if self.code_blob_compression not in ["zstd", "none"]:
+            raise ValueError("CODE_BLOB_COMPRESSION must be one of: zstd, none")
+
 
 @lru_cache
 def get_settings() -> Settings:
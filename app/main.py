@@ -22,6 +22,9 @@ from app.routers.web_student_dashboard import router as web_student_dashboard_ro
 from app.routers.web_student_assignments import router as web_student_assignments_router
 from app.routers.web_student_submissions import router as web_student_submissions_router
 from app.routers.web_student_results import router as web_student_results_router
+from app.routers.judge0_callbacks import router as judge0_callbacks_router
+from app.routers.instructor_similarity import router as instructor_similarity_router
+from app.routers.instructor_regrade import router as instructor_regrade_router
 
 
 settings = get_settings()
@@ -51,3 +54,6 @@ app.include_router(web_student_dashboard_router)
 app.include_router(web_student_assignments_router)
 app.include_router(web_student_submissions_router)
 app.include_router(web_student_results_router)
+app.include_router(judge0_callbacks_router)
+app.include_router(instructor_similarity_router)
+app.include_router(instructor_regrade_router)
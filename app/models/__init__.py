@@ -8,6 +8,7 @@ from .models import (
     GradingRun,
     TestCaseResult,
     StaticAnalysisReport,
+    PendingExecution,
 )
 
 __all__ = [
@@ -20,4 +21,5 @@ __all__ = [
     "GradingRun",
     "TestCaseResult",
     "StaticAnalysisReport",
+    "PendingExecution",
 ]
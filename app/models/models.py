@@ -8,13 +8,16 @@ from sqlalchemy import (
     CheckConstraint,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import JSONB
@@ -43,6 +46,19 @@ class GradingRunStatus(str, Enum):
     failed = "failed"
 
 
+class RegradeJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    cancelled = "cancelled"
+    failed = "failed"
+
+
+class RegradeScope(str, Enum):
+    all = "all"  # every graded submission
+    latest = "latest"  # each student's latest submission
+
+
 # -------------------------
 # Users
 # -------------------------
@@ -96,6 +112,13 @@ class Assignment(Base):
     max_runtime_ms: Mapped[int] = mapped_column(Integer, default=2000, nullable=False)
     max_memory_kb: Mapped[int] = mapped_column(Integer, default=128000, nullable=False)
 
+    # Run all IO cases in one execution through a multi-case harness
+    io_batched_driver: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
+
+    # Bumped on every change grading depends on (tests, specs, rules, limits);
+    # workers cache grading bundles per (assignment id, version)
+    grading_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -134,7 +157,15 @@ class IOTestCase(Base):
     is_hidden: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     order_index: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # Bumped when stdin changes (what an execution sees). Results recorded
+    # at the current input_version are reused by a regrade and only
+    # rescored against expected_stdout / points.
+    input_version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Soft delete: a deleted test is no longer graded, but the results past
+    # runs recorded for it stay auditable
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     assignment: Mapped["Assignment"] = relationship("Assignment", back_populates="io_test_cases")
     test_case_results: Mapped[list["TestCaseResult"]] = relationship("TestCaseResult", back_populates="io_test_case")
@@ -153,6 +184,9 @@ class UnitTestSpec(Base):
     test_code: Mapped[str] = mapped_column(Text, nullable=False)  # asserts only
     points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     is_hidden: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Bumped on every change; a regrade re-runs the harness only for runs
+    # graded at an older version
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
@@ -178,6 +212,9 @@ class StaticRule(Base):
     forbidden_imports: Mapped[list[str] | None] = mapped_column(JSONB, nullable=True)
     max_cyclomatic_complexity: Mapped[int | None] = mapped_column(Integer, nullable=True)
     points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Hard gate: a forbidden import or missing required function rejects the
+    # submission (at upload and in the grader) without executing it
+    hard_gate: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
@@ -190,6 +227,31 @@ class StaticRule(Base):
     assignment: Mapped["Assignment"] = relationship("Assignment", back_populates="static_rule")
 
 
+# -------------------------
+# Code Blobs
+# -------------------------
+class CodeBlob(Base):
+    """
+    Submission source, stored once per distinct content and addressed by
+    the SHA-256 of its UTF-8 bytes. Immutable once written.
+    """
+
+    __tablename__ = "code_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # "plain" (UTF-8 bytes) or "zstd"
+    encoding: Mapped[str] = mapped_column(String(10), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Uncompressed size in bytes
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("encoding IN ('plain', 'zstd')", name="ck_code_blobs_encoding"),
+    )
+
+
 # -------------------------
 # Submissions
 # -------------------------
@@ -201,7 +263,8 @@ class Submission(Base):
     student_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
 
     filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    code_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Source lives in code_blobs (see code_text); rows only carry the hash
+    code_sha256: Mapped[str] = mapped_column(ForeignKey("code_blobs.sha256"), index=True, nullable=False)
 
     status: Mapped[str] = mapped_column(String(20), default=SubmissionStatus.queued.value, nullable=False)
 
@@ -231,10 +294,26 @@ class Submission(Base):
         post_update=True,  # helps SQLAlchemy handle this pointer
     )
 
+    code_blob: Mapped["CodeBlob"] = relationship("CodeBlob", lazy="select")
+
     __table_args__ = (
         CheckConstraint("status IN ('queued', 'running', 'completed', 'failed')", name="ck_submissions_status"),
     )
 
+    @property
+    def code_text(self) -> str:
+        """
+        The source code. Its blob is loaded on first access only (status
+        and list queries never read it) and decoded once per instance.
+        """
+        text = self.__dict__.get("_code_text")
+        if text is None:
+            from app.services.code_storage import decode
+
+            text = decode(self.code_blob)
+            self.__dict__["_code_text"] = text
+        return text
+
 
 # -------------------------
 # Grading Runs
@@ -263,6 +342,11 @@ class GradingRun(Base):
 
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Test suite the run was graded against (assignment grading_version,
+    # unit spec version)
+    grading_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    unit_spec_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     submission: Mapped["Submission"] = relationship("Submission", back_populates="grading_runs",
@@ -273,6 +357,11 @@ class GradingRun(Base):
         back_populates="grading_run",
         uselist=False
     )
+    pending_executions: Mapped[list["PendingExecution"]] = relationship(
+        "PendingExecution",
+        back_populates="grading_run",
+        cascade="all, delete-orphan",
+    )
 
     __table_args__ = (
         CheckConstraint("status IN ('running', 'completed', 'failed')", name="ck_grading_runs_status"),
@@ -298,6 +387,8 @@ class TestCaseResult(Base):
     status: Mapped[str | None] = mapped_column(String(50), nullable=True)
     time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     memory_kb: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # IOTestCase.input_version the output was produced for
+    input_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -309,6 +400,60 @@ class TestCaseResult(Base):
     )
 
 
+# -------------------------
+# Pending Judge0 executions (callback mode)
+# -------------------------
+class PendingExecution(Base):
+    """
+    One Judge0 execution of a grading run that has been submitted but not
+    yet folded into TestCaseResults. Rows are created before submission
+    (keyed by position) so a callback can never arrive for an unknown row,
+    and are deleted once the run is finalized.
+    """
+    __tablename__ = "pending_executions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    grading_run_id: Mapped[int] = mapped_column(ForeignKey("grading_runs.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    position: Mapped[int] = mapped_column(Integer, nullable=False)  # index in the run's execution list
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)  # io | unit
+    io_test_case_id: Mapped[int | None] = mapped_column(
+        ForeignKey("io_test_cases.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # What was dispatched, so finalize scores it even if the tests are edited
+    # meanwhile: [[io_test_case_id, input_version], ...] this execution
+    # covers (a batched driver chunk covers several), the driver's record
+    # delimiter and the limits it runs with
+    cases: Mapped[list | None] = mapped_column(JSONB, nullable=True)
+    driver_delimiter: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    limits: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    token: Mapped[str | None] = mapped_column(String(64), unique=True, index=True, nullable=True)
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True)  # execution cache address
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Poller lease: set when a tick claims the row, cleared when it is done
+    # with it; a claim older than JUDGE0_POLLER_LEASE_SECONDS is abandoned
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    grading_run: Mapped["GradingRun"] = relationship("GradingRun", back_populates="pending_executions")
+
+    __table_args__ = (
+        UniqueConstraint("grading_run_id", "position", name="uq_pending_executions_run_position"),
+        CheckConstraint("kind IN ('io', 'unit')", name="ck_pending_executions_kind"),
+        # Poller work queue: outstanding submitted executions only
+        Index(
+            "ix_pending_executions_outstanding",
+            "id",
+            postgresql_where=text("completed_at IS NULL AND token IS NOT NULL"),
+        ),
+    )
+
+
 # -------------------------
 # Static Analysis Reports (0..1 per grading run)
 # -------------------------
@@ -327,3 +472,105 @@ class StaticAnalysisReport(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     grading_run: Mapped["GradingRun"] = relationship("GradingRun", back_populates="static_analysis_report")
+
+
+# -------------------------
+# Similarity detection (MinHash / LSH)
+# -------------------------
+class SubmissionFingerprint(Base):
+    """
+    MinHash signature of a submission's normalized token stream, computed
+    once when the submission is indexed.
+    """
+    __tablename__ = "submission_fingerprints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    submission_id: Mapped[int] = mapped_column(ForeignKey("submissions.id", ondelete="CASCADE"), unique=True, nullable=False)
+    assignment_id: Mapped[int] = mapped_column(ForeignKey("assignments.id", ondelete="CASCADE"), index=True, nullable=False)
+    student_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    signature: Mapped[list[int]] = mapped_column(JSONB, nullable=False)
+    shingle_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class SimilarityBucket(Base):
+    """
+    Per-assignment LSH index: one row per (submission, band); submissions
+    sharing a bucket in any band are candidate pairs.
+    """
+    __tablename__ = "similarity_buckets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    assignment_id: Mapped[int] = mapped_column(ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
+    band: Mapped[int] = mapped_column(Integer, nullable=False)
+    bucket: Mapped[str] = mapped_column(String(16), nullable=False)  # hash of the band's rows
+    submission_id: Mapped[int] = mapped_column(ForeignKey("submissions.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    __table_args__ = (
+        Index("ix_similarity_buckets_lookup", "assignment_id", "band", "bucket"),
+    )
+
+
+class SimilarityPair(Base):
+    """
+    Candidate near-duplicate pair (different students), with the MinHash
+    estimate of their Jaccard similarity. submission_a_id < submission_b_id.
+    """
+    __tablename__ = "similarity_pairs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    assignment_id: Mapped[int] = mapped_column(ForeignKey("assignments.id", ondelete="CASCADE"), index=True, nullable=False)
+    submission_a_id: Mapped[int] = mapped_column(ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False)
+    submission_b_id: Mapped[int] = mapped_column(ForeignKey("submissions.id", ondelete="CASCADE"), index=True, nullable=False)
+    similarity: Mapped[float] = mapped_column(Float, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("submission_a_id", "submission_b_id", name="uq_similarity_pairs_submissions"),
+        CheckConstraint("submission_a_id < submission_b_id", name="ck_similarity_pairs_order"),
+    )
+
+
+# -------------------------
+# Bulk regrade jobs
+# -------------------------
+class RegradeJob(Base):
+    """
+    One bulk regrade of an assignment, processed in waves on the regrade
+    queue. `cursor` is the last submission id handed to a wave, so the job
+    resumes where it stopped and never regrades a submission twice.
+    """
+    __tablename__ = "regrade_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    assignment_id: Mapped[int] = mapped_column(ForeignKey("assignments.id", ondelete="CASCADE"), index=True, nullable=False)
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    scope: Mapped[str] = mapped_column(String(10), default=RegradeScope.all.value, nullable=False)
+    full: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default=RegradeJobStatus.queued.value, nullable=False)
+
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    cursor: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("scope IN ('all', 'latest')", name="ck_regrade_jobs_scope"),
+        # At most one active job per assignment
+        Index(
+            "uq_regrade_jobs_active_assignment",
+            "assignment_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -1,7 +1,23 @@
 from fastapi import APIRouter
 
+from app.services import judge0_governor, judge0_pool, judge0_resilience
+
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@router.get("/health/judge0")
+def judge0_health():
+    """
+    Cluster-wide Judge0 rate limiter / in-flight utilisation, circuit
+    breaker state, and this process's view of each Judge0 node.
+    """
+    return {
+        "status": "ok",
+        "nodes": judge0_pool.status(),
+        "governor": judge0_governor.utilisation(),
+        "circuit_breaker": judge0_resilience.breaker.state(),
+    }
@@ -9,6 +9,7 @@ from app.schemas.assignment import (
     AssignmentOut,
 )
 from app.dependencies.auth import require_instructor
+from app.services.grading_bundle import bump_grading_version
 
 router = APIRouter(
     prefix="/instructor/assignments",
@@ -41,6 +42,7 @@ def create_assignment(
         weight_static=payload.weight_static,
         max_runtime_ms=payload.max_runtime_ms,
         max_memory_kb=payload.max_memory_kb,
+        io_batched_driver=payload.io_batched_driver,
     )
 
     db.add(assignment)
@@ -86,6 +88,7 @@ def update_assignment(
 
     for field, value in update_data.items():
         setattr(assignment, field, value)
+    bump_grading_version(assignment)
 
     db.commit()
     db.refresh(assignment)
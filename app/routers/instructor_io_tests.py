@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.dependencies.auth import require_instructor
 from app.models.models import Assignment, IOTestCase
 from app.schemas.io_test_case import IOTestCaseCreate, IOTestCaseOut
+from app.services.grading_bundle import bump_grading_version
 
 router = APIRouter(
     prefix="/instructor/assignments",
@@ -20,6 +22,21 @@ def _get_owned_assignment(db: Session, assignment_id: int, instructor_id: int) -
     return assignment
 
 
+def _get_test_case(db: Session, assignment_id: int, test_case_id: int) -> IOTestCase:
+    tc = (
+        db.query(IOTestCase)
+        .filter(
+            IOTestCase.id == test_case_id,
+            IOTestCase.assignment_id == assignment_id,
+            IOTestCase.deleted_at.is_(None),
+        )
+        .first()
+    )
+    if not tc:
+        raise HTTPException(status_code=404, detail="IO test case not found")
+    return tc
+
+
 @router.post(
     "/{assignment_id}/io-tests",
     response_model=IOTestCaseOut,
@@ -31,7 +48,7 @@ def create_io_test_case(
     db: Session = Depends(get_db),
     instructor=Depends(require_instructor),
 ):
-    _get_owned_assignment(db, assignment_id, instructor.id)
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
 
     tc = IOTestCase(
         assignment_id=assignment_id,
@@ -43,11 +60,61 @@ def create_io_test_case(
         order_index=payload.order_index,
     )
     db.add(tc)
+    bump_grading_version(assignment)
+    db.commit()
+    db.refresh(tc)
+    return tc
+
+
+@router.put(
+    "/{assignment_id}/io-tests/{test_case_id}",
+    response_model=IOTestCaseOut,
+)
+def update_io_test_case(
+    assignment_id: int,
+    test_case_id: int,
+    payload: IOTestCaseCreate,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
+    tc = _get_test_case(db, assignment_id, test_case_id)
+
+    # New input means new executions; expected output / points edits are
+    # only a rescore for POST /regrade
+    if tc.stdin != payload.stdin:
+        tc.input_version = IOTestCase.input_version + 1
+    tc.name = payload.name
+    tc.stdin = payload.stdin
+    tc.expected_stdout = payload.expected_stdout
+    tc.points = payload.points
+    tc.is_hidden = payload.is_hidden
+    tc.order_index = payload.order_index
+    bump_grading_version(assignment)
     db.commit()
     db.refresh(tc)
     return tc
 
 
+@router.delete(
+    "/{assignment_id}/io-tests/{test_case_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def delete_io_test_case(
+    assignment_id: int,
+    test_case_id: int,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
+    tc = _get_test_case(db, assignment_id, test_case_id)
+
+    # Soft delete: recorded results of past runs stay intact
+    tc.deleted_at = func.now()
+    bump_grading_version(assignment)
+    db.commit()
+
+
 @router.get(
     "/{assignment_id}/io-tests",
     response_model=list[IOTestCaseOut],
@@ -61,7 +128,7 @@ def list_io_test_cases(
 
     return (
         db.query(IOTestCase)
-        .filter(IOTestCase.assignment_id == assignment_id)
+        .filter(IOTestCase.assignment_id == assignment_id, IOTestCase.deleted_at.is_(None))
         .order_by(IOTestCase.order_index.asc(), IOTestCase.id.asc())
         .all()
     )
@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.dependencies.auth import require_instructor
+from app.models.models import Assignment, RegradeJob, RegradeJobStatus
+from app.schemas.regrade import RegradeJobCreate, RegradeJobOut
+from app.tasks.regrade import eligible_submissions, run_regrade_wave
+
+router = APIRouter(
+    prefix="/instructor/assignments",
+    tags=["instructor-regrade"],
+)
+
+_ACTIVE_STATUSES = (RegradeJobStatus.queued.value, RegradeJobStatus.running.value)
+
+
+def _get_owned_assignment(db: Session, assignment_id: int, instructor_id: int) -> Assignment:
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    if assignment.instructor_id != instructor_id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return assignment
+
+
+def _get_job(db: Session, assignment_id: int, job_id: int) -> RegradeJob:
+    job = (
+        db.query(RegradeJob)
+        .filter(RegradeJob.id == job_id, RegradeJob.assignment_id == assignment_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Regrade job not found")
+    return job
+
+
+def _job_out(job: RegradeJob) -> RegradeJobOut:
+    """
+    Job progress; the ETA extrapolates the throughput so far.
+    """
+    out = RegradeJobOut.model_validate(job)
+    processed = job.done + job.failed
+    if job.status == RegradeJobStatus.running.value and job.started_at and processed:
+        elapsed = (datetime.now(timezone.utc) - job.started_at).total_seconds()
+        remaining = max(0, job.total - processed)
+        out.eta_seconds = round(elapsed / processed * remaining, 1)
+    return out
+
+
+@router.post(
+    "/{assignment_id}/regrade",
+    response_model=RegradeJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_regrade(
+    assignment_id: int,
+    payload: RegradeJobCreate,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    """
+    Regrade the assignment's graded submissions (scope "all") or each
+    student's latest one (scope "latest") against the current test suite.
+
+    Runs in throttled waves on the regrade queue. Incremental unless
+    `full`: only new or changed tests (and a changed unit spec) are
+    executed; other recorded outputs are rescored. Each submission's
+    latest_grading_run_id flips to its new run when that run completes.
+    """
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
+
+    active = (
+        db.query(RegradeJob.id)
+        .filter(RegradeJob.assignment_id == assignment.id, RegradeJob.status.in_(_ACTIVE_STATUSES))
+        .first()
+    )
+    if active:
+        raise HTTPException(status_code=409, detail=f"Regrade job {active.id} is already in progress")
+
+    job = RegradeJob(
+        assignment_id=assignment.id,
+        created_by=instructor.id,
+        scope=payload.scope,
+        full=payload.full,
+        status=RegradeJobStatus.queued.value,
+        total=eligible_submissions(db, assignment.id, payload.scope).count(),
+        done=0,
+        failed=0,
+        cursor=0,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A regrade job is already in progress")
+    db.refresh(job)
+
+    run_regrade_wave.delay(job.id)
+    return _job_out(job)
+
+
+@router.get(
+    "/{assignment_id}/regrade/{job_id}",
+    response_model=RegradeJobOut,
+)
+def get_regrade_job(
+    assignment_id: int,
+    job_id: int,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    _get_owned_assignment(db, assignment_id, instructor.id)
+    return _job_out(_get_job(db, assignment_id, job_id))
+
+
+@router.post(
+    "/{assignment_id}/regrade/{job_id}/cancel",
+    response_model=RegradeJobOut,
+)
+def cancel_regrade_job(
+    assignment_id: int,
+    job_id: int,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    """
+    Stop a regrade job before its next wave. Submissions already regraded
+    keep their new run.
+    """
+    _get_owned_assignment(db, assignment_id, instructor.id)
+    job = _get_job(db, assignment_id, job_id)
+
+    if job.status in _ACTIVE_STATUSES:
+        db.query(RegradeJob).filter(
+            RegradeJob.id == job.id,
+            RegradeJob.status.in_(_ACTIVE_STATUSES),
+        ).update(
+            {"status": RegradeJobStatus.cancelled.value, "finished_at": datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+        db.commit()
+        db.refresh(job)
+    return _job_out(job)
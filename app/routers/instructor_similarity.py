@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, aliased
+
+from app.db import get_db
+from app.dependencies.auth import require_instructor
+from app.models.models import Assignment, SimilarityPair, Submission
+from app.schemas.similarity import SimilarityBackfillOut, SimilarityPairOut
+from app.tasks.similarity import backfill_similarity, unindexed_submissions
+
+router = APIRouter(
+    prefix="/instructor/assignments",
+    tags=["instructor-similarity"],
+)
+
+
+def _get_owned_assignment(db: Session, assignment_id: int, instructor_id: int) -> Assignment:
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    if assignment.instructor_id != instructor_id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return assignment
+
+
+@router.get(
+    "/{assignment_id}/similarity",
+    response_model=list[SimilarityPairOut],
+)
+def list_similar_pairs(
+    assignment_id: int,
+    min_similarity: float = Query(default=0.5, ge=0.0, le=1.0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    """
+    Candidate near-duplicate submission pairs (different students), most
+    similar first. Pairs come from the incremental LSH index, so only
+    pairs scoring at least SIMILARITY_MIN_SCORE when indexed are listed.
+    """
+    _get_owned_assignment(db, assignment_id, instructor.id)
+
+    sub_a = aliased(Submission)
+    sub_b = aliased(Submission)
+    rows = (
+        db.query(SimilarityPair, sub_a.student_id, sub_b.student_id)
+        .join(sub_a, sub_a.id == SimilarityPair.submission_a_id)
+        .join(sub_b, sub_b.id == SimilarityPair.submission_b_id)
+        .filter(
+            SimilarityPair.assignment_id == assignment_id,
+            SimilarityPair.similarity >= min_similarity,
+        )
+        .order_by(SimilarityPair.similarity.desc(), SimilarityPair.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+    return [
+        SimilarityPairOut(
+            submission_a_id=pair.submission_a_id,
+            student_a_id=student_a_id,
+            submission_b_id=pair.submission_b_id,
+            student_b_id=student_b_id,
+            similarity=pair.similarity,
+        )
+        for pair, student_a_id, student_b_id in rows
+    ]
+
+
+@router.post(
+    "/{assignment_id}/similarity/backfill",
+    response_model=SimilarityBackfillOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_similarity_backfill(
+    assignment_id: int,
+    db: Session = Depends(get_db),
+    instructor=Depends(require_instructor),
+):
+    """
+    Index the assignment's submissions that are not in the similarity index
+    yet (uploaded before it existed or while it was disabled), so their
+    pairs show up in the list above. Runs as a Celery task; `pending` is
+    the number of submissions it will index.
+    """
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
+
+    pending = unindexed_submissions(db, assignment.id).count()
+    if pending:
+        backfill_similarity.delay(assignment.id)
+    return SimilarityBackfillOut(assignment_id=assignment.id, pending=pending)
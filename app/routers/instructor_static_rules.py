@@ -5,6 +5,7 @@ from app.db import get_db
 from app.dependencies.auth import require_instructor
 from app.models.models import Assignment, StaticRule
 from app.schemas.static_rule import StaticRuleUpsert, StaticRuleOut
+from app.services.grading_bundle import bump_grading_version
 
 router = APIRouter(
     prefix="/instructor/assignments",
@@ -31,7 +32,7 @@ def upsert_static_rules(
     db: Session = Depends(get_db),
     instructor=Depends(require_instructor),
 ):
-    _get_owned_assignment(db, assignment_id, instructor.id)
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
 
     rule = db.query(StaticRule).filter(StaticRule.assignment_id == assignment_id).first()
 
@@ -40,6 +41,8 @@ def upsert_static_rules(
         rule.forbidden_imports = payload.forbidden_imports
         rule.max_cyclomatic_complexity = payload.max_cyclomatic_complexity
         rule.points = payload.points
+        rule.hard_gate = payload.hard_gate
+        bump_grading_version(assignment)
         db.commit()
         db.refresh(rule)
         return rule
@@ -50,8 +53,10 @@ def upsert_static_rules(
         forbidden_imports=payload.forbidden_imports,
         max_cyclomatic_complexity=payload.max_cyclomatic_complexity,
         points=payload.points,
+        hard_gate=payload.hard_gate,
     )
     db.add(rule)
+    bump_grading_version(assignment)
     db.commit()
     db.refresh(rule)
     return rule
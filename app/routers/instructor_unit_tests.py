@@ -5,6 +5,7 @@ from app.db import get_db
 from app.dependencies.auth import require_instructor
 from app.models.models import Assignment, UnitTestSpec
 from app.schemas.unit_test_spec import UnitTestSpecUpsert, UnitTestSpecOut
+from app.services.grading_bundle import bump_grading_version
 
 router = APIRouter(
     prefix="/instructor/assignments",
@@ -32,7 +33,7 @@ def upsert_unit_test_spec(
     db: Session = Depends(get_db),
     instructor=Depends(require_instructor),
 ):
-    _get_owned_assignment(db, assignment_id, instructor.id)
+    assignment = _get_owned_assignment(db, assignment_id, instructor.id)
 
     spec = (
         db.query(UnitTestSpec)
@@ -46,6 +47,8 @@ def upsert_unit_test_spec(
         spec.test_code = payload.test_code
         spec.points = payload.points
         spec.is_hidden = payload.is_hidden
+        spec.version = UnitTestSpec.version + 1
+        bump_grading_version(assignment)
         db.commit()
         db.refresh(spec)
         return spec
@@ -59,6 +62,7 @@ def upsert_unit_test_spec(
         is_hidden=payload.is_hidden,
     )
     db.add(spec)
+    bump_grading_version(assignment)
     db.commit()
     db.refresh(spec)
     return spec
@@ -0,0 +1,47 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.services.judge0_callbacks import record_execution_result, verify_signature
+from app.tasks.grading import finalize_grading_run
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/judge0",
+    tags=["judge0-callbacks"],
+)
+
+
+@router.put("/callbacks/{grading_run_id}/{position}")
+def judge0_callback(
+    grading_run_id: int,
+    position: int,
+    signature: str = Query(...),
+    node: Optional[str] = Query(default=None),
+    payload: dict = Body(...),
+    db: Session = Depends(get_db),
+):
+    """
+    Judge0 callback_url target (GRADING_MODE=callback).
+
+    Records one finished execution. When the last execution of the
+    grading run reports, enqueues finalize_grading_run to score it.
+    Authenticated by the HMAC signature embedded in the callback URL;
+    `node` is the Judge0 node the execution was sent to.
+    """
+    if not verify_signature(grading_run_id, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid signature")
+
+    all_reported = record_execution_result(db, grading_run_id, position, payload, node_id=node)
+    if all_reported is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
+
+    if all_reported:
+        finalize_grading_run.delay(grading_run_id)
+        logger.info("All executions reported; finalize enqueued for grading_run_id=%s", grading_run_id)
+
+    return {"ok": True}
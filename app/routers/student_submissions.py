@@ -4,11 +4,16 @@ import os
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.db import get_db
 from app.dependencies.auth import require_student
 from app.models.models import Assignment, Submission, SubmissionStatus
 from app.schemas.submission import SubmissionResponse
+from app.services import code_storage, grading_bundle, preflight, static_analysis
 from app.tasks.grading import grade_submission
+from app.tasks.similarity import index_submission_similarity
+
+settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,9 @@ async def submit_code(
     - File extension must be .py.
     - File MIME type must be a recognised Python content type.
     - File size must not exceed 1 MB.
+    - Code must compile (syntax only; SUBMISSION_SYNTAX_CHECK_ON_UPLOAD).
+    - Code must pass the static rules' hard gate, if the assignment has one
+      (SUBMISSION_STATIC_GATE_ON_UPLOAD).
 
     Security: file contents are stored as plain text and never executed locally.
     Only Judge0 executes student code (wired in Ticket 5.1).
@@ -114,13 +122,39 @@ async def submit_code(
         )
 
     # ------------------------------------------------------------------
-    # 5. Persist submission record
+    # 5. Syntax check (compiled, never run) for instant feedback
+    # ------------------------------------------------------------------
+    if getattr(settings, "submission_syntax_check_on_upload", True):
+        syntax_error = preflight.check_syntax(code_text)
+        if syntax_error is not None:
+            where = f" on line {syntax_error['line']}" if syntax_error.get("line") else ""
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{syntax_error['error_type']}{where}: {syntax_error['message']}",
+            )
+
+    # ------------------------------------------------------------------
+    # 6. Static rules hard gate (forbidden imports / required functions)
+    # ------------------------------------------------------------------
+    if getattr(settings, "submission_static_gate_on_upload", True):
+        bundle = grading_bundle.get_bundle(db, assignment_id)
+        rule = bundle.static_rule if bundle else None
+        if rule is not None and rule.hard_gate:
+            violations = static_analysis.gate_violations(rule, static_analysis.analyze_now(code_text, rule))
+            if violations:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Submission rejected: " + "; ".join(v["message"] for v in violations),
+                )
+
+    # ------------------------------------------------------------------
+    # 7. Persist submission record
     # ------------------------------------------------------------------
     submission = Submission(
         assignment_id=assignment_id,
         student_id=student.id,
         filename=filename,
-        code_text=code_text,
+        code_sha256=code_storage.put(db, code_text),
         status=SubmissionStatus.queued.value,
     )
     db.add(submission)
@@ -135,10 +169,13 @@ async def submit_code(
     )
 
     # ------------------------------------------------------------------
-    # 6. Enqueue Celery grading task
+    # 8. Enqueue Celery grading task
     # ------------------------------------------------------------------
     grade_submission.delay(submission.id)
 
     logger.info("grade_submission task enqueued for submission_id=%s", submission.id)
 
+    if getattr(settings, "similarity_enabled", True):
+        index_submission_similarity.delay(submission.id)
+
     return SubmissionResponse(submission_id=submission.id, status=submission.status)
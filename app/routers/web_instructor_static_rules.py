@@ -84,6 +84,7 @@ async def static_rules_page(request: Request, assignment_id: int):
             "forbidden_imports": ["os", "sys"],
             "max_cyclomatic_complexity": 10,
             "points": 0,
+            "hard_gate": False,
         },
         indent=2,
     )
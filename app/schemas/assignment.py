@@ -19,6 +19,9 @@ class AssignmentBase(BaseModel):
     max_runtime_ms: int = Field(default=2000, ge=100, le=600000)
     max_memory_kb: int = Field(default=128000, ge=16000, le=2000000)
 
+    # Opt-in: run all IO cases in one execution (per-case timeout = max_runtime_ms)
+    io_batched_driver: bool = False
+
     @model_validator(mode="after")
     def validate_weights_sum(self):
         total = self.weight_io + self.weight_unit + self.weight_static
@@ -47,6 +50,8 @@ class AssignmentUpdate(BaseModel):
     max_runtime_ms: Optional[int] = Field(default=None, ge=100, le=600000)
     max_memory_kb: Optional[int] = Field(default=None, ge=16000, le=2000000)
 
+    io_batched_driver: Optional[bool] = None
+
     @model_validator(mode="after")
     def validate_weights_sum_if_any(self):
         # Only validate sum if any weight is being updated
@@ -20,3 +20,4 @@ class IOTestCaseOut(BaseModel):
     points: int
     is_hidden: bool
     order_index: int
+    input_version: int
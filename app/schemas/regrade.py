@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class RegradeJobCreate(BaseModel):
+    scope: Literal["all", "latest"] = "all"
+    full: bool = False
+
+
+class RegradeJobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    assignment_id: int
+    scope: str
+    full: bool
+    status: str
+    total: int
+    done: int
+    failed: int
+    eta_seconds: Optional[float] = None
+    error_message: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class SimilarityPairOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    submission_a_id: int
+    student_a_id: int
+    submission_b_id: int
+    student_b_id: int
+    similarity: float
+
+
+class SimilarityBackfillOut(BaseModel):
+    assignment_id: int
+    pending: int
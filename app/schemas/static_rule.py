@@ -7,6 +7,7 @@ class StaticRuleUpsert(BaseModel):
     forbidden_imports: Optional[List[str]] = None
     max_cyclomatic_complexity: Optional[int] = Field(default=None, ge=1, le=10_000)
     points: int = Field(default=0, ge=0, le=100_000)
+    hard_gate: bool = False
 
 
 class StaticRuleOut(BaseModel):
@@ -18,3 +19,4 @@ class StaticRuleOut(BaseModel):
     forbidden_imports: Optional[list[str]]
     max_cyclomatic_complexity: Optional[int]
     points: int
+    hard_gate: bool
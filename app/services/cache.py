@@ -0,0 +1,158 @@
+# app/services/cache.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU with optional per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: Optional[float] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Any, tuple[float | None, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# -------------------------
+# Shared Redis connection (best effort)
+# -------------------------
+_redis = None
+_redis_pid: Optional[int] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Process-wide Redis client for caches and coordination state.
+
+    Uses CACHE_REDIS_URL when set (recommended: a separate instance/db with
+    an LRU maxmemory-policy), otherwise REDIS_URL. Returns None if Redis
+    is unavailable; callers must treat Redis as optional.
+    """
+    global _redis, _redis_pid
+
+    if _redis is not None and _redis_pid == os.getpid():
+        return _redis
+
+    with _redis_lock:
+        if _redis is not None and _redis_pid == os.getpid():
+            return _redis
+        try:
+            import redis
+
+            url = getattr(settings, "cache_redis_url", None) or settings.redis_url
+            _redis = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+            _redis_pid = os.getpid()
+        except Exception:
+            logger.exception("Redis unavailable for caching")
+            _redis = None
+        return _redis
+
+
+class TwoTierCache:
+    """
+    In-process LRU (L1) in front of Redis (L2), JSON-serialized values.
+
+    Redis errors never propagate: a failing L2 just behaves like a miss.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        l1_size: int = 1024,
+        use_redis: bool = True,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = int(ttl_seconds)
+        self.l1 = LRUCache(maxsize=l1_size, ttl_seconds=ttl_seconds)
+        self.use_redis = use_redis
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+
+        if not self.use_redis:
+            return None
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning("Redis cache get failed (%s): %s", self.namespace, e)
+            return None
+        if raw is None:
+            return None
+
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return None
+        self.l1.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.l1.set(key, value)
+
+        if not self.use_redis:
+            return
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(self._redis_key(key), json.dumps(value), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning("Redis cache set failed (%s): %s", self.namespace, e)
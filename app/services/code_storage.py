@@ -0,0 +1,69 @@
+# app/services/code_storage.py
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.models import CodeBlob
+
+try:
+    import zstandard
+except ImportError:  # optional: blobs are stored plain without it
+    zstandard = None
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+PLAIN = "plain"
+ZSTD = "zstd"
+
+
+def _compression() -> str:
+    return str(getattr(settings, "code_blob_compression", ZSTD))
+
+
+def encode(raw: bytes) -> Tuple[str, bytes]:
+    """
+    (encoding, data) to store for `raw`: zstd when enabled, available,
+    the file is at least CODE_BLOB_COMPRESSION_MIN_BYTES and it actually
+    gets smaller; plain otherwise.
+    """
+    min_bytes = int(getattr(settings, "code_blob_compression_min_bytes", 512))
+    if _compression() == ZSTD and zstandard is not None and len(raw) >= min_bytes:
+        level = int(getattr(settings, "code_blob_zstd_level", 3))
+        packed = zstandard.ZstdCompressor(level=level).compress(raw)
+        if len(packed) < len(raw):
+            return ZSTD, packed
+    return PLAIN, raw
+
+
+def decode(blob: CodeBlob) -> str:
+    if blob.encoding == ZSTD:
+        if zstandard is None:
+            raise RuntimeError(f"Code blob {blob.sha256} is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob.data, max_output_size=blob.size).decode("utf-8")
+    return bytes(blob.data).decode("utf-8")
+
+
+def put(db: Session, code_text: str) -> str:
+    """
+    Store `code_text` unless a blob with the same content exists, and
+    return its SHA-256 for Submission.code_sha256. Safe under concurrent
+    uploads of the same file. The caller commits.
+    """
+    raw = code_text.encode("utf-8")
+    sha = hashlib.sha256(raw).hexdigest()
+
+    encoding, data = encode(raw)
+    db.execute(
+        insert(CodeBlob)
+        .values(sha256=sha, encoding=encoding, data=data, size=len(raw))
+        .on_conflict_do_nothing(index_elements=[CodeBlob.sha256])
+    )
+    return sha
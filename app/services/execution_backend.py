@@ -0,0 +1,194 @@
+# app/services/execution_backend.py
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.config import get_settings
+from app.services import execution_limits
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionBackend(ABC):
+    """
+    Where student code runs.
+
+    Every execution is a dict with "source_code" and optional "stdin" and
+    "limits" (see execution_limits), plus "callback_url" for backends that
+    support callbacks. Results use the Judge0 client's shape: stdout,
+    stderr, status, time, memory.
+    """
+
+    name: str = "base"
+    # Whether results can be pushed to /judge0/callbacks/... and polled from
+    # another process (tokens are meaningful outside this worker); required
+    # by the callback and poller grading modes
+    supports_callbacks: bool = False
+
+    @abstractmethod
+    def submit(self, item: Dict[str, Any]) -> str:
+        """
+        Start one execution and return its token.
+        """
+
+    @abstractmethod
+    def poll(self, token: str, timeout_seconds: Optional[float] = None) -> dict:
+        """
+        Wait for one execution to finish (at most `timeout_seconds`). Never
+        raises; failures come back as structured "failed" results.
+        """
+
+    @abstractmethod
+    def submit_batch(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Start many executions; tokens aligned with `items` (None = rejected).
+        """
+
+    @abstractmethod
+    def poll_batch(self, tokens: List[Optional[str]], timeout_seconds: Optional[float] = None) -> List[dict]:
+        """
+        Wait for many executions; results aligned with `tokens`.
+        """
+
+    def fetch_batch(self, tokens: List[Optional[str]]) -> List[Optional[dict]]:
+        """
+        One non-blocking status check; None for executions still running.
+        Only needed by backends with `supports_callbacks` (used by the
+        centralized poller).
+        """
+        raise NotImplementedError(f"{self.name} backend does not support detached polling")
+
+    def runtime(self) -> str:
+        """
+        The language runtime executions run on. Part of every execution
+        cache key (with the backend name), so a result is never reused
+        across backends or after a runtime upgrade.
+        """
+        return self.name
+
+    def execute_batch(self, items: List[Dict[str, Any]]) -> List[dict]:
+        """
+        Run every execution and return results in input order.
+        """
+        if not items:
+            return []
+        deadline = execution_limits.poll_deadline(item.get("limits") for item in items)
+        return self.poll_batch(self.submit_batch(items), timeout_seconds=deadline)
+
+    def close(self) -> None:
+        pass
+
+
+class Judge0Backend(ExecutionBackend):
+    """
+    Remote execution on Judge0 (app.services.judge0_client).
+    """
+
+    name = "judge0"
+    supports_callbacks = True
+
+    def runtime(self) -> str:
+        from app.services.judge0_client import DEFAULT_LANGUAGE_ID
+
+        # A Judge0 language id names one language version (71 = Python 3.8.1)
+        return f"language-{getattr(settings, 'judge0_language_id', DEFAULT_LANGUAGE_ID)}"
+
+    def submit(self, item: Dict[str, Any]) -> str:
+        from app.services.judge0_client import submit_code
+
+        return submit_code(item["source_code"], stdin=item.get("stdin"), limits=item.get("limits"))
+
+    def poll(self, token: str, timeout_seconds: Optional[float] = None) -> dict:
+        from app.services.judge0_client import poll_result
+
+        return poll_result(token, timeout_seconds=timeout_seconds)
+
+    def submit_batch(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        from app.services.judge0_client import submit_batch
+
+        return submit_batch(items)
+
+    def poll_batch(self, tokens: List[Optional[str]], timeout_seconds: Optional[float] = None) -> List[dict]:
+        from app.services.judge0_client import poll_batch
+
+        return poll_batch(tokens, timeout_seconds=timeout_seconds)
+
+    def fetch_batch(self, tokens: List[Optional[str]]) -> List[Optional[dict]]:
+        from app.services.judge0_client import fetch_batch
+
+        return fetch_batch(tokens)
+
+    def execute_batch(self, items: List[Dict[str, Any]]) -> List[dict]:
+        """
+        Uses the Judge0 batch endpoints by default so all executions run
+        concurrently on Judge0. Without batch support (disabled, or a batch
+        request fails) the executions without a result are submitted and
+        polled at the same time through the async client, bounded by
+        JUDGE0_MAX_CONCURRENCY; those the batch already ran are kept.
+        """
+        from app.services.judge0_async import run_concurrently
+        from app.services.judge0_client import Judge0ClientError, Judge0PartialError, execute_batch
+
+        if not items:
+            return []
+
+        done: List[dict] = []
+        if getattr(settings, "judge0_batch_enabled", True):
+            try:
+                return execute_batch(items)
+            except Judge0ClientError as e:
+                if isinstance(e, Judge0PartialError):
+                    done = e.completed
+                logger.warning(
+                    "Judge0 batch execution failed after %s of %s execution(s), falling back to concurrent: %s",
+                    len(done),
+                    len(items),
+                    e,
+                )
+
+        return done + (run_concurrently(items[len(done):]) if len(done) < len(items) else [])
+
+
+# -------------------------
+# Backend selection (one instance per worker process)
+# -------------------------
+_backend: Optional[ExecutionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend(name: str) -> ExecutionBackend:
+    if name == "judge0":
+        return Judge0Backend()
+    if name == "local":
+        from app.services.local_sandbox import LocalSandboxBackend
+
+        return LocalSandboxBackend()
+    raise ValueError(f"Unknown EXECUTION_BACKEND: {name}")
+
+
+def get_backend() -> ExecutionBackend:
+    """
+    The execution backend configured by EXECUTION_BACKEND (judge0 | local).
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend(getattr(settings, "execution_backend", "judge0"))
+    return _backend
+
+
+def close_backend() -> None:
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            try:
+                _backend.close()
+            except Exception:
+                logger.exception("Error closing execution backend")
+        _backend = None
@@ -0,0 +1,84 @@
+# app/services/execution_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+from app.services.cache import TwoTierCache
+from app.services.execution_backend import get_backend
+
+settings = get_settings()
+
+# Only results that are a pure function of (code, stdin, limits) are cached.
+# Timeouts, internal errors and client-side failures ("failed") never are.
+CACHEABLE_STATUSES = {"Accepted", "Wrong Answer"}
+
+_cache = TwoTierCache(
+    namespace="exec",
+    ttl_seconds=getattr(settings, "execution_cache_ttl_seconds", 86400),
+    l1_size=getattr(settings, "execution_cache_l1_size", 1024),
+    use_redis=getattr(settings, "execution_cache_redis_enabled", True),
+)
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, "execution_cache_enabled", True))
+
+
+def cache_key(item: Dict[str, Any]) -> str:
+    """
+    Content address of one execution: source, stdin, every limit, and the
+    backend and language runtime that run it (see
+    ExecutionBackend.runtime). Delivery details (callback_url) are excluded.
+    """
+    backend = get_backend()
+    material = {k: v for k, v in item.items() if k != "callback_url"}
+    material["backend"] = backend.name
+    material["runtime"] = backend.runtime()
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(result: Optional[dict]) -> bool:
+    return bool(result) and result.get("status") in CACHEABLE_STATUSES
+
+
+def get_by_key(key: str) -> Optional[dict]:
+    if not _enabled():
+        return None
+    return _cache.get(key)
+
+
+def put_by_key(key: str, result: dict) -> None:
+    if _enabled() and is_cacheable(result):
+        _cache.set(key, result)
+
+
+def lookup_many(executions: List[Dict[str, Any]]) -> List[Optional[dict]]:
+    """
+    Cached results aligned with `executions` (None = miss).
+    """
+    return [get_by_key(cache_key(item)) for item in executions]
+
+
+def execute_with_cache(
+    executions: List[Dict[str, Any]],
+    run: Callable[[List[Dict[str, Any]]], List[dict]],
+) -> List[dict]:
+    """
+    Serve hits from the cache, run only the misses through `run`, store
+    deterministic results, and return everything in input order.
+    """
+    keys = [cache_key(item) for item in executions]
+    results: List[Optional[dict]] = [get_by_key(key) for key in keys]
+
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        fresh = run([executions[i] for i in misses])
+        for i, result in zip(misses, fresh):
+            results[i] = result
+            put_by_key(keys[i], result)
+
+    return results  # type: ignore[return-value]
@@ -0,0 +1,61 @@
+# app/services/execution_limits.py
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Judge0 submission fields an execution's "limits" dict may carry
+# (seconds for the time limits, KB for memory and output)
+LIMIT_FIELDS = ("cpu_time_limit", "wall_time_limit", "memory_limit", "max_file_size")
+
+
+def for_assignment(assignment: Any, case_count: int = 1) -> Dict[str, Any]:
+    """
+    Per-execution limits from the assignment's max_runtime_ms / max_memory_kb.
+
+    `case_count` > 1 is a batched driver execution running that many cases
+    back to back: time limits scale with it, memory does not. Values are
+    clamped to the Judge0 server maximums, which would otherwise reject the
+    submission.
+    """
+    case_count = max(1, int(case_count))
+    cpu = assignment.max_runtime_ms / 1000 * case_count
+    wall = cpu * float(getattr(settings, "judge0_wall_time_factor", 2.0))
+
+    return {
+        "cpu_time_limit": round(min(cpu, float(getattr(settings, "judge0_max_cpu_time_limit", 15.0))), 3),
+        "wall_time_limit": round(min(wall, float(getattr(settings, "judge0_max_wall_time_limit", 20.0))), 3),
+        "memory_limit": min(int(assignment.max_memory_kb), int(getattr(settings, "judge0_max_memory_limit", 512000))),
+        "max_file_size": int(getattr(settings, "judge0_max_output_kb", 1024)),
+    }
+
+
+def max_cases(assignment: Any) -> int:
+    """
+    How many cases a batched driver execution can run back to back before
+    its time limits (see for_assignment) would be clamped below what the
+    cases need. At least 1.
+    """
+    per_case = max(assignment.max_runtime_ms / 1000, 0.001)
+    cpu_cap = float(getattr(settings, "judge0_max_cpu_time_limit", 15.0))
+    wall_cap = float(getattr(settings, "judge0_max_wall_time_limit", 20.0))
+    wall_factor = max(float(getattr(settings, "judge0_wall_time_factor", 2.0)), 1e-6)
+    return max(1, int(min(cpu_cap / per_case, wall_cap / (per_case * wall_factor)) + 1e-9))
+
+
+def poll_deadline(limits: Iterable[Optional[Dict[str, Any]]]) -> float:
+    """
+    How long to wait for a set of executions: the longest wall time limit
+    among them plus JUDGE0_POLL_GRACE_SECONDS for queueing. Executions
+    without a wall time limit count as the global JUDGE0_POLL_TIMEOUT_SECONDS.
+    """
+    grace = float(getattr(settings, "judge0_poll_grace_seconds", 10.0))
+    default = float(getattr(settings, "judge0_poll_timeout_seconds", 15))
+    deadlines = [
+        float(item["wall_time_limit"]) + grace if item and item.get("wall_time_limit") else default
+        for item in limits
+    ]
+    return max(deadlines, default=default)
@@ -0,0 +1,184 @@
+# app/services/grading_bundle.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.models import Assignment, IOTestCase, StaticRule, UnitTestSpec
+from app.services.cache import LRUCache
+
+settings = get_settings()
+
+
+# -------------------------
+# Immutable snapshots of what grading reads
+# -------------------------
+@dataclass(frozen=True)
+class BundleAssignment:
+    id: int
+    weight_io: int
+    weight_unit: int
+    weight_static: int
+    max_runtime_ms: int
+    max_memory_kb: int
+    io_batched_driver: bool
+
+
+@dataclass(frozen=True)
+class BundleTestCase:
+    id: int
+    name: str
+    stdin: Optional[str]
+    expected_stdout: str
+    points: int
+    is_hidden: bool
+    input_version: int = 1
+
+
+@dataclass(frozen=True)
+class BundleUnitSpec:
+    id: int
+    name: str
+    test_code: str
+    points: int
+    is_hidden: bool
+    version: int = 1
+
+
+@dataclass(frozen=True)
+class BundleStaticRule:
+    id: int
+    required_functions: Tuple[str, ...]
+    forbidden_imports: Tuple[str, ...]
+    max_cyclomatic_complexity: Optional[int]
+    points: int
+    hard_gate: bool
+
+
+@dataclass(frozen=True)
+class GradingBundle:
+    """
+    Everything grading needs about one assignment at one grading_version.
+    """
+
+    version: int
+    assignment: BundleAssignment
+    test_cases: Tuple[BundleTestCase, ...]
+    unit_spec: Optional[BundleUnitSpec]
+    static_rule: Optional[BundleStaticRule]
+
+
+# Per worker process; keyed by (assignment_id, grading_version), so an edit
+# (which bumps the version) makes every older entry unreachable
+_bundles = LRUCache(maxsize=getattr(settings, "grading_bundle_cache_size", 256))
+
+
+def bump_grading_version(assignment: Assignment) -> None:
+    """
+    Call in the same transaction as any change to what grading reads
+    (tests, unit spec, static rule, limits, weights). Incremented in SQL,
+    so concurrent edits never collapse onto one version.
+    """
+    assignment.grading_version = Assignment.grading_version + 1
+
+
+def _current_version(db: Session, assignment_id: int) -> Optional[int]:
+    return (
+        db.query(Assignment.grading_version)
+        .filter(Assignment.id == assignment_id)
+        .scalar()
+    )
+
+
+def _load(db: Session, assignment_id: int) -> Optional[GradingBundle]:
+    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    if not assignment:
+        return None
+
+    test_cases = (
+        db.query(IOTestCase)
+        .filter(IOTestCase.assignment_id == assignment_id, IOTestCase.deleted_at.is_(None))
+        .order_by(IOTestCase.order_index.asc(), IOTestCase.id.asc())
+        .all()
+    )
+    unit_spec = db.query(UnitTestSpec).filter(UnitTestSpec.assignment_id == assignment_id).first()
+    rule = db.query(StaticRule).filter(StaticRule.assignment_id == assignment_id).first()
+
+    return GradingBundle(
+        version=assignment.grading_version,
+        assignment=BundleAssignment(
+            id=assignment.id,
+            weight_io=assignment.weight_io,
+            weight_unit=assignment.weight_unit,
+            weight_static=assignment.weight_static,
+            max_runtime_ms=assignment.max_runtime_ms,
+            max_memory_kb=assignment.max_memory_kb,
+            io_batched_driver=assignment.io_batched_driver,
+        ),
+        test_cases=tuple(
+            BundleTestCase(
+                id=tc.id,
+                name=tc.name,
+                stdin=tc.stdin,
+                expected_stdout=tc.expected_stdout,
+                points=tc.points,
+                is_hidden=tc.is_hidden,
+                input_version=tc.input_version,
+            )
+            for tc in test_cases
+        ),
+        unit_spec=(
+            BundleUnitSpec(
+                id=unit_spec.id,
+                name=unit_spec.name,
+                test_code=unit_spec.test_code,
+                points=unit_spec.points,
+                is_hidden=unit_spec.is_hidden,
+                version=unit_spec.version,
+            )
+            if unit_spec
+            else None
+        ),
+        static_rule=(
+            BundleStaticRule(
+                id=rule.id,
+                required_functions=tuple(rule.required_functions or ()),
+                forbidden_imports=tuple(rule.forbidden_imports or ()),
+                max_cyclomatic_complexity=rule.max_cyclomatic_complexity,
+                points=rule.points,
+                hard_gate=rule.hard_gate,
+            )
+            if rule
+            else None
+        ),
+    )
+
+
+def get_bundle(db: Session, assignment_id: int) -> Optional[GradingBundle]:
+    """
+    The assignment's grading bundle at its current grading_version (None if
+    the assignment does not exist). One indexed lookup on a hit.
+
+    A bundle is only cached if the version did not move while it was being
+    loaded, so a concurrent edit can never leave stale tests under a newer
+    key.
+    """
+    version = _current_version(db, assignment_id)
+    if version is None:
+        return None
+
+    bundle = _bundles.get((assignment_id, version))
+    if bundle is not None:
+        return bundle
+
+    bundle = _load(db, assignment_id)
+    if bundle is not None and _current_version(db, assignment_id) == bundle.version:
+        _bundles.set((assignment_id, bundle.version), bundle)
+    return bundle
+
+
+def clear() -> None:
+    _bundles.clear()
@@ -0,0 +1,257 @@
+# app/services/io_driver.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+from typing import List, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# The harness is plain Python run as the submission's single execution.
+# Per case it gives the student program a fresh __main__ module, its own
+# stdin/stdout/stderr and an interval timer. The case's input is a real
+# file on fd 0 (an unlinked file in the working directory), so input(),
+# sys.stdin.buffer and open(0) all behave as in a per-case run; output is
+# captured in memory behind text streams that keep their .buffer.
+#
+# The hidden inputs and the record delimiter are never in the source (Judge0
+# leaves it readable to the program) nor reachable from student code: they
+# arrive on stdin, which is then swapped for /dev/null, and live only in a
+# keeper thread's locals. The keeper hands the main thread one input at a
+# time and writes each case's delimited JSON record itself, numbering them.
+# The student runs in the main thread (for the timer signal), whose frames
+# hold nothing hidden; an audit hook denies reaching other threads' frames
+# or arbitrary objects (sys._current_frames, gc). The delimiter is an HMAC
+# keyed by a server secret, so it cannot be guessed either.
+# Kept free of f-strings: values are substituted with .replace().
+_HARNESS_TEMPLATE = r'''
+import base64 as __b64, builtins as __builtins, io as __io, json as __json, os as __os
+import queue as __queue, signal as __signal, sys as __sys, threading as __threading
+import time as __time, traceback as __tb, types as __types
+
+__SOURCE = __b64.b64decode("__SOURCE_B64__").decode("utf-8")
+__CASE_TIMEOUT = __CASE_TIMEOUT_VALUE__
+
+__DENIED_EVENTS = frozenset(
+    ["sys._current_frames", "sys._current_exceptions", "gc.get_objects", "gc.get_referrers", "gc.get_referents"]
+)
+
+
+def __audit(event, args):
+    if event in __DENIED_EVENTS:
+        raise PermissionError(event + " is not allowed")
+
+
+if hasattr(__sys, "addaudithook"):
+    __sys.addaudithook(__audit)
+
+
+class __CaseTimeout(BaseException):
+    pass
+
+
+def __on_alarm(signum, frame):
+    raise __CaseTimeout()
+
+
+__signal.signal(__signal.SIGALRM, __on_alarm)
+
+try:
+    __code = compile(__SOURCE, "main.py", "exec")
+    __compile_error = None
+except BaseException:
+    __code = None
+    __compile_error = __tb.format_exc()
+
+__inputs = __queue.Queue()
+__records = __queue.Queue()
+
+
+def __keeper():
+    payload = __json.loads(__b64.b64decode(__sys.stdin.buffer.read()).decode("utf-8"))
+    __onto_fd0(__os.open(__os.devnull, __os.O_RDONLY))
+    delim, cases = payload["delim"], payload["cases"]
+    payload = None
+    out = __sys.stdout
+    try:
+        for i in range(len(cases)):
+            __inputs.put(cases[i])
+            cases[i] = None
+            record = dict(__records.get(), case=i)
+            out.write("\n" + delim + __json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        __inputs.put(None)
+
+
+class __Capture(__io.BytesIO):
+    def close(self):
+        pass  # keep the output readable if the program closes the stream
+
+
+def __text(raw):
+    return __io.TextIOWrapper(raw, encoding="utf-8", errors="replace", write_through=True)
+
+
+def __onto_fd0(fd):
+    # fd is already 0 when the program closed fd 0 (e.g. open(0) collected)
+    if fd != 0:
+        __os.dup2(fd, 0)
+        __os.close(fd)
+
+
+def __stdin_on_fd0(stdin):
+    name = ".stdin-" + __os.urandom(8).hex()
+    fd = __os.open(name, __os.O_RDWR | __os.O_CREAT | __os.O_EXCL, 0o600)
+    __os.unlink(name)
+    __os.write(fd, stdin.encode("utf-8"))
+    __os.lseek(fd, 0, 0)
+    __onto_fd0(fd)
+
+
+def __run_case(stdin):
+    module = __types.ModuleType("__main__")
+    module.__builtins__ = __builtins
+    __sys.modules["__main__"] = module
+    __stdin_on_fd0(stdin)
+    stdin = None
+    out_raw, err_raw = __Capture(), __Capture()
+    out, err = __text(out_raw), __text(err_raw)
+    __sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    __sys.stdout, __sys.stderr = out, err
+    status = "Accepted"
+    wall0, cpu0 = __time.perf_counter(), __time.process_time()
+    try:
+        if __code is None:
+            err.write(__compile_error)
+            status = "Runtime Error (NZEC)"
+        else:
+            __signal.setitimer(__signal.ITIMER_REAL, __CASE_TIMEOUT)
+            try:
+                exec(__code, module.__dict__)
+            finally:
+                __signal.setitimer(__signal.ITIMER_REAL, 0)
+    except __CaseTimeout:
+        status = "Time Limit Exceeded"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            if not isinstance(e.code, int):
+                err.write(str(e.code) + "\n")
+            status = "Runtime Error (NZEC)"
+    except BaseException:
+        __tb.print_exc(file=err)
+        status = "Runtime Error (NZEC)"
+    finally:
+        for stream in (out, err):
+            try:
+                stream.flush()
+            except BaseException:
+                pass
+        __sys.stdin, __sys.stdout, __sys.stderr = __sys.__stdin__, __sys.__stdout__, __sys.__stderr__
+        __onto_fd0(__os.open(__os.devnull, __os.O_RDONLY))
+    return {
+        "stdout": out_raw.getvalue().decode("utf-8", "replace"),
+        "stderr": err_raw.getvalue().decode("utf-8", "replace"),
+        "status": status,
+        "time": "%.3f" % (__time.process_time() - cpu0),
+        "wall": round(__time.perf_counter() - wall0, 4),
+    }
+
+
+__threading.Thread(target=__keeper, daemon=True).start()
+while True:
+    __stdin = __inputs.get()
+    if __stdin is None:
+        break
+    __records.put(__run_case(__stdin))
+'''
+
+
+def _b64(value: str) -> str:
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def driver_delimiter(student_code: str, stdins: List[Optional[str]]) -> str:
+    """
+    Record prefix for one harness: an HMAC of the code and inputs under the
+    server secret, so student code cannot guess it. Deterministic, so
+    identical runs share an execution cache entry.
+    """
+    material = json.dumps([student_code, [s or "" for s in stdins]])
+    key = ("io-driver:" + settings.jwt_secret_key).encode("utf-8")
+    return "@@CASE-" + hmac.new(key, material.encode("utf-8"), hashlib.sha256).hexdigest()[:32] + "@@"
+
+
+def build_driver(student_code: str, stdins: List[Optional[str]], case_timeout_seconds: float = 2.0) -> dict:
+    """
+    One execution that runs `student_code` once per stdin, in a fresh
+    namespace with its own stdin and per-case timeout. The inputs and the
+    delimiter go in the execution's stdin, not its source.
+    """
+    source = (
+        _HARNESS_TEMPLATE.replace("__SOURCE_B64__", _b64(student_code))
+        .replace("__CASE_TIMEOUT_VALUE__", repr(float(case_timeout_seconds)))
+    )
+    payload = {"delim": driver_delimiter(student_code, stdins), "cases": [s or "" for s in stdins]}
+    return {"source_code": source, "stdin": _b64(json.dumps(payload))}
+
+
+def parse_driver_output(result: dict, delimiter: str, case_count: int) -> List[dict]:
+    """
+    Split the harness's output into one result per case (same shape as the
+    Judge0 client's). Cases without a record - the whole harness was killed
+    (time/memory limit) or crashed - fail, with the harness's own status
+    and stderr in the message.
+
+    Records must come in case order, at most one per case; anything else
+    means the output was tampered with and every case fails.
+    """
+    records: List[dict] = []
+    tampered = False
+    for line in (result.get("stdout") or "").splitlines():
+        if not line.startswith(delimiter):
+            continue
+        try:
+            record = json.loads(line[len(delimiter):])
+            case = int(record["case"])
+        except (ValueError, KeyError, TypeError):
+            tampered = True
+            break
+        if case != len(records) or case >= case_count:
+            tampered = True
+            break
+        records.append(record)
+
+    harness_status = result.get("status") or "Unknown"
+    if tampered:
+        records = []
+        harness_status = "records out of order or duplicated"
+    results = []
+    for i in range(case_count):
+        record = records[i] if i < len(records) else None
+        if record is None:
+            results.append(
+                {
+                    "stdout": "",
+                    "stderr": f"Batched driver did not report this case ({harness_status}). "
+                    + (result.get("stderr") or ""),
+                    "status": "failed",
+                    "time": None,
+                    "memory": None,
+                }
+            )
+            continue
+        results.append(
+            {
+                "stdout": record.get("stdout") or "",
+                "stderr": record.get("stderr") or "",
+                "status": record.get("status") or "Unknown",
+                "time": record.get("time"),
+                "memory": result.get("memory"),  # only known for the whole run
+            }
+        )
+    return results
@@ -0,0 +1,266 @@
+# app/services/judge0_async.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.services import execution_limits, judge0_governor, judge0_pool, judge0_resilience
+from app.services.judge0_client import (
+    DEFAULT_MAX_INTERVAL_SECONDS,
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    DEFAULT_TIMEOUT_SECONDS,
+    Judge0ClientError,
+    _POLL_FIELDS,
+    _PROCESSING_STATUS_IDS,
+    _failure_result,
+    _headers,
+    _parse_status,
+    _structured_result,
+    _submission_payload,
+    _timeout_message,
+)
+from app.services.judge0_pool import Judge0Node
+
+settings = get_settings()
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class AsyncJudge0Client:
+    """
+    asyncio counterpart of app.services.judge0_client.
+
+    Same request/response shapes as submit_code / poll_result, but many
+    executions can be in flight at once on a single event loop.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                float(getattr(settings, "judge0_read_timeout_seconds", 10.0)),
+                connect=float(getattr(settings, "judge0_connect_timeout_seconds", 5.0)),
+            ),
+            limits=httpx.Limits(
+                max_connections=int(getattr(settings, "judge0_pool_max_connections", 20)),
+                max_keepalive_connections=int(getattr(settings, "judge0_pool_max_keepalive", 10)),
+            ),
+        )
+
+    async def __aenter__(self) -> "AsyncJudge0Client":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        node: Optional[Judge0Node] = None,
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, Judge0Node]:
+        """
+        Async twin of judge0_client._request: circuit breaker, node routing,
+        rate limiter, classified retries with jittered backoff. The
+        Redis-backed pieces and health probes are blocking, so they run off
+        the event loop.
+        """
+        breaker = judge0_resilience.breaker
+        gated = judge0_resilience.gated_by_breaker(method)
+        if gated and not await asyncio.to_thread(breaker.allow_request):
+            raise Judge0ClientError("Judge0 circuit breaker is open")
+
+        tried: List[Judge0Node] = []
+        attempts = judge0_resilience.max_attempts()
+        for attempt in range(1, attempts + 1):
+            target = node or await asyncio.to_thread(judge0_pool.pick, tried)
+            if target is None:
+                raise Judge0ClientError("No Judge0 endpoint is configured")
+            tried.append(target)
+
+            try:
+                await asyncio.to_thread(judge0_governor.throttle)
+            except judge0_governor.Judge0CapacityError as e:
+                raise Judge0ClientError(str(e)) from e
+
+            judge0_pool.begin(target)
+            try:
+                r = await self._client.request(method, target.url(path), headers=_headers(), **kwargs)
+            except httpx.TransportError as e:
+                judge0_pool.finish(target, ok=False, error=str(e))
+                await asyncio.to_thread(breaker.record_failure)
+                if (
+                    attempt < attempts
+                    and judge0_resilience.is_retryable_exception(method, e)
+                    and not (gated and await asyncio.to_thread(breaker.is_open))
+                ):
+                    await asyncio.sleep(judge0_resilience.backoff_delay(attempt))
+                    continue
+                raise
+
+            failed = judge0_resilience.counts_as_failure(r)
+            judge0_pool.finish(target, ok=not failed, error=f"HTTP {r.status_code}")
+            if failed:
+                await asyncio.to_thread(breaker.record_failure)
+            else:
+                await asyncio.to_thread(breaker.record_success)
+
+            if (
+                attempt < attempts
+                and judge0_resilience.is_retryable_response(method, r)
+                and not (gated and await asyncio.to_thread(breaker.is_open))
+            ):
+                await asyncio.sleep(judge0_resilience.backoff_delay(attempt, r))
+                continue
+            return r, target
+
+        raise Judge0ClientError("Judge0 retries exhausted")  # unreachable
+
+    async def submit(
+        self,
+        source_code: str,
+        stdin: str | None = None,
+        limits: Dict[str, Any] | None = None,
+    ) -> str:
+        """
+        POST /submissions and return the (composite) execution token.
+        """
+        try:
+            r, node = await self._request(
+                "POST",
+                "/submissions?base64_encoded=true&wait=false",
+                json=_submission_payload(source_code, stdin, limits=limits),
+            )
+            r.raise_for_status()
+            data = r.json()
+        except httpx.HTTPError as e:
+            raise Judge0ClientError(f"HTTP error submitting to Judge0: {e}") from e
+        except ValueError as e:
+            raise Judge0ClientError("Invalid JSON response from Judge0 (submit)") from e
+
+        token = data.get("token")
+        if not token or not isinstance(token, str):
+            raise Judge0ClientError(f"Judge0 submit returned no token: {data}")
+
+        return judge0_pool.compose_token(node, token)
+
+    async def poll(self, token: str, timeout_seconds: float | None = None) -> dict:
+        """
+        Poll /submissions/{token} until completion or timeout.
+        Never raises; failures come back as structured "failed" results.
+        """
+        node, raw_token = judge0_pool.resolve_token(token)
+        if node is None:
+            return _failure_result("Judge0 node for this token is no longer configured")
+
+        if timeout_seconds is None:
+            timeout_seconds = getattr(settings, "judge0_poll_timeout_seconds", DEFAULT_TIMEOUT_SECONDS)
+        poll_interval = getattr(settings, "judge0_poll_interval_seconds", DEFAULT_POLL_INTERVAL_SECONDS)
+        max_interval = getattr(settings, "judge0_poll_max_interval_seconds", DEFAULT_MAX_INTERVAL_SECONDS)
+
+        path = f"/submissions/{raw_token}?base64_encoded=true&fields={_POLL_FIELDS}"
+
+        start = time.monotonic()
+        interval = float(poll_interval)
+        last_error: Optional[str] = None
+
+        try:
+            while True:
+                if (time.monotonic() - start) > float(timeout_seconds):
+                    return _failure_result(_timeout_message(last_error))
+
+                try:
+                    r, _ = await self._request("GET", path, node=node)
+                except httpx.HTTPError as e:
+                    r, last_error = None, f"HTTP error polling Judge0: {e}"
+                if r is not None and r.status_code == 404:
+                    return _failure_result("Judge0 token not found (404)")
+                if r is not None and r.status_code >= 500:
+                    r, last_error = None, f"Judge0 server error ({r.status_code})"
+                if r is None:
+                    # The token is still valid; retry until the deadline
+                    await asyncio.sleep(interval)
+                    interval = min(interval * 1.25, max_interval)
+                    continue
+                if r.status_code >= 400:
+                    return _failure_result(f"Judge0 HTTP error ({r.status_code})")
+
+                data = r.json()
+
+                status = _parse_status(data)
+                if status is None:
+                    return _failure_result("Unexpected Judge0 response structure (missing status)")
+
+                if status.get("id") in _PROCESSING_STATUS_IDS:
+                    await asyncio.sleep(interval)
+                    interval = min(interval * 1.25, max_interval)  # gentle backoff
+                    continue
+
+                return _structured_result(data, base64_encoded=True)
+
+        except httpx.HTTPError as e:
+            return _failure_result(f"HTTP error polling Judge0: {e}")
+        except ValueError:
+            return _failure_result("Invalid JSON response from Judge0 (poll)")
+
+    async def execute(self, item: Dict[str, Any]) -> dict:
+        limits = item.get("limits")
+        token = await self.submit(item["source_code"], stdin=item.get("stdin"), limits=limits)
+        return await self.poll(token, timeout_seconds=execution_limits.poll_deadline([limits]))
+
+
+async def execute_concurrently(
+    executions: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+) -> List[dict]:
+    """
+    Submit and poll every execution at the same time, with at most
+    `max_concurrency` in flight. Results are returned in input order.
+
+    A failure in one execution only affects that execution's result.
+    """
+    if not executions:
+        return []
+
+    limit = max_concurrency or getattr(settings, "judge0_max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, int(limit)))
+
+    async with AsyncJudge0Client() as client:
+
+        async def _run(item: Dict[str, Any]) -> dict:
+            async with semaphore:
+                leases: List[str] = []
+                try:
+                    # Cluster-wide in-flight slot, on top of the local bound
+                    leases = await asyncio.to_thread(judge0_governor.acquire, 1)
+                    return await client.execute(item)
+                except Exception as e:
+                    # Controlled failure for this execution only
+                    return {
+                        "stdout": "",
+                        "stderr": f"Execution failed: {e}",
+                        "status": "failed",
+                        "time": None,
+                        "memory": None,
+                    }
+                finally:
+                    if leases:
+                        await asyncio.to_thread(judge0_governor.release, leases)
+
+        return list(await asyncio.gather(*(_run(item) for item in executions)))
+
+
+def run_concurrently(executions: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> List[dict]:
+    """
+    Sync entry point for Celery tasks.
+    """
+    return asyncio.run(execute_concurrently(executions, max_concurrency=max_concurrency))
@@ -0,0 +1,114 @@
+# app/services/judge0_callbacks.py
+from __future__ import annotations
+
+import hashlib
+import hmac
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.models import PendingExecution
+from app.services import judge0_pool
+from app.services.judge0_client import (
+    _PROCESSING_STATUS_IDS,
+    _parse_status,
+    _structured_result,
+)
+
+settings = get_settings()
+
+
+def _signature(grading_run_id: int) -> str:
+    """
+    HMAC of the grading run id, so only URLs we handed to Judge0 are accepted.
+    """
+    message = f"grading-run:{grading_run_id}".encode("utf-8")
+    return hmac.new(settings.jwt_secret_key.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(grading_run_id: int, signature: str) -> bool:
+    return hmac.compare_digest(_signature(grading_run_id), signature or "")
+
+
+def callback_url_for(grading_run_id: int, position: int) -> str:
+    """
+    Public URL Judge0 PUTs the finished execution to.
+    """
+    base_url = (getattr(settings, "judge0_callback_base_url", None) or "").rstrip("/")
+    return (
+        f"{base_url}/judge0/callbacks/{grading_run_id}/{position}"
+        f"?signature={_signature(grading_run_id)}"
+    )
+
+
+def _same_execution(stored: Optional[str], token: Optional[str], node_id: Optional[str]) -> bool:
+    """
+    Whether a callback's token is the one dispatched for the row. Callback
+    URLs issued without a node name are matched on the raw Judge0 token.
+    """
+    if not stored or not token:
+        return True
+    if node_id:
+        return stored == token
+    return judge0_pool.resolve_token(stored)[1] == token
+
+
+def record_execution_result(
+    db: Session,
+    grading_run_id: int,
+    position: int,
+    payload: dict,
+    node_id: Optional[str] = None,
+) -> Optional[bool]:
+    """
+    Store a Judge0 callback payload on its PendingExecution row.
+
+    `node_id` (from the callback URL) names the Judge0 node that ran it, so
+    the payload's raw token is qualified into the composite token the
+    dispatcher stores (see judge0_pool). A callback whose token does not
+    match the row's is not recorded.
+
+    Returns None if the row does not exist, otherwise whether every
+    execution of the grading run has now reported. Repeated callbacks
+    for the same execution are ignored.
+    """
+    row = (
+        db.query(PendingExecution)
+        .filter(
+            PendingExecution.grading_run_id == grading_run_id,
+            PendingExecution.position == position,
+        )
+        .with_for_update()
+        .first()
+    )
+    if row is None:
+        return None
+
+    raw_token = payload.get("token") if isinstance(payload.get("token"), str) else None
+    token = judge0_pool.qualify_token(node_id, raw_token) if raw_token else None
+    status = _parse_status(payload)
+    if (
+        row.completed_at is None
+        and status is not None
+        and status.get("id") not in _PROCESSING_STATUS_IDS
+        and _same_execution(row.token, token, node_id)
+    ):
+        # Judge0 always base64-encodes text fields in callback bodies
+        row.result = _structured_result(payload, base64_encoded=True)
+        row.completed_at = func.now()
+        if not row.token and token:
+            # Callback can beat the dispatcher writing the token back
+            row.token = token
+    db.commit()
+
+    remaining = (
+        db.query(func.count(PendingExecution.id))
+        .filter(
+            PendingExecution.grading_run_id == grading_run_id,
+            PendingExecution.completed_at.is_(None),
+        )
+        .scalar()
+    )
+    return remaining == 0
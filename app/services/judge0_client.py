@@ -1,15 +1,25 @@
 # app/services/judge0_client.py
 from __future__ import annotations
 
+import base64
+import binascii
+import importlib.util
+import logging
+import os
+import threading
 import time
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, List, Tuple
 
 import httpx
 
 from app.config import get_settings
+from app.services import execution_limits, judge0_governor, judge0_pool, judge0_resilience
+from app.services.judge0_pool import Judge0Node
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
 # Judge0 status IDs:
 # 1: In Queue, 2: Processing, >=3: Done (Accepted/WA/CE/etc)
 _PROCESSING_STATUS_IDS = {1, 2}
@@ -18,18 +28,114 @@ DEFAULT_LANGUAGE_ID = 71  # Python (Judge0)
 DEFAULT_TIMEOUT_SECONDS = 10
 DEFAULT_POLL_INTERVAL_SECONDS = 0.8
 DEFAULT_MAX_INTERVAL_SECONDS = 2.0
+DEFAULT_BATCH_MAX_SIZE = 20  # Judge0 MAX_SUBMISSION_BATCH_SIZE default
+
+# Only what the grader reads; the default GET also returns source_code,
+# stdin, expected_output etc., re-downloaded on every poll.
+_POLL_FIELDS = "stdout,stderr,status,time,memory"
+# Batch GET needs "token" to match results back to submissions
+_BATCH_POLL_FIELDS = f"token,{_POLL_FIELDS}"
 
 
 class Judge0ClientError(Exception):
     """Non-fatal client error (network, parsing, server errors)."""
 
 
+class Judge0PartialError(Judge0ClientError):
+    """
+    A batch call that failed part way. `completed` holds what the items
+    before the failure produced (tokens for submit_batch, results for
+    execute_batch): a prefix aligned with the request.
+    """
+
+    def __init__(self, message: str, completed: List[Any]):
+        super().__init__(message)
+        self.completed = completed
+
+
+# -------------------------
+# Pooled HTTP session (one per worker process)
+# -------------------------
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    if not getattr(settings, "judge0_http2", False):
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("JUDGE0_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def init_client() -> httpx.Client:
+    """
+    Create the long-lived, keep-alive Judge0 HTTP client for this process.
+
+    Called from the Celery worker_process_init signal so each forked worker
+    owns its own connection pool (connections must never be shared across fork).
+    """
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            return _client
+
+        read_timeout = float(getattr(settings, "judge0_read_timeout_seconds", 10.0))
+        timeout = httpx.Timeout(
+            read_timeout,
+            connect=float(getattr(settings, "judge0_connect_timeout_seconds", 5.0)),
+            pool=float(getattr(settings, "judge0_pool_timeout_seconds", 5.0)),
+        )
+        limits = httpx.Limits(
+            max_connections=int(getattr(settings, "judge0_pool_max_connections", 20)),
+            max_keepalive_connections=int(getattr(settings, "judge0_pool_max_keepalive", 10)),
+            keepalive_expiry=float(getattr(settings, "judge0_keepalive_expiry_seconds", 30.0)),
+        )
+
+        _client = httpx.Client(timeout=timeout, limits=limits, http2=_http2_enabled())
+        _client_pid = os.getpid()
+        return _client
+
+
+def get_client() -> httpx.Client:
+    """
+    Return this process's pooled client, creating it lazily
+    (e.g. under --pool=solo where worker_process_init never fires).
+    """
+    if _client is None or _client_pid != os.getpid():
+        return init_client()
+    return _client
+
+
+def close_client() -> None:
+    """
+    Close the pooled client. Called from the worker_process_shutdown signal.
+    """
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            try:
+                _client.close()
+            except Exception:
+                logger.exception("Error closing Judge0 HTTP client")
+        _client = None
+        _client_pid = None
+
+
 def _headers() -> Dict[str, str]:
     """
     Uses RapidAPI headers if present.
     If you later move to self-hosted Judge0 CE, adjust headers here.
     """
-    headers = {"Content-Type": "application/json"}
+    headers = {
+        "Content-Type": "application/json",
+        # Large stdout compresses well; httpx decodes transparently
+        "Accept-Encoding": "gzip, deflate",
+    }
 
     api_key = getattr(settings, "judge0_api_key", None)
     rapid_host = getattr(settings, "judge0_rapidapi_host", None)
@@ -42,30 +148,140 @@ def _headers() -> Dict[str, str]:
     return headers
 
 
-def submit_code(source_code: str, stdin: str | None = None) -> str:
+def _request(
+    method: str,
+    path: str,
+    node: Optional[Judge0Node] = None,
+    json_for: Optional[Callable[[Judge0Node], Any]] = None,
+    **kwargs: Any,
+) -> Tuple[httpx.Response, Judge0Node]:
+    """
+    Single choke point for every HTTP call to Judge0:
+    - submissions refused outright while the shared circuit breaker is
+      open; polls of accepted tokens still go through
+    - routed to the least-loaded healthy node, or pinned to `node`
+      (polls must go to the node that issued the token)
+    - waits for the cluster-wide rate limiter
+    - retries 429/5xx/connect failures with jittered exponential backoff
+      (POSTs only when the request provably did not create anything);
+      unpinned calls fail over to another node on retry; `json_for` builds
+      the body for the node each attempt goes to
+
+    Returns the last response and the node that served it; callers handle
+    non-2xx. Transport errors that survive all retries are re-raised as
+    httpx errors.
+    """
+    breaker = judge0_resilience.breaker
+    gated = judge0_resilience.gated_by_breaker(method)
+    if gated and not breaker.allow_request():
+        raise Judge0ClientError("Judge0 circuit breaker is open")
+
+    tried: List[Judge0Node] = []
+    attempts = judge0_resilience.max_attempts()
+    for attempt in range(1, attempts + 1):
+        target = node or judge0_pool.pick(exclude=tried)
+        if target is None:
+            raise Judge0ClientError("No Judge0 endpoint is configured")
+        tried.append(target)
+
+        try:
+            judge0_governor.throttle()
+        except judge0_governor.Judge0CapacityError as e:
+            raise Judge0ClientError(str(e)) from e
+
+        request_kwargs = kwargs if json_for is None else {**kwargs, "json": json_for(target)}
+        judge0_pool.begin(target)
+        try:
+            r = get_client().request(method, target.url(path), headers=_headers(), **request_kwargs)
+        except httpx.TransportError as e:
+            judge0_pool.finish(target, ok=False, error=str(e))
+            breaker.record_failure()
+            if (
+                attempt < attempts
+                and judge0_resilience.is_retryable_exception(method, e)
+                and not (gated and breaker.is_open())
+            ):
+                time.sleep(judge0_resilience.backoff_delay(attempt))
+                continue
+            raise
+
+        failed = judge0_resilience.counts_as_failure(r)
+        judge0_pool.finish(target, ok=not failed, error=f"HTTP {r.status_code}")
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if (
+            attempt < attempts
+            and judge0_resilience.is_retryable_response(method, r)
+            and not (gated and breaker.is_open())
+        ):
+            logger.info("Retrying Judge0 %s %s after HTTP %s", method, path, r.status_code)
+            time.sleep(judge0_resilience.backoff_delay(attempt, r))
+            continue
+        return r, target
+
+    raise Judge0ClientError("Judge0 retries exhausted")  # unreachable
+
+
+def _b64encode(value: str) -> str:
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def _node_callback_url(callback_url: str | None, node: Judge0Node) -> str | None:
+    """
+    `callback_url` naming the node the submission goes to, so the callback
+    can store the same composite token the dispatcher does.
     """
-    Send POST request to Judge0 /submissions and return execution token.
+    if not callback_url:
+        return callback_url
+    sep = "&" if "?" in callback_url else "?"
+    return f"{callback_url}{sep}node={node.node_id}"
+
+
+def _submission_payload(
+    source_code: str,
+    stdin: str | None = None,
+    callback_url: str | None = None,
+    limits: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
     """
-    base_url = getattr(settings, "judge0_base_url", None)
-    if not base_url:
-        raise Judge0ClientError("JUDGE0_BASE_URL is not configured")
+    Request body for POST /submissions(/batch). Text fields are base64
+    encoded: every call is made with base64_encoded=true so arbitrary
+    bytes in programs' output never break Judge0's JSON rendering.
 
+    `limits` (see execution_limits) override Judge0's default CPU/wall
+    time, memory and output size limits for this execution.
+    """
     language_id = getattr(settings, "judge0_language_id", DEFAULT_LANGUAGE_ID)
 
-    url = f"{base_url.rstrip('/')}/submissions?base64_encoded=false&wait=false"
-
     payload: Dict[str, Any] = {
         "language_id": language_id,
-        "source_code": source_code,
+        "source_code": _b64encode(source_code),
     }
     if stdin is not None:
-        payload["stdin"] = stdin
+        payload["stdin"] = _b64encode(stdin)
+    for field in execution_limits.LIMIT_FIELDS:
+        if limits and limits.get(field) is not None:
+            payload[field] = limits[field]
+    if callback_url:
+        # Judge0 PUTs the finished submission here instead of us polling
+        payload["callback_url"] = callback_url
+    return payload
+
+
+def submit_code(source_code: str, stdin: str | None = None, limits: Dict[str, Any] | None = None) -> str:
+    """
+    Send POST request to Judge0 /submissions and return execution token
+    (composite "<node_id>:<token>", see judge0_pool).
+    """
+    payload = _submission_payload(source_code, stdin, limits=limits)
 
     try:
-        with httpx.Client(timeout=10.0) as client:
-            r = client.post(url, json=payload, headers=_headers())
-            r.raise_for_status()
-            data = r.json()
+        r, node = _request("POST", "/submissions?base64_encoded=true&wait=false", json=payload)
+        r.raise_for_status()
+        data = r.json()
     except httpx.HTTPError as e:
         raise Judge0ClientError(f"HTTP error submitting to Judge0: {e}") from e
     except ValueError as e:
@@ -75,12 +291,19 @@ def submit_code(source_code: str, stdin: str | None = None) -> str:
     if not token or not isinstance(token, str):
         raise Judge0ClientError(f"Judge0 submit returned no token: {data}")
 
-    return token
+    return judge0_pool.compose_token(node, token)
+
+
+def _timeout_message(last_error: Optional[str]) -> str:
+    if last_error:
+        return f"Judge0 polling timeout exceeded (last error: {last_error})"
+    return "Judge0 polling timeout exceeded"
 
 
-def poll_result(token: str) -> dict:
+def poll_result(token: str, timeout_seconds: float | None = None) -> dict:
     """
-    Poll Judge0 /submissions/{token} until completion or timeout.
+    Poll Judge0 /submissions/{token} until completion or timeout
+    (`timeout_seconds`, default JUDGE0_POLL_TIMEOUT_SECONDS).
     Returns structured result dict:
     {
       "stdout": "...",
@@ -90,48 +313,57 @@ def poll_result(token: str) -> dict:
       "memory": "..."
     }
     """
-    base_url = getattr(settings, "judge0_base_url", None)
-    if not base_url:
-        return _failure_result("JUDGE0_BASE_URL is not configured")
+    node, raw_token = judge0_pool.resolve_token(token)
+    if node is None:
+        return _failure_result("Judge0 node for this token is no longer configured")
 
-    timeout_seconds = getattr(settings, "judge0_poll_timeout_seconds", DEFAULT_TIMEOUT_SECONDS)
+    if timeout_seconds is None:
+        timeout_seconds = getattr(settings, "judge0_poll_timeout_seconds", DEFAULT_TIMEOUT_SECONDS)
     poll_interval = getattr(settings, "judge0_poll_interval_seconds", DEFAULT_POLL_INTERVAL_SECONDS)
     max_interval = getattr(settings, "judge0_poll_max_interval_seconds", DEFAULT_MAX_INTERVAL_SECONDS)
 
-    url = f"{base_url.rstrip('/')}/submissions/{token}?base64_encoded=false"
+    path = f"/submissions/{raw_token}?base64_encoded=true&fields={_POLL_FIELDS}"
 
     start = time.time()
     interval = float(poll_interval)
+    last_error: Optional[str] = None
 
     try:
-        with httpx.Client(timeout=10.0) as client:
-            while True:
-                # timeout check
-                if (time.time() - start) > float(timeout_seconds):
-                    return _failure_result("Judge0 polling timeout exceeded")
-
-                r = client.get(url, headers=_headers())
-                # Handle invalid token or server errors gracefully
-                if r.status_code == 404:
-                    return _failure_result("Judge0 token not found (404)")
-                if r.status_code >= 500:
-                    return _failure_result(f"Judge0 server error ({r.status_code})")
-                if r.status_code >= 400:
-                    return _failure_result(f"Judge0 HTTP error ({r.status_code})")
+        while True:
+            # timeout check
+            if (time.time() - start) > float(timeout_seconds):
+                return _failure_result(_timeout_message(last_error))
+
+            try:
+                r, _ = _request("GET", path, node=node)
+            except httpx.HTTPError as e:
+                r, last_error = None, f"HTTP error polling Judge0: {e}"
+            # Handle invalid token gracefully; server errors are retried
+            # (with backoff) until the deadline, the token is still valid
+            if r is not None and r.status_code == 404:
+                return _failure_result("Judge0 token not found (404)")
+            if r is not None and r.status_code >= 500:
+                r, last_error = None, f"Judge0 server error ({r.status_code})"
+            if r is None:
+                time.sleep(interval)
+                interval = min(interval * 1.25, max_interval)
+                continue
+            if r.status_code >= 400:
+                return _failure_result(f"Judge0 HTTP error ({r.status_code})")
 
-                data = r.json()
+            data = r.json()
 
-                status = _parse_status(data)
-                if status is None:
-                    return _failure_result("Unexpected Judge0 response structure (missing status)")
+            status = _parse_status(data)
+            if status is None:
+                return _failure_result("Unexpected Judge0 response structure (missing status)")
 
-                status_id = status.get("id")
-                if status_id in _PROCESSING_STATUS_IDS:
-                    time.sleep(interval)
-                    interval = min(interval * 1.25, max_interval)  # gentle backoff
-                    continue
+            status_id = status.get("id")
+            if status_id in _PROCESSING_STATUS_IDS:
+                time.sleep(interval)
+                interval = min(interval * 1.25, max_interval)  # gentle backoff
+                continue
 
-                return _structured_result(data)
+            return _structured_result(data, base64_encoded=True)
 
     except httpx.HTTPError as e:
         return _failure_result(f"HTTP error polling Judge0: {e}")
@@ -142,6 +374,226 @@ def poll_result(token: str) -> dict:
         return _failure_result(f"Unexpected error polling Judge0: {e}")
 
 
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def submit_batch(submissions: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """
+    Send POST request(s) to Judge0 /submissions/batch and return tokens.
+
+    Each item is a dict with "source_code" and optional "stdin" / "callback_url"
+    / "limits".
+    The returned list is aligned with `submissions`; an item Judge0 rejected
+    (validation error) gets None instead of a token.
+
+    Raises Judge0PartialError (a Judge0ClientError) if a batch request
+    itself fails, carrying the tokens of the chunks already submitted.
+
+    Each chunk is routed independently, so a large batch spreads across
+    Judge0 nodes; tokens are composite "<node_id>:<token>".
+    """
+    batch_size = getattr(settings, "judge0_batch_max_size", DEFAULT_BATCH_MAX_SIZE)
+
+    tokens: List[Optional[str]] = []
+    try:
+        for chunk in _chunks(submissions, batch_size):
+            def body(node: Judge0Node, chunk: List[Dict[str, Any]] = chunk) -> Dict[str, Any]:
+                return {
+                    "submissions": [
+                        _submission_payload(
+                            item["source_code"],
+                            item.get("stdin"),
+                            callback_url=_node_callback_url(item.get("callback_url"), node),
+                            limits=item.get("limits"),
+                        )
+                        for item in chunk
+                    ]
+                }
+
+            r, node = _request("POST", "/submissions/batch?base64_encoded=true", json_for=body)
+            r.raise_for_status()
+            data = r.json()
+
+            if not isinstance(data, list) or len(data) != len(chunk):
+                raise Judge0ClientError(f"Unexpected Judge0 batch submit response: {data}")
+
+            for item in data:
+                token = item.get("token") if isinstance(item, dict) else None
+                if not token or not isinstance(token, str):
+                    logger.warning("Judge0 rejected batch item: %s", item)
+                    tokens.append(None)
+                    continue
+                tokens.append(judge0_pool.compose_token(node, token))
+    except Judge0ClientError as e:
+        raise Judge0PartialError(str(e), tokens) from e
+    except httpx.HTTPError as e:
+        raise Judge0PartialError(f"HTTP error submitting batch to Judge0: {e}", tokens) from e
+    except ValueError as e:
+        raise Judge0PartialError("Invalid JSON response from Judge0 (batch submit)", tokens) from e
+
+    return tokens
+
+
+def fetch_batch(tokens: List[Optional[str]]) -> List[Optional[dict]]:
+    """
+    One non-blocking pass over GET /submissions/batch: results aligned with
+    `tokens`, None for executions still queued/processing. A None token
+    yields a failure result.
+
+    Tokens are grouped by the Judge0 node that issued them; each group is
+    fetched from its own node.
+
+    Raises Judge0ClientError if Judge0 could not be asked (the caller
+    decides whether to retry later or give up).
+    """
+    results: List[Optional[dict]] = [None] * len(tokens)
+    by_node: Dict[str, List[int]] = {}
+    owners: Dict[str, Judge0Node] = {}
+    raw_tokens: List[Optional[str]] = [None] * len(tokens)
+    for i, token in enumerate(tokens):
+        if token is None:
+            results[i] = _failure_result("Judge0 rejected submission")
+            continue
+        node, raw_tokens[i] = judge0_pool.resolve_token(token)
+        if node is None:
+            results[i] = _failure_result("Judge0 node for this token is no longer configured")
+            continue
+        owners[node.node_id] = node
+        by_node.setdefault(node.node_id, []).append(i)
+
+    batch_size = getattr(settings, "judge0_batch_max_size", DEFAULT_BATCH_MAX_SIZE)
+
+    try:
+        for node_id, group in by_node.items():
+            for chunk in _chunks(group, batch_size):
+                params = {
+                    "tokens": ",".join(raw_tokens[i] for i in chunk),
+                    "base64_encoded": "true",
+                    "fields": _BATCH_POLL_FIELDS,
+                }
+                r, _ = _request("GET", "/submissions/batch", node=owners[node_id], params=params)
+                if r.status_code >= 500:
+                    raise Judge0ClientError(f"Judge0 server error ({r.status_code})")
+                if r.status_code >= 400:
+                    raise Judge0ClientError(f"Judge0 HTTP error ({r.status_code})")
+
+                items = (r.json() or {}).get("submissions") or []
+                by_token = {
+                    item.get("token"): item for item in items if isinstance(item, dict)
+                }
+
+                for i in chunk:
+                    data = by_token.get(raw_tokens[i])
+                    if data is None:
+                        results[i] = _failure_result("Judge0 token not found (batch)")
+                        continue
+
+                    status = _parse_status(data)
+                    if status is None:
+                        results[i] = _failure_result(
+                            "Unexpected Judge0 response structure (missing status)"
+                        )
+                        continue
+
+                    if status.get("id") not in _PROCESSING_STATUS_IDS:
+                        results[i] = _structured_result(data, base64_encoded=True)
+
+    except httpx.HTTPError as e:
+        raise Judge0ClientError(f"HTTP error polling Judge0: {e}") from e
+    except (ValueError, AttributeError) as e:
+        raise Judge0ClientError("Invalid JSON response from Judge0 (batch poll)") from e
+
+    return results
+
+
+def poll_batch(tokens: List[Optional[str]], timeout_seconds: float | None = None) -> List[dict]:
+    """
+    Poll Judge0 GET /submissions/batch?tokens=... until every token is done
+    or the poll timeout is reached (`timeout_seconds`, default
+    JUDGE0_POLL_TIMEOUT_SECONDS).
+
+    All pending tokens are polled together, so total wait is bounded by the
+    slowest execution rather than the sum of all of them.
+    Returns structured result dicts (same shape as poll_result) aligned with
+    `tokens`. A None token yields a failure result.
+    """
+    results: List[Optional[dict]] = [None] * len(tokens)
+
+    if timeout_seconds is None:
+        timeout_seconds = getattr(settings, "judge0_poll_timeout_seconds", DEFAULT_TIMEOUT_SECONDS)
+    poll_interval = getattr(settings, "judge0_poll_interval_seconds", DEFAULT_POLL_INTERVAL_SECONDS)
+    max_interval = getattr(settings, "judge0_poll_max_interval_seconds", DEFAULT_MAX_INTERVAL_SECONDS)
+
+    start = time.time()
+    interval = float(poll_interval)
+    last_error: Optional[str] = None
+
+    def _fill_pending(message: str) -> List[dict]:
+        return [r or _failure_result(message) for r in results]
+
+    try:
+        while True:
+            pending = [i for i, r in enumerate(results) if r is None]
+            if not pending:
+                return results  # type: ignore[return-value]
+
+            if (time.time() - start) > float(timeout_seconds):
+                return _fill_pending(_timeout_message(last_error))
+
+            try:
+                for i, result in zip(pending, fetch_batch([tokens[i] for i in pending])):
+                    results[i] = result
+            except Judge0ClientError as e:
+                # The executions are accepted; keep asking until the deadline
+                last_error = str(e)
+
+            if any(r is None for r in results):
+                time.sleep(interval)
+                interval = min(interval * 1.25, max_interval)  # gentle backoff
+
+    except Exception as e:
+        # Never crash worker
+        return _fill_pending(f"Unexpected error polling Judge0: {e}")
+
+
+def execute_batch(submissions: List[Dict[str, Any]]) -> List[dict]:
+    """
+    Submit all executions in one batch request and poll them together.
+    Returns structured result dicts aligned with `submissions`.
+
+    Holds cluster-wide in-flight slots for the duration; a submission with
+    more executions than JUDGE0_MAX_IN_FLIGHT runs in successive waves.
+    Each wave is polled only as long as its limits allow (see
+    execution_limits.poll_deadline).
+
+    Raises Judge0PartialError carrying the results of every execution that
+    was submitted before a failure (earlier waves, and the chunks of the
+    failing wave that went out), so only the rest needs to run elsewhere.
+    """
+    if not submissions:
+        return []
+
+    results: List[dict] = []
+    for wave in _chunks(submissions, judge0_governor.max_in_flight()):
+        try:
+            leases = judge0_governor.acquire(len(wave))
+        except judge0_governor.Judge0CapacityError as e:
+            raise Judge0PartialError(str(e), results) from e
+        try:
+            deadline = execution_limits.poll_deadline(item.get("limits") for item in wave)
+            try:
+                tokens = submit_batch(wave)
+            except Judge0PartialError as e:
+                results.extend(poll_batch(e.completed, timeout_seconds=deadline))
+                raise Judge0PartialError(str(e), results) from e
+            results.extend(poll_batch(tokens, timeout_seconds=deadline))
+        finally:
+            judge0_governor.release(leases)
+    return results
+
+
 def _parse_status(data: dict) -> Optional[dict]:
     status = data.get("status")
     if isinstance(status, dict) and "id" in status:
@@ -149,11 +601,25 @@ def _parse_status(data: dict) -> Optional[dict]:
     return None
 
 
-def _structured_result(data: dict) -> dict:
+def _b64decode(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return value
+    try:
+        return base64.b64decode(value).decode("utf-8", errors="replace")
+    except (binascii.Error, ValueError):
+        return value
+
+
+def _structured_result(data: dict, base64_encoded: bool = False) -> dict:
     status = data.get("status") or {}
+    stdout = data.get("stdout")
+    stderr = data.get("stderr")
+    if base64_encoded:
+        stdout = _b64decode(stdout)
+        stderr = _b64decode(stderr)
     return {
-        "stdout": data.get("stdout") or "",
-        "stderr": data.get("stderr") or "",
+        "stdout": stdout or "",
+        "stderr": stderr or "",
         "status": status.get("description") or "Unknown",
         "time": data.get("time"),
         "memory": data.get("memory"),
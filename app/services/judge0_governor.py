@@ -0,0 +1,210 @@
+# app/services/judge0_governor.py
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from app.config import get_settings
+from app.services.cache import get_redis
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+_BUCKET_KEY = "judge0:governor:bucket"
+_IN_FLIGHT_KEY = "judge0:governor:in_flight"
+
+# Token bucket, refilled continuously at `rate` tokens/sec up to `capacity`.
+# Uses the Redis server clock so every worker agrees on time.
+# Returns "0" when granted, otherwise the seconds to wait before retrying.
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+  tokens = tokens - requested
+else
+  wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+# Counting semaphore as a sorted set of leases scored by expiry (ms).
+# Expired leases (crashed workers) are reaped on every acquire.
+# All-or-nothing: returns 1 if every lease in ARGV[3..] was added.
+_SEMAPHORE_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local ttl_ms = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local requested = #ARGV - 2
+if redis.call('ZCARD', KEYS[1]) + requested > limit then
+  return 0
+end
+for i = 3, #ARGV do
+  redis.call('ZADD', KEYS[1], now + ttl_ms, ARGV[i])
+end
+redis.call('PEXPIRE', KEYS[1], ttl_ms * 2)
+return 1
+"""
+
+
+class Judge0CapacityError(Exception):
+    """Timed out waiting for cluster-wide Judge0 rate or concurrency budget."""
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, "judge0_governor_enabled", True))
+
+
+def _rate() -> float:
+    return float(getattr(settings, "judge0_rate_limit_per_second", 20.0))
+
+
+def _burst() -> float:
+    return float(getattr(settings, "judge0_rate_limit_burst", 40))
+
+
+def max_in_flight() -> int:
+    return int(getattr(settings, "judge0_max_in_flight", 50))
+
+
+def _lease_ttl_ms() -> int:
+    return int(float(getattr(settings, "judge0_in_flight_lease_seconds", 120)) * 1000)
+
+
+def _max_wait() -> float:
+    return float(getattr(settings, "judge0_governor_max_wait_seconds", 60))
+
+
+def throttle(requests: int = 1) -> None:
+    """
+    Block until the cluster-wide token bucket admits `requests` Judge0
+    HTTP calls. Fails open (no throttling) if Redis is unreachable.
+    """
+    if not _enabled():
+        return
+    client = get_redis()
+    if client is None:
+        return
+
+    deadline = time.monotonic() + _max_wait()
+    while True:
+        try:
+            wait = float(client.eval(_TOKEN_BUCKET_LUA, 1, _BUCKET_KEY, _rate(), _burst(), requests))
+        except Exception as e:
+            logger.warning("Judge0 rate limiter unavailable, not throttling: %s", e)
+            return
+
+        if wait <= 0:
+            return
+        if time.monotonic() + wait > deadline:
+            raise Judge0CapacityError("Timed out waiting for Judge0 rate limit")
+        time.sleep(wait)
+
+
+def acquire(count: int = 1, lease_ids: Optional[List[str]] = None) -> List[str]:
+    """
+    Reserve `count` in-flight execution slots (all or nothing), blocking
+    until available. Returns the lease ids to pass to release(). Leases
+    expire on their own after JUDGE0_IN_FLIGHT_LEASE_SECONDS so a crashed
+    worker cannot leak capacity. Fails open if Redis is unreachable.
+    """
+    leases = list(lease_ids) if lease_ids else [uuid.uuid4().hex for _ in range(count)]
+    if not _enabled() or not leases:
+        return leases
+    client = get_redis()
+    if client is None:
+        return leases
+
+    limit = max_in_flight()
+    if len(leases) > limit:
+        raise ValueError(f"Cannot acquire {len(leases)} slots with JUDGE0_MAX_IN_FLIGHT={limit}")
+
+    deadline = time.monotonic() + _max_wait()
+    delay = 0.05
+    while True:
+        try:
+            acquired = client.eval(_SEMAPHORE_ACQUIRE_LUA, 1, _IN_FLIGHT_KEY, limit, _lease_ttl_ms(), *leases)
+        except Exception as e:
+            logger.warning("Judge0 concurrency governor unavailable, not limiting: %s", e)
+            return leases
+
+        if int(acquired) == 1:
+            return leases
+        if time.monotonic() + delay > deadline:
+            raise Judge0CapacityError("Timed out waiting for a Judge0 in-flight slot")
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+def release(lease_ids: List[str]) -> None:
+    if not _enabled() or not lease_ids:
+        return
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.zrem(_IN_FLIGHT_KEY, *lease_ids)
+    except Exception as e:
+        logger.warning("Failed to release Judge0 in-flight slots: %s", e)
+
+
+@contextmanager
+def in_flight(count: int = 1) -> Iterator[List[str]]:
+    leases = acquire(count)
+    try:
+        yield leases
+    finally:
+        release(leases)
+
+
+def utilisation() -> dict:
+    """
+    Current cluster-wide usage, for monitoring.
+    """
+    info = {
+        "enabled": _enabled(),
+        "rate_limit_per_second": _rate(),
+        "rate_limit_burst": _burst(),
+        "max_in_flight": max_in_flight(),
+        "in_flight": None,
+        "in_flight_ratio": None,
+        "bucket_tokens": None,
+        "redis_available": False,
+    }
+    client = get_redis()
+    if client is None:
+        return info
+
+    try:
+        seconds, micros = client.time()
+        now_ms = int(seconds) * 1000 + int(micros) // 1000
+        in_use = int(client.zcount(_IN_FLIGHT_KEY, now_ms, "+inf"))
+        tokens = client.hget(_BUCKET_KEY, "tokens")
+    except Exception as e:
+        logger.warning("Could not read Judge0 governor state: %s", e)
+        return info
+
+    info["redis_available"] = True
+    info["in_flight"] = in_use
+    info["in_flight_ratio"] = round(in_use / max(1, max_in_flight()), 3)
+    info["bucket_tokens"] = float(tokens) if tokens is not None else _burst()
+    return info
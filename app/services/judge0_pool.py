@@ -0,0 +1,285 @@
+# app/services/judge0_pool.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Composite tokens look like "<node_id>:<judge0 token>" so a poll always goes
+# back to the instance that owns the submission. Judge0 tokens are UUIDs and
+# never contain ":".
+_TOKEN_SEPARATOR = ":"
+
+
+class Judge0Node:
+    """
+    One Judge0 instance plus the routing state this worker keeps for it.
+    """
+
+    def __init__(self, base_url: str, weight: float = 1.0):
+        self.base_url = base_url.rstrip("/")
+        self.weight = max(0.01, float(weight))
+        # Derived from the URL (not list position) so tokens survive config reordering
+        self.node_id = hashlib.sha1(self.base_url.encode("utf-8")).hexdigest()[:8]
+
+        self.outstanding = 0  # requests this process currently has open against the node
+        self.queue_depth = 0  # jobs queued on the node, from the last /workers probe
+        self.consecutive_failures = 0
+        self.ejected_until: Optional[float] = None
+        self.last_probe_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def load(self) -> float:
+        return (self.outstanding + self.queue_depth + 1) / self.weight
+
+    def as_dict(self) -> dict:
+        return {
+            "node_id": self.node_id,
+            "base_url": self.base_url,
+            "weight": self.weight,
+            "healthy": not self.ejected,
+            "outstanding": self.outstanding,
+            "queue_depth": self.queue_depth,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+def parse_endpoints(raw: Optional[str], fallback_url: Optional[str]) -> List[Judge0Node]:
+    """
+    JUDGE0_ENDPOINTS="http://judge0-a:2358|3,http://judge0-b:2358|1"
+    (weight after "|", default 1). Falls back to JUDGE0_BASE_URL.
+    """
+    nodes: List[Judge0Node] = []
+    for entry in (raw or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        url, _, weight = entry.partition("|")
+        try:
+            nodes.append(Judge0Node(url.strip(), float(weight) if weight.strip() else 1.0))
+        except ValueError:
+            raise ValueError(f"Invalid JUDGE0_ENDPOINTS entry: {entry!r}")
+
+    if not nodes and fallback_url:
+        nodes.append(Judge0Node(fallback_url))
+    return nodes
+
+
+# -------------------------
+# Per-process pool state
+# -------------------------
+_nodes: Optional[List[Judge0Node]] = None
+_lock = threading.Lock()
+_probe_lock = threading.Lock()
+_last_probe_round = 0.0
+
+
+def nodes() -> List[Judge0Node]:
+    global _nodes
+    if _nodes is None:
+        with _lock:
+            if _nodes is None:
+                _nodes = parse_endpoints(
+                    getattr(settings, "judge0_endpoints", None),
+                    getattr(settings, "judge0_base_url", None),
+                )
+    return _nodes
+
+
+def _by_id() -> Dict[str, Judge0Node]:
+    return {node.node_id: node for node in nodes()}
+
+
+def _eject_after() -> int:
+    return max(1, int(getattr(settings, "judge0_eject_after_failures", 3)))
+
+
+def _eject_seconds() -> float:
+    return float(getattr(settings, "judge0_eject_seconds", 30))
+
+
+def pick(exclude: Iterable[Judge0Node] = ()) -> Optional[Judge0Node]:
+    """
+    Least-outstanding-requests routing, scaled by weight, over healthy nodes.
+
+    `exclude` holds nodes already tried for this call (failover on retry).
+    If every candidate is ejected, all of them are used anyway: a degraded
+    Judge0 is better than none, and the circuit breaker covers full outages.
+    """
+    maybe_probe()
+
+    excluded = {node.node_id for node in exclude}
+    candidates = [node for node in nodes() if node.node_id not in excluded] or list(nodes())
+    if not candidates:
+        return None
+
+    with _lock:
+        healthy = [node for node in candidates if not node.ejected] or candidates
+        best = min(node.load() for node in healthy)
+        return random.choice([node for node in healthy if node.load() == best])
+
+
+# -------------------------
+# Token affinity
+# -------------------------
+def compose_token(node: Judge0Node, token: str) -> str:
+    return qualify_token(node.node_id, token)
+
+
+def qualify_token(node_id: Optional[str], token: str) -> str:
+    """
+    Composite token for a raw Judge0 token issued by node `node_id`; the
+    bare token when the node is unknown (resolved to the first node).
+    """
+    if not node_id:
+        return token
+    return f"{node_id}{_TOKEN_SEPARATOR}{token}"
+
+
+def resolve_token(token: str) -> Tuple[Optional[Judge0Node], str]:
+    """
+    Split a composite token into (owning node, raw Judge0 token).
+
+    Bare tokens (issued before multi-endpoint support) belong to the first
+    configured node. Returns (None, raw) if the owning node has been
+    removed from the configuration.
+    """
+    node_id, sep, raw = token.partition(_TOKEN_SEPARATOR)
+    if not sep:
+        pool = nodes()
+        return (pool[0] if pool else None), token
+    return _by_id().get(node_id), raw
+
+
+# -------------------------
+# Passive health (outcome of real requests)
+# -------------------------
+def begin(node: Judge0Node) -> None:
+    with _lock:
+        node.outstanding += 1
+
+
+def finish(node: Judge0Node, ok: bool, error: Optional[str] = None) -> None:
+    with _lock:
+        node.outstanding = max(0, node.outstanding - 1)
+        if ok:
+            node.consecutive_failures = 0
+            return
+        node.consecutive_failures += 1
+        node.last_error = error
+        if not node.ejected and node.consecutive_failures >= _eject_after():
+            _eject(node)
+
+
+def _eject(node: Judge0Node) -> None:
+    node.ejected_until = time.monotonic() + _eject_seconds()
+    logger.warning("Ejected Judge0 node %s (%s): %s", node.node_id, node.base_url, node.last_error)
+
+
+def _readmit(node: Judge0Node) -> None:
+    node.ejected_until = None
+    node.consecutive_failures = 0
+    node.last_error = None
+    logger.info("Re-admitted Judge0 node %s (%s)", node.node_id, node.base_url)
+
+
+# -------------------------
+# Active health probes (/about, /workers)
+# -------------------------
+def probe(node: Judge0Node) -> bool:
+    """
+    GET /about (is it up) and /workers (is anything consuming the queue,
+    and how deep is it). Updates the node's routing state.
+    """
+    from app.services.judge0_client import _headers, get_client
+
+    timeout = float(getattr(settings, "judge0_probe_timeout_seconds", 2.0))
+    error: Optional[str] = None
+    queue_depth = 0
+    try:
+        client = get_client()
+        r = client.get(node.url("/about"), headers=_headers(), timeout=timeout)
+        if r.status_code >= 400:
+            error = f"/about returned HTTP {r.status_code}"
+        else:
+            r = client.get(node.url("/workers"), headers=_headers(), timeout=timeout)
+            if r.status_code >= 400:
+                error = f"/workers returned HTTP {r.status_code}"
+            else:
+                queues = r.json() or []
+                queue_depth = sum(int(q.get("size") or 0) for q in queues if isinstance(q, dict))
+                available = sum(int(q.get("available") or 0) for q in queues if isinstance(q, dict))
+                if queues and available == 0:
+                    error = "no Judge0 workers available"
+    except Exception as e:
+        error = f"probe failed: {e}"
+
+    with _lock:
+        node.last_probe_at = time.monotonic()
+        if error is None:
+            node.queue_depth = queue_depth
+            if node.ejected and node.ejected_until <= time.monotonic():
+                _readmit(node)
+            elif not node.ejected:
+                node.consecutive_failures = 0
+            return True
+
+        node.last_error = error
+        if node.ejected:
+            # Still sick: keep it out for another ejection period
+            node.ejected_until = time.monotonic() + _eject_seconds()
+        else:
+            node.consecutive_failures += 1
+            if node.consecutive_failures >= _eject_after():
+                _eject(node)
+        return False
+
+
+def probe_all() -> None:
+    for node in nodes():
+        probe(node)
+
+
+def maybe_probe() -> None:
+    """
+    Probe every node once per JUDGE0_PROBE_INTERVAL_SECONDS. Runs inline in
+    whichever caller notices the round is due; others never wait for it.
+    Single-node setups are not probed (nowhere else to route to).
+    """
+    global _last_probe_round
+
+    if len(nodes()) < 2:
+        return
+    interval = float(getattr(settings, "judge0_probe_interval_seconds", 10))
+    if interval <= 0 or time.monotonic() - _last_probe_round < interval:
+        return
+    if not _probe_lock.acquire(blocking=False):
+        return
+    try:
+        _last_probe_round = time.monotonic()
+        probe_all()
+    finally:
+        _probe_lock.release()
+
+
+def status() -> List[dict]:
+    pool = nodes()  # takes _lock itself on first use
+    with _lock:
+        return [node.as_dict() for node in pool]
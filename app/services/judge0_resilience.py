@@ -0,0 +1,212 @@
+# app/services/judge0_resilience.py
+from __future__ import annotations
+
+import logging
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services.cache import get_redis
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Throttled or Judge0/proxy temporarily unhealthy: worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# A POST /submissions that reached Judge0 may have created an execution,
+# so non-idempotent calls are only retried when they were never delivered
+# or were explicitly refused. A 502/504 from a proxy says nothing about
+# whether Judge0 got the request, so it is not retried.
+_RETRYABLE_POST_STATUS_CODES = {429, 503}
+_NOT_DELIVERED_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+# -------------------------
+# Retry classification + backoff
+# -------------------------
+def is_retryable_response(method: str, response: httpx.Response) -> bool:
+    if method.upper() in _IDEMPOTENT_METHODS:
+        return response.status_code in RETRYABLE_STATUS_CODES
+    return response.status_code in _RETRYABLE_POST_STATUS_CODES
+
+
+def gated_by_breaker(method: str) -> bool:
+    """
+    Whether the circuit breaker may refuse a call: only submissions (POSTs).
+    Polls for tokens Judge0 has already accepted go on while it is open, so
+    executions in flight are not failed and scored 0.
+    """
+    return method.upper() not in _IDEMPOTENT_METHODS
+
+
+def is_retryable_exception(method: str, exc: Exception) -> bool:
+    if isinstance(exc, _NOT_DELIVERED_ERRORS):
+        return True
+    if method.upper() in _IDEMPOTENT_METHODS:
+        return isinstance(exc, httpx.TransportError)
+    return False
+
+
+def counts_as_failure(response: Optional[httpx.Response]) -> bool:
+    """
+    Whether an outcome says something about Judge0's health. Transport
+    errors (response None) and 5xx do; 4xx are our problem, not Judge0's.
+    """
+    return response is None or response.status_code >= 500
+
+
+def max_attempts() -> int:
+    return max(1, int(getattr(settings, "judge0_retry_max_attempts", 3)))
+
+
+def _retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Exponential backoff with full jitter for retry number `attempt` (1-based).
+    A Retry-After header from Judge0/RapidAPI takes precedence, capped at
+    JUDGE0_RETRY_MAX_DELAY_SECONDS.
+    """
+    base = float(getattr(settings, "judge0_retry_base_delay_seconds", 0.25))
+    cap = float(getattr(settings, "judge0_retry_max_delay_seconds", 4.0))
+
+    retry_after = _retry_after_seconds(response)
+    if retry_after is not None:
+        return min(cap, retry_after)
+
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+# -------------------------
+# Circuit breaker (state shared across workers via Redis)
+# -------------------------
+class CircuitBreaker:
+    """
+    closed    -> calls flow; failures are counted in a sliding window
+    open      -> JUDGE0_BREAKER_FAILURE_THRESHOLD failures within the window;
+                 every submission is refused for JUDGE0_BREAKER_COOLDOWN_SECONDS
+                 (polls are not gated, see gated_by_breaker)
+    half-open -> cooldown over; exactly one probe call is let through,
+                 success closes the breaker, failure re-opens it
+
+    Fails open (always allows) when Redis is unreachable.
+    """
+
+    def __init__(self, name: str = "judge0"):
+        self._failures_key = f"{name}:breaker:failures"
+        self._open_key = f"{name}:breaker:open"
+        self._tripped_key = f"{name}:breaker:tripped"
+        self._probe_key = f"{name}:breaker:probe"
+
+    @staticmethod
+    def _enabled() -> bool:
+        return bool(getattr(settings, "judge0_breaker_enabled", True))
+
+    @staticmethod
+    def cooldown() -> int:
+        return int(getattr(settings, "judge0_breaker_cooldown_seconds", 30))
+
+    def state(self) -> str:
+        if not self._enabled():
+            return "disabled"
+        client = get_redis()
+        if client is None:
+            return "unknown"
+        try:
+            is_open, tripped = client.mget(self._open_key, self._tripped_key)
+        except Exception:
+            return "unknown"
+        if is_open:
+            return "open"
+        if tripped:
+            return "half_open"
+        return "closed"
+
+    def is_open(self) -> bool:
+        """
+        Read-only check (does not claim the half-open probe).
+        """
+        return self.state() == "open"
+
+    def allow_request(self) -> bool:
+        if not self._enabled():
+            return True
+        client = get_redis()
+        if client is None:
+            return True
+        try:
+            is_open, tripped = client.mget(self._open_key, self._tripped_key)
+            if is_open:
+                return False
+            if tripped:
+                # Half-open: only one caller cluster-wide gets to probe
+                return bool(client.set(self._probe_key, "1", nx=True, ex=max(5, self.cooldown())))
+            return True
+        except Exception as e:
+            logger.warning("Judge0 circuit breaker unavailable, allowing call: %s", e)
+            return True
+
+    def record_success(self) -> None:
+        if not self._enabled():
+            return
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            if client.exists(self._tripped_key):
+                client.delete(self._tripped_key, self._probe_key, self._failures_key)
+                logger.info("Judge0 circuit breaker closed")
+        except Exception as e:
+            logger.warning("Judge0 circuit breaker unavailable: %s", e)
+
+    def record_failure(self) -> None:
+        if not self._enabled():
+            return
+        client = get_redis()
+        if client is None:
+            return
+
+        threshold = int(getattr(settings, "judge0_breaker_failure_threshold", 10))
+        window = int(getattr(settings, "judge0_breaker_window_seconds", 30))
+        try:
+            failures = client.incr(self._failures_key)
+            if failures == 1:
+                client.expire(self._failures_key, window)
+            half_open = client.exists(self._tripped_key)
+
+            if half_open or int(failures) >= threshold:
+                cooldown = self.cooldown()
+                pipe = client.pipeline()
+                pipe.set(self._open_key, "1", ex=cooldown)
+                pipe.set(self._tripped_key, "1", ex=cooldown * 10)
+                pipe.delete(self._probe_key, self._failures_key)
+                pipe.execute()
+                logger.warning("Judge0 circuit breaker opened for %ss", cooldown)
+        except Exception as e:
+            logger.warning("Judge0 circuit breaker unavailable: %s", e)
+
+
+breaker = CircuitBreaker()
@@ -0,0 +1,179 @@
+# app/services/local_sandbox.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import select
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services import sandbox_runner
+from app.services.execution_backend import ExecutionBackend
+from app.services.judge0_client import _failure_result
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class _Runner:
+    """
+    One standalone sandbox runner process (sandbox_runner.serve): a fresh
+    isolated interpreter started with an empty environment and no inherited
+    descriptors, so neither settings, secrets nor DB/Redis connections of the
+    worker are in memory when student code is forked off it.
+    """
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", sandbox_runner.__file__],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(),
+            env={"PATH": os.defpath},
+            close_fds=True,
+        )
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run(self, request: Dict[str, Any], timeout: float) -> dict:
+        self.proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        self.proc.stdin.flush()
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        line = self.proc.stdout.readline() if ready else b""
+        if not line:
+            raise RuntimeError("sandbox runner did not answer")
+        return json.loads(line)
+
+    def stop(self) -> None:
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+
+class LocalSandboxBackend(ExecutionBackend):
+    """
+    Runs student code on this machine: a pool of standalone runner
+    processes (see _Runner) each fork a resource-limited child per
+    execution (see sandbox_runner). No interpreter start-up per run, so
+    executions take milliseconds.
+
+    Runs are never forked from the worker itself, which is large, threaded
+    and holds credentials; the runners are started with subprocess, which
+    also works in daemonic Celery prefork children.
+
+    Meant for practice assignments, development and CI. Tokens only mean
+    something inside this process, so callback mode is not supported.
+
+    An execution's "limits" (see execution_limits) replace the
+    LOCAL_SANDBOX_* defaults for that run.
+    """
+
+    name = "local"
+    supports_callbacks = False
+
+    def runtime(self) -> str:
+        # Runners are started with this interpreter (see _Runner)
+        return f"{sys.implementation.name}-{sys.version}"
+
+    def __init__(self, workers: Optional[int] = None):
+        if os.name != "posix":
+            raise RuntimeError("The local sandbox backend requires a POSIX system")
+
+        self.workers = workers or int(getattr(settings, "local_sandbox_workers", 0)) or (os.cpu_count() or 2)
+        self.cpu_seconds = float(getattr(settings, "local_sandbox_cpu_seconds", 2.0))
+        self.wall_seconds = float(getattr(settings, "local_sandbox_wall_seconds", 5.0))
+        self.memory_mb = int(getattr(settings, "local_sandbox_memory_mb", 256))
+        self.max_file_kb = int(getattr(settings, "local_sandbox_max_file_kb", 1024))
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._runners: "queue.LifoQueue[_Runner]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        # token -> (future, wall seconds of that execution)
+        self._futures: Dict[str, Tuple[Future, float]] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # Runners of a parent process are not ours to use or stop
+                self._runners = queue.LifoQueue()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sandbox")
+                self._executor_pid = os.getpid()
+                self._futures.clear()
+            return self._executor
+
+    def _run(self, request: Dict[str, Any]) -> dict:
+        """
+        Run one execution on an idle runner (started on demand; at most one
+        per pool thread). A runner that fails or hangs is replaced.
+        """
+        try:
+            runner = self._runners.get_nowait()
+        except queue.Empty:
+            runner = None
+        if runner is None or not runner.alive():
+            runner = _Runner()
+        try:
+            # Wall limit is enforced in the runner; this only guards the runner itself
+            result = runner.run(request, timeout=request["wall_seconds"] + 10)
+        except Exception:
+            runner.stop()
+            raise
+        self._runners.put(runner)
+        return result
+
+    def _limits(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        limits = item.get("limits") or {}
+        memory_kb = limits.get("memory_limit")
+        return dict(
+            cpu_seconds=float(limits.get("cpu_time_limit") or self.cpu_seconds),
+            wall_seconds=float(limits.get("wall_time_limit") or self.wall_seconds),
+            memory_mb=max(1, int(memory_kb) // 1024) if memory_kb else self.memory_mb,
+            max_file_kb=int(limits.get("max_file_size") or self.max_file_kb),
+        )
+
+    def submit(self, item: Dict[str, Any]) -> str:
+        kwargs = self._limits(item)
+        request = {"source_code": item["source_code"], "stdin": item.get("stdin"), **kwargs}
+        future = self._pool().submit(self._run, request)
+        token = f"local-{uuid.uuid4().hex}"
+        self._futures[token] = (future, kwargs["wall_seconds"])
+        return token
+
+    def poll(self, token: str, timeout_seconds: Optional[float] = None) -> dict:
+        entry = self._futures.pop(token, None)
+        if entry is None:
+            return _failure_result("Unknown local execution token")
+        future, wall_seconds = entry
+        try:
+            return future.result(timeout=wall_seconds + 15)
+        except Exception as e:
+            logger.exception("Local sandbox execution failed")
+            return _failure_result(f"Local sandbox error: {e}")
+
+    def submit_batch(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        return [self.submit(item) for item in items]
+
+    def poll_batch(self, tokens: List[Optional[str]], timeout_seconds: Optional[float] = None) -> List[dict]:
+        return [self.poll(t) if t else _failure_result("Local sandbox rejected submission") for t in tokens]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                while not self._runners.empty():
+                    self._runners.get_nowait().stop()
+            self._executor = None
+            self._executor_pid = None
+            self._futures.clear()
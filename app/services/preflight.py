@@ -0,0 +1,66 @@
+# app/services/preflight.py
+from __future__ import annotations
+
+from typing import Optional
+
+# Status of a pre-flight result (Judge0's name for status 6). Never a pass,
+# whatever the expected output.
+SYNTAX_ERROR_STATUS = "Compilation Error"
+
+
+def check_syntax(code_text: str) -> Optional[dict]:
+    """
+    Compile (never run) a Python submission in-process. Returns None if it
+    compiles, else {"message", "line", "offset", "text", "error_type"}.
+
+    Inputs the compiler itself cannot cope with (recursion/memory limits
+    on pathological nesting) are not reported; the sandbox decides those.
+    """
+    try:
+        compile(code_text, "main.py", "exec", dont_inherit=True)
+    except SyntaxError as e:  # includes IndentationError / TabError
+        return {
+            "message": e.msg,
+            "line": e.lineno,
+            "offset": e.offset,
+            "text": (e.text or "").rstrip("\n") or None,
+            "error_type": type(e).__name__,
+        }
+    except ValueError as e:  # e.g. source code contains null bytes
+        return {"message": str(e), "line": None, "offset": None, "text": None, "error_type": "SyntaxError"}
+    except (RecursionError, MemoryError):
+        return None
+    return None
+
+
+def format_error(error: dict) -> str:
+    """
+    The error the way the interpreter would print it.
+    """
+    lines = []
+    if error.get("line"):
+        lines.append(f'  File "main.py", line {error["line"]}')
+        if error.get("text"):
+            text = error["text"]
+            stripped = text.lstrip()
+            lines.append(f"    {stripped}")
+            if error.get("offset"):
+                caret = max(0, int(error["offset"]) - 1 - (len(text) - len(stripped)))
+                lines.append("    " + " " * caret + "^")
+    lines.append(f"{error.get('error_type') or 'SyntaxError'}: {error.get('message')}")
+    return "\n".join(lines) + "\n"
+
+
+def syntax_error_result(error: dict) -> dict:
+    """
+    Execution result (Judge0 client shape) standing in for every run of
+    a submission that does not compile.
+    """
+    return {
+        "stdout": "",
+        "stderr": format_error(error),
+        "status": SYNTAX_ERROR_STATUS,
+        "time": None,
+        "memory": None,
+        "syntax_error": error,
+    }
@@ -0,0 +1,281 @@
+# app/services/sandbox_runner.py
+"""
+Runs one Python program in a forked, resource-limited child process.
+
+Stdlib only and free of app imports on purpose: it also runs as a
+standalone runner process (python -I sandbox_runner.py, see local_sandbox)
+that student code is forked off, and nothing with credentials or open
+connections should be in memory there.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import resource
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+_DENIED_EVENT_PREFIXES = (
+    "socket.",
+    "subprocess.",
+    "os.exec",
+    "os.fork",
+    "os.forkpty",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.system",
+    "os.kill",
+    "os.killpg",
+    "pty.",
+    "ctypes.",
+)
+
+
+# Filesystem events checked against the sandbox's allowed paths: reads
+# (and directory listings) only in the working directory and the Python
+# installation, changes only in the working directory
+_FS_READ_EVENTS = ("os.listdir", "os.scandir", "glob.glob")
+_FS_WRITE_EVENTS = (
+    "os.chmod",
+    "os.chown",
+    "os.link",
+    "os.mkdir",
+    "os.remove",
+    "os.rename",
+    "os.rmdir",
+    "os.symlink",
+    "os.truncate",
+    "os.utime",
+    "shutil.",
+)
+_OPEN_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+
+
+def _within(path, roots) -> bool:
+    if isinstance(path, int):
+        return True  # an already open descriptor
+    if path is None:
+        return False
+    path = os.path.realpath(os.fsdecode(path))
+    return any(path == root or path.startswith(root + os.sep) for root in roots)
+
+
+def _audit_hook(workdir: str):
+    """
+    Audit hook for student code: no network, processes, signals or
+    ctypes; no reading outside the working directory and the Python
+    installation (so no app source or .env); no writing outside the
+    working directory; no leaving it.
+    """
+    writable = (os.path.realpath(workdir), os.devnull)
+    readable = writable + tuple(
+        os.path.realpath(p) for p in {sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix}
+        if p and os.path.realpath(p) != os.sep
+    )
+
+    def hook(event: str, args) -> None:
+        if event.startswith(_DENIED_EVENT_PREFIXES) or event == "os.chdir":
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if event == "open":
+            path, mode, flags = (tuple(args) + (None, None, None))[:3]
+            write = bool((flags or 0) & _OPEN_WRITE_FLAGS) or any(c in (mode or "") for c in "wax+")
+            if not _within(path, writable if write else readable):
+                raise PermissionError(f"Access to {path!r} is not allowed in the sandbox")
+        elif event.startswith(_FS_WRITE_EVENTS):
+            if not all(_within(path, writable) for path in args if isinstance(path, (str, bytes, os.PathLike))):
+                raise PermissionError(f"{event} outside the working directory is not allowed in the sandbox")
+        elif event in _FS_READ_EVENTS:
+            if args and not _within(args[0] if args[0] is not None else ".", readable):
+                raise PermissionError(f"{event} outside the working directory is not allowed in the sandbox")
+
+    return hook
+
+
+def _drop_network() -> None:
+    """
+    Move into fresh user + network namespaces (loopback only, down) when the
+    kernel allows it. The audit hook below blocks sockets either way.
+    """
+    unshare = getattr(os, "unshare", None)  # Python 3.12+
+    if unshare is None:
+        return
+    try:
+        unshare(os.CLONE_NEWUSER | os.CLONE_NEWNET)
+    except OSError:
+        pass
+
+
+def _set_limits(cpu_seconds: float, memory_mb: int, max_file_kb: int) -> None:
+    cpu = max(1, int(cpu_seconds + 0.999))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = int(memory_mb) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    max_file = int(max_file_kb) * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (max_file, max_file))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (64, 64))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+
+def _child(source_code: str, workdir: str, cpu_seconds: float, memory_mb: int, max_file_kb: int) -> int:
+    os.chdir(workdir)
+    os.setsid()
+
+    stdin_fd = os.open("stdin.txt", os.O_RDONLY)
+    os.unlink("stdin.txt")  # readable through fd 0 only
+    stdout_fd = os.open("stdout.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    stderr_fd = os.open("stderr.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    for fd, target in ((stdin_fd, 0), (stdout_fd, 1), (stderr_fd, 2)):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Nothing else the parent had open (e.g. the runner's request pipe)
+    os.closerange(3, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+    sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False), encoding="utf-8", errors="replace")
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), encoding="utf-8", errors="replace")
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), encoding="utf-8", errors="replace")
+
+    os.environ.clear()
+    os.environ["HOME"] = workdir
+    _drop_network()
+    _set_limits(cpu_seconds, memory_mb, max_file_kb)
+    sys.addaudithook(_audit_hook(workdir))
+
+    exit_code = 0
+    try:
+        code = compile(source_code, "main.py", "exec")
+        exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            exit_code = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        exit_code = exit_code or 1
+    return exit_code
+
+
+def _read(path: str, limit: int) -> str:
+    try:
+        with open(path, "rb") as f:
+            return f.read(limit).decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def run_sandboxed(
+    source_code: str,
+    stdin: str | None,
+    cpu_seconds: float = 2.0,
+    wall_seconds: float = 5.0,
+    memory_mb: int = 256,
+    max_file_kb: int = 1024,
+) -> dict:
+    """
+    Execute `source_code` with `stdin` in a forked child under rlimits
+    (CPU, address space, file size, no new processes), without network,
+    in a throwaway working directory it can only write inside (reads are
+    limited to it and the Python installation).
+
+    Returns the same result shape as the Judge0 client, with Judge0 status
+    descriptions (Accepted / Time Limit Exceeded / Runtime Error (...)).
+    """
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    try:
+        with open(os.path.join(workdir, "stdin.txt"), "w", encoding="utf-8") as f:
+            f.write(stdin or "")
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        started = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = _child(source_code, workdir, cpu_seconds, memory_mb, max_file_kb)
+            finally:
+                os._exit(code & 0xFF)
+
+        wall_exceeded = False
+        delay = 0.0005
+        while True:
+            wpid, wstatus, rusage = os.wait4(pid, os.WNOHANG)
+            if wpid:
+                break
+            if time.monotonic() - started > wall_seconds:
+                wall_exceeded = True
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    os.kill(pid, signal.SIGKILL)
+                _, wstatus, rusage = os.wait4(pid, 0)
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+        limit = max_file_kb * 1024
+        stdout = _read(os.path.join(workdir, "stdout.txt"), limit)
+        stderr = _read(os.path.join(workdir, "stderr.txt"), limit)
+        cpu_time = rusage.ru_utime + rusage.ru_stime
+
+        if os.WIFSIGNALED(wstatus):
+            sig = os.WTERMSIG(wstatus)
+            if wall_exceeded or sig == signal.SIGXCPU or (sig == signal.SIGKILL and cpu_time >= cpu_seconds):
+                status = "Time Limit Exceeded"
+            else:
+                status = f"Runtime Error ({signal.Signals(sig).name})"
+        elif wall_exceeded:
+            status = "Time Limit Exceeded"
+        elif os.WEXITSTATUS(wstatus) != 0:
+            status = "Runtime Error (NZEC)"
+        else:
+            status = "Accepted"
+
+        return {
+            "stdout": stdout,
+            "stderr": stderr,
+            "status": status,
+            "time": f"{cpu_time:.3f}",
+            "memory": int(rusage.ru_maxrss),  # KB on Linux, like Judge0
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def serve() -> None:
+    """
+    Standalone runner loop: one JSON object of run_sandboxed keyword
+    arguments per line on stdin, one JSON result per line on stdout.
+    Requests are handled one at a time, so each fork happens from this
+    small single-threaded process.
+    """
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for line in requests:
+        try:
+            result = run_sandboxed(**json.loads(line))
+        except Exception as e:
+            result = {"stdout": "", "stderr": f"Local sandbox error: {e}", "status": "failed", "time": None, "memory": None}
+        replies.write(json.dumps(result) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    serve()
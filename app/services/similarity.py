@@ -0,0 +1,268 @@
+# app/services/similarity.py
+from __future__ import annotations
+
+import builtins
+import functools
+import hashlib
+import io
+import keyword
+import logging
+import random
+import re
+import tokenize
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.models import (
+    Assignment,
+    SimilarityBucket,
+    SimilarityPair,
+    Submission,
+    SubmissionFingerprint,
+)
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# MinHash permutations are h(x) = (a*x + b) mod P over 64-bit shingle hashes
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 61) - 1
+# Fixed so signatures stay comparable across processes and releases
+_SEED = 0x5EED
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+_STRING_TOKENS = {tokenize.STRING} | {
+    getattr(tokenize, name)
+    for name in ("FSTRING_START", "FSTRING_MIDDLE", "FSTRING_END")
+    if hasattr(tokenize, name)
+}
+_SKIPPED_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+
+# Fallback lexer for code that tokenize rejects
+_FALLBACK_TOKEN = re.compile(r"[A-Za-z_]\w*|\d[\w.]*|\S")
+
+
+def _num_perm() -> int:
+    return int(getattr(settings, "similarity_num_perm", 128))
+
+
+def _bands() -> int:
+    return int(getattr(settings, "similarity_bands", 32))
+
+
+def _shingle_size() -> int:
+    return int(getattr(settings, "similarity_shingle_size", 5))
+
+
+@functools.lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> List[Tuple[int, int]]:
+    rng = random.Random(_SEED)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+
+# -------------------------
+# Normalization
+# -------------------------
+def _normalize_name(name: str) -> str:
+    if keyword.iskeyword(name) or name in _BUILTIN_NAMES:
+        return name
+    return "ID"
+
+
+def normalize_tokens(code_text: str) -> List[str]:
+    """
+    Token stream with every user-chosen detail erased: identifiers become
+    ID (keywords and builtins are kept), literals become STR / NUM, and
+    comments and blank lines are dropped. Renaming variables or editing
+    comments does not change it.
+    """
+    tokens: List[str] = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code_text).readline):
+            if tok.type in _SKIPPED_TOKENS:
+                continue
+            if tok.type == tokenize.NAME:
+                tokens.append(_normalize_name(tok.string))
+            elif tok.type == tokenize.NUMBER:
+                tokens.append("NUM")
+            elif tok.type in _STRING_TOKENS:
+                if not tokens or tokens[-1] != "STR":
+                    tokens.append("STR")
+            elif tok.type == tokenize.NEWLINE:
+                tokens.append(";")
+            elif tok.type == tokenize.INDENT:
+                tokens.append("{")
+            elif tok.type == tokenize.DEDENT:
+                tokens.append("}")
+            else:
+                tokens.append(tok.string)
+        return tokens
+    except (tokenize.TokenError, SyntaxError):
+        pass
+
+    # Does not tokenize (e.g. unbalanced brackets): same idea, regex lexer
+    tokens = []
+    for line in code_text.splitlines():
+        line = line.split("#", 1)[0]
+        for match in _FALLBACK_TOKEN.findall(line):
+            if match[0].isalpha() or match[0] == "_":
+                tokens.append(_normalize_name(match))
+            elif match[0].isdigit():
+                tokens.append("NUM")
+            else:
+                tokens.append(match)
+    return tokens
+
+
+def shingles(tokens: Sequence[str], k: Optional[int] = None) -> set:
+    """
+    64-bit hashes of every run of k consecutive tokens.
+    """
+    k = k or _shingle_size()
+    if len(tokens) < k:
+        grams = [tokens] if tokens else []
+    else:
+        grams = [tokens[i : i + k] for i in range(len(tokens) - k + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(gram).encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+# -------------------------
+# MinHash / LSH
+# -------------------------
+def minhash(shingle_hashes: Iterable[int], num_perm: Optional[int] = None) -> List[int]:
+    num_perm = num_perm or _num_perm()
+    values = list(shingle_hashes)
+    if not values:
+        return [_MAX_HASH] * num_perm
+    return [min((a * x + b) % _PRIME for x in values) for a, b in _permutations(num_perm)]
+
+
+def signature(code_text: str) -> Tuple[List[int], int]:
+    """
+    (MinHash signature, shingle count) of a submission's normalized code.
+    """
+    hashes = shingles(normalize_tokens(code_text))
+    return minhash(hashes), len(hashes)
+
+
+def band_buckets(sig: Sequence[int], bands: Optional[int] = None) -> List[Tuple[int, str]]:
+    """
+    (band, bucket) for each of the signature's bands: equal rows in any one
+    band make two submissions a candidate pair.
+    """
+    bands = bands or _bands()
+    rows = len(sig) // bands
+    buckets = []
+    for band in range(bands):
+        chunk = ",".join(str(v) for v in sig[band * rows : (band + 1) * rows])
+        buckets.append((band, hashlib.blake2b(chunk.encode("ascii"), digest_size=8).hexdigest()))
+    return buckets
+
+
+def estimate(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """
+    MinHash estimate of the Jaccard similarity of two signatures.
+    """
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+# -------------------------
+# Incremental per-assignment index
+# -------------------------
+def index_submission(db: Session, submission: Submission) -> int:
+    """
+    Add one submission to its assignment's LSH index and record candidate
+    pairs with other students' submissions that score at least
+    SIMILARITY_MIN_SCORE. Only the submissions sharing a bucket with it are
+    compared; nothing already indexed is recomputed. Idempotent.
+
+    Indexing is serialized per assignment (row lock on the assignment), so
+    two similar submissions indexed at once always see each other. Returns
+    the number of pairs recorded. The caller commits.
+    """
+    # Signature first: CPU work stays outside the lock
+    sig, shingle_count = signature(submission.code_text)
+    buckets = band_buckets(sig)
+
+    db.query(Assignment.id).filter(Assignment.id == submission.assignment_id).with_for_update().first()
+    exists = (
+        db.query(SubmissionFingerprint.id)
+        .filter(SubmissionFingerprint.submission_id == submission.id)
+        .first()
+    )
+    if exists:
+        return 0
+
+    candidate_ids = {
+        row.submission_id
+        for row in db.query(SimilarityBucket.submission_id)
+        .filter(
+            SimilarityBucket.assignment_id == submission.assignment_id,
+            tuple_(SimilarityBucket.band, SimilarityBucket.bucket).in_(buckets),
+        )
+        .distinct()
+    }
+
+    pairs = []
+    if shingle_count and candidate_ids:
+        min_score = float(getattr(settings, "similarity_min_score", 0.5))
+        candidates = (
+            db.query(SubmissionFingerprint)
+            .filter(
+                SubmissionFingerprint.submission_id.in_(candidate_ids),
+                SubmissionFingerprint.student_id != submission.student_id,
+                SubmissionFingerprint.shingle_count > 0,
+            )
+            .all()
+        )
+        for other in candidates:
+            score = estimate(sig, other.signature)
+            if score >= min_score:
+                low, high = sorted((submission.id, other.submission_id))
+                pairs.append(
+                    {
+                        "assignment_id": submission.assignment_id,
+                        "submission_a_id": low,
+                        "submission_b_id": high,
+                        "similarity": round(score, 4),
+                    }
+                )
+
+    db.add(
+        SubmissionFingerprint(
+            submission_id=submission.id,
+            assignment_id=submission.assignment_id,
+            student_id=submission.student_id,
+            signature=sig,
+            shingle_count=shingle_count,
+        )
+    )
+    # Empty code would bucket with every other empty file
+    if shingle_count:
+        db.execute(
+            insert(SimilarityBucket),
+            [
+                {"assignment_id": submission.assignment_id, "band": band, "bucket": bucket, "submission_id": submission.id}
+                for band, bucket in buckets
+            ],
+        )
+    if pairs:
+        db.execute(insert(SimilarityPair), pairs)
+
+    logger.info(
+        "Indexed submission_id=%s for similarity: %s candidate(s), %s pair(s)",
+        submission.id,
+        len(candidate_ids),
+        len(pairs),
+    )
+    return len(pairs)
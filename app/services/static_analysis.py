@@ -0,0 +1,463 @@
+# app/services/static_analysis.py
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cache import TwoTierCache
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump when analyze() changes what it reports
+ENGINE_VERSION = 1
+
+# Dynamic import helpers whose first (string) argument is checked like an import
+_DYNAMIC_IMPORTS = {"__import__", "import_module"}
+
+# Violations that reject a submission outright under a rule's hard gate
+GATE_RULES = ("forbidden_import", "required_function")
+
+# Status of every execution result of a gated submission (never a pass)
+GATE_REJECTED_STATUS = "Rejected"
+
+
+class _Visitor(ast.NodeVisitor):
+    """
+    One pass over the tree collecting everything the rules need: defined
+    functions, imported modules and McCabe complexity per block (module
+    body, each function).
+
+    Complexity is 1 per block plus one per decision point: if/elif,
+    conditional expressions, loops, except handlers, match cases,
+    comprehension for/if clauses and each extra operand of and/or.
+    """
+
+    def __init__(self):
+        self.functions: List[str] = []
+        self.imports: List[Dict[str, Any]] = []
+        self.blocks: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+
+    # ---- blocks ----
+    def _enter(self, name: str, lineno: int) -> None:
+        block = {"name": name, "lineno": lineno, "complexity": 1}
+        self.blocks.append(block)
+        self._stack.append(block)
+
+    def _bump(self, n: int = 1) -> None:
+        self._stack[-1]["complexity"] += n
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self._enter("<module>", 1)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def _visit_function(self, node) -> None:
+        self.functions.append(node.name)
+        # Decorators and defaults belong to the enclosing block
+        for child in node.decorator_list + node.args.defaults + node.args.kw_defaults:
+            if child is not None:
+                self.visit(child)
+        self._enter(node.name, node.lineno)
+        for child in node.body:
+            self.visit(child)
+        self._stack.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    # ---- decision points ----
+    def _decision(self, node: ast.AST) -> None:
+        self._bump()
+        self.generic_visit(node)
+
+    visit_If = _decision
+    visit_IfExp = _decision
+    visit_For = _decision
+    visit_AsyncFor = _decision
+    visit_While = _decision
+    visit_ExceptHandler = _decision
+    visit_match_case = _decision
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self._bump(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self._bump(1 + len(node.ifs))
+        self.generic_visit(node)
+
+    # ---- imports ----
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append({"module": alias.name, "lineno": node.lineno})
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module and not node.level:
+            self.imports.append({"module": node.module, "lineno": node.lineno})
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if (
+            name in _DYNAMIC_IMPORTS
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+        ):
+            self.imports.append({"module": node.args[0].value, "lineno": node.lineno})
+        self.generic_visit(node)
+
+
+def _is_forbidden(module: str, forbidden: Iterable[str]) -> Optional[str]:
+    for name in forbidden:
+        if module == name or module.startswith(name + "."):
+            return name
+    return None
+
+
+def _unanalyzable(rule: str, message: str, lineno: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "passed": False,
+        "violations": [{"rule": rule, "message": message, "lineno": lineno}],
+        "cyclomatic_complexity": None,
+        "report": None,
+    }
+
+
+def analyze(
+    code_text: str,
+    required_functions: Iterable[str] = (),
+    forbidden_imports: Iterable[str] = (),
+    max_cyclomatic_complexity: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Parse once, visit once, check every rule. Returns
+    {"passed", "violations", "cyclomatic_complexity", "report"}; the report
+    lists the complexity of every block.
+
+    Pure function of its arguments (runs in the analysis pool).
+    """
+    visitor = _Visitor()
+    try:
+        tree = ast.parse(code_text, filename="main.py")
+        visitor.visit(tree)
+    except (SyntaxError, ValueError) as e:
+        message = getattr(e, "msg", None) or str(e)
+        return _unanalyzable("syntax", f"Code could not be parsed: {message}", getattr(e, "lineno", None))
+    except (RecursionError, MemoryError):
+        return _unanalyzable("syntax", "Code is too deeply nested to analyze")
+
+    violations: List[Dict[str, Any]] = []
+
+    defined = set(visitor.functions)
+    for name in required_functions or ():
+        if name not in defined:
+            violations.append(
+                {"rule": "required_function", "name": name, "message": f"Required function '{name}' is not defined"}
+            )
+
+    for item in visitor.imports:
+        banned = _is_forbidden(item["module"], forbidden_imports or ())
+        if banned:
+            violations.append(
+                {
+                    "rule": "forbidden_import",
+                    "name": item["module"],
+                    "lineno": item["lineno"],
+                    "message": f"Import of '{item['module']}' is not allowed",
+                }
+            )
+
+    complexity = max(block["complexity"] for block in visitor.blocks)
+    if max_cyclomatic_complexity is not None:
+        for block in visitor.blocks:
+            if block["complexity"] > max_cyclomatic_complexity:
+                violations.append(
+                    {
+                        "rule": "max_cyclomatic_complexity",
+                        "name": block["name"],
+                        "lineno": block["lineno"],
+                        "message": (
+                            f"Cyclomatic complexity of '{block['name']}' is {block['complexity']} "
+                            f"(max {max_cyclomatic_complexity})"
+                        ),
+                    }
+                )
+
+    return {
+        "passed": not violations,
+        "violations": violations,
+        "cyclomatic_complexity": complexity,
+        "report": {"engine": "ast", "blocks": visitor.blocks},
+    }
+
+
+def rule_checks(rule: Any) -> int:
+    """
+    Number of individual checks a rule makes (partial credit denominator).
+    """
+    return (
+        len(rule.required_functions or ())
+        + (1 if rule.forbidden_imports else 0)
+        + (1 if rule.max_cyclomatic_complexity is not None else 0)
+    )
+
+
+def _passed_checks(rule: Any, result: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    (passed, checks) for a report: all forbidden imports count as one
+    check, as does the complexity limit. Code that could not be analyzed
+    passes nothing; a rule without checks is passed outright.
+    """
+    violations = result.get("violations") or []
+    checks = rule_checks(rule)
+    if any(v.get("rule") in ("syntax", "timeout") for v in violations):
+        return 0, max(checks, 1)
+    if checks == 0:
+        return 1, 1
+    failed = len({v["name"] for v in violations if v["rule"] == "required_function"})
+    failed += 1 if any(v["rule"] == "forbidden_import" for v in violations) else 0
+    failed += 1 if any(v["rule"] == "max_cyclomatic_complexity" for v in violations) else 0
+    return checks - failed, checks
+
+
+def score(rule: Any, result: Dict[str, Any], points_possible: int) -> int:
+    """
+    Points for a report: proportional to the checks that passed.
+    """
+    if points_possible <= 0:
+        return 0
+    passed, checks = _passed_checks(rule, result)
+    return (points_possible * passed) // checks
+
+
+def fraction(rule: Any, result: Dict[str, Any]) -> float:
+    """
+    Share of the rule's checks a report passed (0.0 - 1.0), what the
+    static weight of an assignment applies to (independent of points).
+    """
+    passed, checks = _passed_checks(rule, result)
+    return passed / checks
+
+
+# -------------------------
+# Result cache: analysis is a pure function of (code, rule checks)
+# -------------------------
+_cache = TwoTierCache(
+    namespace="static",
+    ttl_seconds=getattr(settings, "static_analysis_cache_ttl_seconds", 86400),
+    l1_size=getattr(settings, "static_analysis_cache_l1_size", 1024),
+    use_redis=getattr(settings, "static_analysis_cache_redis_enabled", True),
+)
+
+
+def _cache_enabled() -> bool:
+    return bool(getattr(settings, "static_analysis_cache_enabled", True))
+
+
+def rule_hash(rule: Any) -> str:
+    """
+    Hash of what a rule checks (not its points, which only affect scoring).
+    """
+    material = {
+        "engine": ENGINE_VERSION,
+        "required_functions": list(rule.required_functions or ()),
+        "forbidden_imports": list(rule.forbidden_imports or ()),
+        "max_cyclomatic_complexity": rule.max_cyclomatic_complexity,
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cache_key(code_text: str, rule: Any) -> str:
+    code_hash = hashlib.sha256(code_text.encode("utf-8", "surrogatepass")).hexdigest()
+    return f"{code_hash}:{rule_hash(rule)}"
+
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    # A timeout says nothing about the code
+    return not any(v.get("rule") == "timeout" for v in result.get("violations") or [])
+
+
+def analyze_now(code_text: str, rule: Any) -> Dict[str, Any]:
+    """
+    Cached analysis, or analyze right here (no pool): for callers that
+    need the answer immediately, like the upload check.
+    """
+    key = cache_key(code_text, rule)
+    if _cache_enabled():
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+    result = analyze(*_args(code_text, rule))
+    if _cache_enabled():
+        _cache.set(key, result)
+    return result
+
+
+# -------------------------
+# Hard gate
+# -------------------------
+def gate_violations(rule: Any, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Violations that reject the submission without executing it ([] when
+    the rule has no hard gate).
+    """
+    if not getattr(rule, "hard_gate", False):
+        return []
+    return [v for v in result.get("violations") or [] if v.get("rule") in GATE_RULES]
+
+
+def gate_rejection(violations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Structured rejection stored in feedback_summary["rejection"].
+    """
+    return {
+        "reason": "static_gate",
+        "message": "Submission rejected by static rules; no tests were run.",
+        "violations": violations,
+    }
+
+
+def gate_result(violations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Execution result (Judge0 client shape) standing in for every run of
+    a gated submission.
+    """
+    return {
+        "stdout": "",
+        "stderr": "".join(v["message"] + "\n" for v in violations),
+        "status": GATE_REJECTED_STATUS,
+        "time": None,
+        "memory": None,
+    }
+
+
+# -------------------------
+# Analysis pool (one per worker process)
+# -------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+_daemon_warned = False
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool, _pool_pid, _daemon_warned
+    workers = int(getattr(settings, "static_analysis_workers", 0))
+    if workers <= 0:
+        return None
+    # Daemonic processes (Celery prefork children) may not have children
+    if multiprocessing.current_process().daemon:
+        if not _daemon_warned:
+            _daemon_warned = True
+            logger.warning(
+                "STATIC_ANALYSIS_WORKERS=%s has no effect in a daemonic (prefork) worker process; "
+                "analyzing inline. Use --pool=threads or --pool=solo for the pool.",
+                workers,
+            )
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["app.services.static_analysis"])
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _args(code_text: str, rule: Any) -> tuple:
+    return (
+        code_text,
+        tuple(rule.required_functions or ()),
+        tuple(rule.forbidden_imports or ()),
+        rule.max_cyclomatic_complexity,
+    )
+
+
+def _run_inline(args: tuple) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(analyze(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _cached_future(result: Dict[str, Any]) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    future.from_cache = True  # type: ignore[attr-defined]
+    return future
+
+
+def submit(code_text: str, rule: Any) -> Future:
+    """
+    Start analysis of `code_text` against `rule` (a StaticRule or bundle
+    snapshot) in the analysis pool, so it runs alongside the executions.
+    Without a pool (STATIC_ANALYSIS_WORKERS=0, a daemonic worker process
+    such as a Celery prefork child, or the pool is broken) it runs right
+    here.
+
+    Code already analyzed under the same rule checks is served from the
+    cache without being parsed again.
+    """
+    if _cache_enabled():
+        cached = _cache.get(cache_key(code_text, rule))
+        if cached is not None:
+            return _cached_future(cached)
+
+    args = _args(code_text, rule)
+    try:
+        pool = _get_pool()
+        if pool is not None:
+            return pool.submit(analyze, *args)
+    except (BrokenProcessPool, RuntimeError, OSError, AssertionError) as e:
+        # AssertionError: "daemonic processes are not allowed to have children"
+        logger.warning("Static analysis pool unavailable, analyzing inline: %s", e)
+        close_pool()
+    return _run_inline(args)
+
+
+def result_of(future: Future, code_text: str, rule: Any) -> Dict[str, Any]:
+    """
+    Wait for a submitted analysis (and cache it). A pool failure falls
+    back to analyzing inline; a timeout is reported as a failed check.
+    """
+    timeout = float(getattr(settings, "static_analysis_timeout_seconds", 10.0))
+    try:
+        result = future.result(timeout=timeout)
+    except BrokenProcessPool as e:
+        logger.warning("Static analysis pool broke, analyzing inline: %s", e)
+        close_pool()
+        result = _run_inline(_args(code_text, rule)).result()
+    except FutureTimeoutError:
+        future.cancel()
+        return _unanalyzable("timeout", "Static analysis timed out")
+
+    if _cache_enabled() and not getattr(future, "from_cache", False) and _is_cacheable(result):
+        _cache.set(cache_key(code_text, rule), result)
+    return result
+
+
+def close_pool() -> None:
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_pid = None
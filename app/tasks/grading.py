@@ -1,24 +1,50 @@
 # # app/tasks/grading.py
 from __future__ import annotations
 
+import logging
 import math
-from typing import Optional
+from concurrent.futures import Future
+from typing import Callable, Optional
 
+from celery import chord, group
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
+from app.config import get_settings
 from app.db import SessionLocal
 from app.models.models import (
-    Assignment,
-    IOTestCase,
-    UnitTestSpec,
     Submission,
     GradingRun,
     TestCaseResult,
     SubmissionStatus,
     GradingRunStatus,
+    PendingExecution,
+    StaticAnalysisReport,
 )
-from app.services.judge0_client import submit_code, poll_result
+from app.services import (
+    execution_cache,
+    execution_limits,
+    grading_bundle,
+    io_driver,
+    judge0_governor,
+    judge0_resilience,
+    preflight,
+    static_analysis,
+)
+from app.services.execution_backend import get_backend
+from app.services.grading_bundle import (
+    BundleAssignment,
+    BundleStaticRule,
+    BundleTestCase,
+    BundleUnitSpec,
+)
+from app.services.judge0_callbacks import callback_url_for
+from app.services.judge0_client import Judge0ClientError, _failure_result
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
 
 
 def _normalize_output(s: Optional[str]) -> str:
@@ -75,242 +101,1066 @@ def _build_unit_harness(student_code: str, instructor_asserts: str) -> str:
     )
 
 
-@celery_app.task
-def grade_submission(submission_id: int):
+def _driver_chunks(
+    assignment: BundleAssignment,
+    test_cases: list[BundleTestCase],
+) -> Optional[list[list[BundleTestCase]]]:
     """
-    Ticket 5.3 - IO grading only.
+    Batched driver mode (opt-in per assignment): IO cases grouped into one
+    harness execution per chunk, or None when every case runs on its own.
 
-    For each IO test case:
-    - execute student code with test stdin
-    - poll until done or timeout
-    - compare stdout to expected stdout (normalized)
-    - store TestCaseResult
-    - accumulate io_score
+    A chunk holds at most IO_DRIVER_MAX_CASES cases, and no more than fit
+    in the Judge0 time limit maximums at the assignment's per-case runtime
+    (see execution_limits.max_cases).
     """
-    db: Session = SessionLocal()
+    if not assignment.io_batched_driver or len(test_cases) < 2:
+        return None
+    size = min(
+        max(1, int(getattr(settings, "io_driver_max_cases", 50))),
+        execution_limits.max_cases(assignment),
+    )
+    if size < 2:
+        return None
+    return [test_cases[i:i + size] for i in range(0, len(test_cases), size)]
+
+
+def _build_executions(
+    submission: Submission,
+    assignment: BundleAssignment,
+    test_cases: list[BundleTestCase],
+    unit_spec: Optional[BundleUnitSpec],
+) -> list[dict]:
+    """
+    IO executions (one per test case, or one per driver chunk) followed by
+    the unit harness, if any, each carrying the assignment's limits.
+    """
+    chunks = _driver_chunks(assignment, test_cases)
+    if chunks is None:
+        limits = execution_limits.for_assignment(assignment)
+        executions = [
+            {"source_code": submission.code_text, "stdin": tc.stdin, "limits": limits}
+            for tc in test_cases
+        ]
+    else:
+        case_timeout = assignment.max_runtime_ms / 1000
+        executions = [
+            {
+                **io_driver.build_driver(submission.code_text, [tc.stdin for tc in chunk], case_timeout),
+                "limits": execution_limits.for_assignment(assignment, case_count=len(chunk)),
+            }
+            for chunk in chunks
+        ]
+
+    if unit_spec:
+        # max_runtime_ms is per program run, not per unit test suite: only
+        # memory and output are capped, time limits stay Judge0's defaults
+        limits = execution_limits.for_assignment(assignment)
+        executions.append(
+            {
+                "source_code": _build_unit_harness(submission.code_text, unit_spec.test_code),
+                "limits": {k: limits[k] for k in ("memory_limit", "max_file_size")},
+            }
+        )
+    return executions
+
+
+def _split_results(
+    submission: Submission,
+    assignment: BundleAssignment,
+    test_cases: list[BundleTestCase],
+    unit_spec: Optional[BundleUnitSpec],
+    results: list[dict],
+) -> tuple[list[dict], Optional[dict]]:
+    """
+    Inverse of _build_executions: per-test-case IO results and the unit result.
+    """
+    io_part = results[:-1] if unit_spec else results
+    unit_result = results[-1] if unit_spec else None
+
+    chunks = _driver_chunks(assignment, test_cases)
+    if chunks is None:
+        return list(io_part), unit_result
+
+    io_results: list[dict] = []
+    for chunk, result in zip(chunks, io_part):
+        stdins = [tc.stdin for tc in chunk]
+        delimiter = io_driver.driver_delimiter(submission.code_text, stdins)
+        io_results.extend(io_driver.parse_driver_output(result, delimiter, len(chunk)))
+    return io_results, unit_result
+
+
+def _io_dispatch(
+    submission: Submission,
+    assignment: BundleAssignment,
+    test_cases: list[BundleTestCase],
+) -> list[tuple[list[BundleTestCase], Optional[str]]]:
+    """
+    What each IO execution of _build_executions covers: its test cases and,
+    for a batched driver chunk, the record delimiter (None otherwise).
+    """
+    chunks = _driver_chunks(assignment, test_cases)
+    if chunks is None:
+        return [([tc], None) for tc in test_cases]
+    return [
+        (chunk, io_driver.driver_delimiter(submission.code_text, [tc.stdin for tc in chunk]))
+        for chunk in chunks
+    ]
+
+
+def _dispatched_io_results(
+    test_cases: list[BundleTestCase],
+    rows: list[PendingExecution],
+) -> tuple[list[dict], dict[int, int]]:
+    """
+    Per-test-case results of a dispatched run's IO rows, aligned with
+    `test_cases`, and the input_version each was produced from. Matched by
+    the cases recorded on the rows, not by position, so tests edited,
+    added or removed since dispatch are never paired with another test's
+    output. A test the run did not cover gets a failure result.
+    """
+    by_case: dict[int, tuple[dict, Optional[int]]] = {}
+    for row in rows:
+        result = row.result or _failure_result("No execution result recorded")
+        # Rows dispatched before the cases were recorded: one case each
+        cases = row.cases if row.cases is not None else [[row.io_test_case_id, None]]
+        if row.driver_delimiter:
+            results = io_driver.parse_driver_output(result, row.driver_delimiter, len(cases))
+        else:
+            results = [result]
+        for (case_id, input_version), case_result in zip(cases, results):
+            by_case[case_id] = (case_result, input_version)
+
+    io_results: list[dict] = []
+    input_versions: dict[int, int] = {}
+    for tc in test_cases:
+        result, input_version = by_case.get(tc.id, (None, None))
+        io_results.append(result or _failure_result("No execution result recorded"))
+        if input_version is not None:
+            input_versions[tc.id] = input_version
+    return io_results, input_versions
+
+
+def _execute_all(executions: list[dict]) -> list[dict]:
+    """
+    Run every execution of a submission and return results in input order.
+    Identical (code, stdin, limits) runs are served from the execution cache.
+    """
+    return execution_cache.execute_with_cache(executions, get_backend().execute_batch)
+
+
+def _grading_mode() -> str:
+    """
+    Effective GRADING_MODE. Callback and poller modes need a backend whose
+    tokens outlive this task; otherwise grading stays inline. Chord mode
+    runs each execution in its own task and works with any backend.
+    """
+    mode = getattr(settings, "grading_mode", "inline")
+    if mode in ("inline", "chord"):
+        return mode
+    if not get_backend().supports_callbacks:
+        return "inline"
+    if mode == "callback" and not getattr(settings, "judge0_callback_base_url", None):
+        return "inline"
+    return mode
+
+
+def _lease_id(grading_run_id: int, position: int) -> str:
+    return f"run:{grading_run_id}:{position}"
+
+
+def _dispatch_pending(
+    db: Session,
+    gr: GradingRun,
+    io_dispatch: list[tuple[list[BundleTestCase], Optional[str]]],
+    executions: list[dict],
+    mode: str,
+) -> bool:
+    """
+    Submit every execution and return without waiting; one PendingExecution
+    row per execution tracks it until finalize_grading_run scores the run.
+
+    callback: each execution carries a Judge0 callback_url. Results arrive
+              at /judge0/callbacks/..., and stragglers are polled after
+              JUDGE0_CALLBACK_FALLBACK_SECONDS.
+    poller:   the poll_pending_executions beat task fetches results for all
+              runs in batches. finalize is scheduled after
+              JUDGE0_POLLER_MAX_AGE_SECONDS only as a safety net.
+
+    Returns False (nothing dispatched) if the batch submit fails, so the
+    caller can grade inline instead.
+    """
+    # Rows exist before submission so no callback can outrun them; cache
+    # hits are complete from the start, only misses go to Judge0
+    rows = _pending_rows(db, gr, io_dispatch, executions)
+    to_submit = [row for row in rows if row.result is None]
+    db.commit()
+
+    if not to_submit:
+        finalize_grading_run.delay(gr.id)
+        return True
+
+    # In-flight slots are held until finalize (leases also expire on their own)
+    leases = [_lease_id(gr.id, row.position) for row in to_submit]
+    try:
+        judge0_governor.acquire(lease_ids=leases)
+        if mode == "callback":
+            items = [
+                {**executions[row.position], "callback_url": callback_url_for(gr.id, row.position)}
+                for row in to_submit
+            ]
+        else:
+            items = [executions[row.position] for row in to_submit]
+        tokens = get_backend().submit_batch(items)
+    except (Judge0ClientError, judge0_governor.Judge0CapacityError, ValueError) as e:
+        logger.warning("Judge0 %s dispatch failed for grading_run_id=%s, grading inline: %s", mode, gr.id, e)
+        judge0_governor.release(leases)
+        for row in rows:
+            db.delete(row)
+        db.commit()
+        return False
+
+    for row, token in zip(to_submit, tokens):
+        row.token = token
+        if token is None:
+            row.result = _failure_result("Judge0 rejected submission")
+            row.completed_at = func.now()
+
+    gr.judge0_io_tokens = {str(row.io_test_case_id): row.token for row in rows if row.kind == "io"}
+    gr.judge0_unit_token = next((row.token for row in rows if row.kind == "unit"), None)
+    db.commit()
+
+    if mode == "callback":
+        fallback_seconds = int(getattr(settings, "judge0_callback_fallback_seconds", 30))
+    else:
+        fallback_seconds = int(getattr(settings, "judge0_poller_max_age_seconds", 300)) + 30
+    finalize_grading_run.apply_async(args=[gr.id], countdown=fallback_seconds)
+    return True
+
+
+def _pending_rows(
+    db: Session,
+    gr: GradingRun,
+    io_dispatch: list[tuple[list[BundleTestCase], Optional[str]]],
+    executions: list[dict],
+) -> list[PendingExecution]:
+    """
+    One PendingExecution row per execution (not yet committed), recording
+    the cases, driver delimiter and limits it was dispatched with. Cache
+    hits are complete from the start.
+
+    `io_dispatch` (see _io_dispatch) is aligned with the IO executions;
+    anything after them is the unit harness.
+    """
+    rows = [
+        PendingExecution(
+            grading_run_id=gr.id,
+            position=i,
+            kind="io",
+            io_test_case_id=cases[0].id if delimiter is None else None,
+            cases=[[tc.id, tc.input_version] for tc in cases],
+            driver_delimiter=delimiter,
+        )
+        for i, (cases, delimiter) in enumerate(io_dispatch)
+    ]
+    if len(executions) > len(io_dispatch):
+        rows.append(PendingExecution(grading_run_id=gr.id, position=len(io_dispatch), kind="unit"))
+
+    for row, item in zip(rows, executions):
+        row.limits = item.get("limits")
+        row.cache_key = execution_cache.cache_key(item)
+        cached = execution_cache.get_by_key(row.cache_key)
+        if cached is not None:
+            row.result = cached
+            row.completed_at = func.now()
+    db.add_all(rows)
+    return rows
+
+
+def _dispatch_chord(
+    db: Session,
+    gr: GradingRun,
+    io_dispatch: list[tuple[list[BundleTestCase], Optional[str]]],
+    executions: list[dict],
+) -> None:
+    """
+    Chord mode: every uncached execution becomes a run_grading_execution
+    task, so one submission's tests run in parallel on any worker;
+    finalize_grading_run is the chord callback.
+    """
+    rows = _pending_rows(db, gr, io_dispatch, executions)
+    db.commit()
+
+    to_run = [row for row in rows if row.result is None]
+    if not to_run:
+        finalize_grading_run.delay(gr.id)
+        return
+
+    header = group(
+        run_grading_execution.s(gr.id, row.position, executions[row.position])
+        for row in to_run
+    )
+    chord(header)(finalize_grading_run.si(gr.id))
+
+
+# Results that fail a test whatever their output
+_NEVER_PASS_STATUSES = ("failed", preflight.SYNTAX_ERROR_STATUS, static_analysis.GATE_REJECTED_STATUS)
+
+
+def _start_static_analysis(
+    submission: Submission, static_rule: Optional[BundleStaticRule]
+) -> Optional[Future]:
+    """
+    Hand the submission to the static analysis pool (None without a rule),
+    so the AST pass runs while this process waits on executions.
+    """
+    if static_rule is None:
+        return None
+    return static_analysis.submit(submission.code_text, static_rule)
+
+
+def _static_result(
+    submission: Submission, static_rule: Optional[BundleStaticRule], future: Optional[Future]
+) -> Optional[dict]:
+    if static_rule is None:
+        return None
+    if future is None:
+        future = static_analysis.submit(submission.code_text, static_rule)
+    return static_analysis.result_of(future, submission.code_text, static_rule)
+
+
+def _screen(
+    submission: Submission, bundle: grading_bundle.GradingBundle
+) -> tuple[Optional[dict], Optional[dict], Optional[dict]]:
+    """
+    Checks that settle a submission without executing it: pre-flight
+    compile, then the static rule's hard gate.
+
+    Returns (stand-in result for every execution or None, gate rejection
+    or None, static analysis result if it had to be computed already).
+    """
+    static_rule = bundle.static_rule
+
+    if getattr(settings, "preflight_enabled", True):
+        syntax_error = preflight.check_syntax(submission.code_text)
+        if syntax_error is not None:
+            static_result = _static_result(submission, static_rule, None)
+            return preflight.syntax_error_result(syntax_error), None, static_result
+
+    if static_rule is not None and static_rule.hard_gate:
+        static_result = _static_result(submission, static_rule, None)
+        violations = static_analysis.gate_violations(static_rule, static_result)
+        if violations:
+            return (
+                static_analysis.gate_result(violations),
+                static_analysis.gate_rejection(violations),
+                static_result,
+            )
+        return None, None, static_result
+
+    return None, None, None
+
+
+def _weighted_total(parts: list[tuple[int, float]]) -> int:
+    """
+    Total score out of 100 from (weight, fraction earned) per component the
+    assignment grades. Weights are percentages; those of components the
+    assignment does not have are spread over the rest (equally when every
+    present component weighs 0).
+    """
+    if not parts:
+        return 0
+    weight_sum = sum(weight for weight, _ in parts)
+    if weight_sum <= 0:
+        return round(100 * sum(earned for _, earned in parts) / len(parts))
+    return round(100 * sum(weight * earned for weight, earned in parts) / weight_sum)
+
+
+def _finalize_run(
+    db: Session,
+    submission: Submission,
+    gr: GradingRun,
+    assignment: BundleAssignment,
+    test_cases: list[BundleTestCase],
+    unit_spec: Optional[BundleUnitSpec],
+    io_results: list[dict],
+    unit_result: Optional[dict],
+    static_rule: Optional[BundleStaticRule] = None,
+    static_result: Optional[dict] = None,
+    rejection: Optional[dict] = None,
+    input_versions: Optional[dict[int, int]] = None,
+) -> dict:
+    """
+    Score execution results, store TestCaseResults and the run summary,
+    and mark the run + submission completed.
+
+    `io_results` is aligned with `test_cases`; `unit_result` is the unit
+    harness execution (None when the assignment has no unit spec).
+    `static_result` is the static analysis of the code against
+    `static_rule` (both None when the assignment has no static rule).
+
+    io/unit/static scores are raw points; score_total is out of 100, each
+    component's share of its points (of its checks for static analysis)
+    weighted by the assignment's weight_io/weight_unit/weight_static
+    (see _weighted_total). `rejection` is the
+    hard gate's rejection, recorded in the summary when the code was
+    never executed. `input_versions` maps test case ids to the input_version
+    their result was produced from, when that is not the current one.
+
+    Everything is written in one transaction: a single multi-row INSERT for
+    the results, the static analysis report, plus one UPDATE each for the
+    run and the submission (and whatever the caller left pending in the
+    session).
+    """
+    total_points_possible = sum(tc.points for tc in test_cases)
+    io_score = 0
+    result_rows: list[dict] = []
+
+    # Breakdown summary (do not expose expected outputs)
+    visible_case_summaries = []
+    hidden_total = 0
+    hidden_passed = 0
+    hidden_points_awarded = 0
+
+    for tc, result in zip(test_cases, io_results):
+        student_stdout_raw = result.get("stdout") or ""
+        student_stderr_raw = result.get("stderr") or ""
+        exec_status = result.get("status") or "Unknown"
+
+        student_stdout_norm = _normalize_output(student_stdout_raw)
+        expected_norm = _normalize_output(tc.expected_stdout)
+
+        passed = (
+            exec_status not in _NEVER_PASS_STATUSES
+            and student_stdout_norm == expected_norm
+        )
+        points_awarded = tc.points if passed else 0
+
+        # store per-test result (bulk inserted below)
+        result_rows.append(
+            {
+                "grading_run_id": gr.id,
+                "io_test_case_id": tc.id,
+                "passed": passed,
+                "points_awarded": points_awarded,
+                "stdout": student_stdout_raw,
+                "stderr": student_stderr_raw,
+                "status": exec_status,
+                "time_ms": _seconds_to_ms(result.get("time")),
+                "memory_kb": result.get("memory"),
+                "input_version": (input_versions or {}).get(tc.id, tc.input_version),
+            }
+        )
+
+        io_score += points_awarded
+
+        # Summaries: hide hidden tests details
+        if tc.is_hidden:
+            hidden_total += 1
+            if passed:
+                hidden_passed += 1
+            hidden_points_awarded += points_awarded
+        else:
+            visible_case_summaries.append(
+                {
+                    "test_case_id": tc.id,
+                    "name": tc.name,
+                    "passed": passed,
+                    "points_awarded": points_awarded,
+                    "status": exec_status,
+                    "time_ms": _seconds_to_ms(result.get("time")),
+                    "memory_kb": result.get("memory"),
+                }
+            )
+
+    # ---------------------------
+    # UNIT TEST GRADING
+    # ---------------------------
+
+    unit_score = 0
+    unit_summary = None
+
+    if unit_spec:
+
+        try:
+            result = unit_result
+
+            stdout = (result.get("stdout") or "").strip()
+            stderr = (result.get("stderr") or "").strip()
+            status = result.get("status")
+
+            execution_status = status.get("description") if isinstance(status, dict) else status
+
+            passed = False
+            failure_summary = None
+
+            if "UNIT_TESTS_PASSED" in stdout:
+                passed = True
+                unit_score = unit_spec.points
+            else:
+                passed = False
+
+                # Summarize failure safely
+                if "AssertionError" in stdout:
+                    failure_summary = "Assertion failed"
+                elif "SyntaxError" in stderr:
+                    failure_summary = "Syntax error"
+                elif stderr:
+                    failure_summary = stderr.splitlines()[-1]
+                else:
+                    failure_summary = "Unit tests failed"
+
+            unit_summary = {
+                "passed": passed,
+                "points_awarded": unit_score,
+                "points_possible": unit_spec.points,
+                "execution_status": execution_status,
+                "failure_summary": failure_summary,
+            }
+
+        except Exception as e:
+            unit_summary = {
+                "passed": False,
+                "points_awarded": 0,
+                "points_possible": unit_spec.points,
+                "execution_status": "error",
+                "failure_summary": "Execution error",
+            }
+            unit_score = 0        
+
+    # ---------------------------
+    # STATIC ANALYSIS GRADING
+    # ---------------------------
+
+    static_score = 0
+    static_summary = None
+
+    if static_rule and static_result:
+        static_points_possible = static_rule.points
+        static_score = static_analysis.score(static_rule, static_result, static_points_possible)
+
+        db.add(
+            StaticAnalysisReport(
+                grading_run_id=gr.id,
+                passed=static_result["passed"],
+                violations=static_result["violations"],
+                cyclomatic_complexity=static_result["cyclomatic_complexity"],
+                radon_report=static_result["report"],
+            )
+        )
+
+        static_summary = {
+            "passed": static_result["passed"],
+            "points_awarded": static_score,
+            "points_possible": static_points_possible,
+            "cyclomatic_complexity": static_result["cyclomatic_complexity"],
+            "violations": static_result["violations"],
+        }
+
+    # All test case results in one statement (batched multi-row VALUES)
+    if result_rows:
+        db.execute(insert(TestCaseResult), result_rows)
+
+    # Update grading run scores
+    gr.io_score = io_score
+    gr.unit_score = unit_score
+    gr.static_score = static_score
+    weights = {}
+    parts = []
+    if test_cases:
+        io_earned = (
+            io_score / total_points_possible
+            if total_points_possible > 0
+            else sum(1 for row in result_rows if row["passed"]) / len(test_cases)
+        )
+        weights["io"] = assignment.weight_io
+        parts.append((assignment.weight_io, io_earned))
+    if unit_spec:
+        weights["unit"] = assignment.weight_unit
+        parts.append((assignment.weight_unit, 1.0 if unit_summary["passed"] else 0.0))
+    if static_rule and static_result:
+        weights["static"] = assignment.weight_static
+        parts.append((assignment.weight_static, static_analysis.fraction(static_rule, static_result)))
+    gr.score_total = _weighted_total(parts)
+
+    # Store IO, Unit, and Static summary in grading run (safe, no expected output)
+    gr.feedback_summary = {
+        "io": {
+            "io_score": io_score,
+            "io_points_possible": total_points_possible,
+            "total_tests": len(test_cases),
+            "visible_tests": len(visible_case_summaries),
+            "hidden_tests": hidden_total,
+            "hidden_passed": hidden_passed,
+            "hidden_points_awarded": hidden_points_awarded,
+            "visible_breakdown": visible_case_summaries,
+        },
+        "unit": unit_summary,
+        "static": static_summary,
+        "rejection": rejection,
+        "weights": weights,
+
+        "note": (
+            "Rejected by static rules before execution."
+            if rejection
+            else "IO, UNIT & STATIC grading complete."
+        ),
+    }
+
+    gr.status = GradingRunStatus.completed.value
+    submission.status = SubmissionStatus.completed.value
+    submission_id = submission.id
+
+    db.commit()
+
+    return {
+        "ok": True,
+        "submission_id": submission_id,
+        "io_score": io_score,
+        "io_total_points_possible": total_points_possible,
+        "unit_score": unit_score,
+        "unit_total_points_possible": unit_spec.points if unit_spec else 0,
+        "static_score": static_score,
+        "total_score": gr.score_total,
+        "status": SubmissionStatus.completed.value,
+    }
+
+
+# -------------------------
+# Grading plans (fresh grading and regrades)
+# -------------------------
+# Results and runs recorded before test suite versioning have no versions;
+# they were produced by the first version of every test and unit spec
+_UNVERSIONED = 1
+
+
+def breaker_cooldown() -> Optional[float]:
+    """
+    Seconds to hold off grading while Judge0 is known-unhealthy (circuit
+    breaker open), or None when executions can go ahead.
+    """
+    if get_backend().name == "judge0" and judge0_resilience.breaker.is_open():
+        return judge0_resilience.breaker.cooldown()
+    return None
+
+
+def _stored_result(row: TestCaseResult) -> dict:
+    """
+    A recorded TestCaseResult back in execution result shape, so it is
+    rescored exactly like a fresh one.
+    """
+    return {
+        "stdout": row.stdout or "",
+        "stderr": row.stderr or "",
+        "status": row.status,
+        "time": row.time_ms / 1000 if row.time_ms is not None else None,
+        "memory": row.memory_kb,
+    }
+
+
+def _stored_unit_result(summary: Optional[dict]) -> Optional[dict]:
+    """
+    The previous run's unit summary back in execution result shape (None if
+    it has none, or if the harness never really ran). _finalize_run derives
+    the same summary from it.
+    """
+    if not summary or summary.get("execution_status") in _NEVER_PASS_STATUSES:
+        return None
+    if summary.get("passed"):
+        return {"stdout": "UNIT_TESTS_PASSED", "stderr": "", "status": summary.get("execution_status")}
+    return {
+        "stdout": "",
+        "stderr": summary.get("failure_summary") or "",
+        "status": summary.get("execution_status"),
+    }
+
+
+class GradingPlan:
+    """
+    How one submission is graded against a bundle: the screening verdict
+    (pre-flight compile, then the static rules' hard gate), the executions
+    it needs and the recorded results it reuses.
+
+    Without a previous run every test is executed. With one (a regrade),
+    only the IO tests that are new, whose input changed (input_version) or
+    whose recorded result was an execution failure run again, plus the
+    unit harness if its spec changed; every other recorded output is
+    rescored against the current expected output and points. `full`
+    executes everything again.
+    """
+
+    def __init__(
+        self,
+        submission: Submission,
+        bundle: grading_bundle.GradingBundle,
+        previous: Optional[GradingRun] = None,
+        previous_results: Optional[dict[int, TestCaseResult]] = None,
+        full: bool = False,
+    ):
+        self.submission = submission
+        self.bundle = bundle
+        self.previous_run_id = previous.id if previous is not None else None
+        self.test_cases = list(bundle.test_cases)
+        self.unit_spec = bundle.unit_spec
+        self.stand_in, self.rejection, self.static_result = _screen(submission, bundle)
+        self.static_future: Optional[Future] = None
+        self.executed = 0
+
+        self.stale_cases: list[BundleTestCase] = []
+        self.reused: dict[int, dict] = {}
+        self.unit_result: Optional[dict] = None
+        self.run_unit = False
+        if self.stand_in is not None:
+            return
+
+        incremental = previous is not None and not full
+        rows = previous_results or {}
+        for tc in self.test_cases:
+            row = rows.get(tc.id) if incremental else None
+            if (
+                row is None
+                or (row.input_version or _UNVERSIONED) != tc.input_version
+                or (row.status or "failed") in _NEVER_PASS_STATUSES
+            ):
+                self.stale_cases.append(tc)
+            else:
+                self.reused[tc.id] = _stored_result(row)
+
+        if self.unit_spec:
+            if incremental and (previous.unit_spec_version or _UNVERSIONED) == self.unit_spec.version:
+                self.unit_result = _stored_unit_result((previous.feedback_summary or {}).get("unit"))
+            self.run_unit = self.unit_result is None
+
+    def executions(self) -> list[dict]:
+        if self.stand_in is not None:
+            return []
+        return _build_executions(
+            self.submission,
+            self.bundle.assignment,
+            self.stale_cases,
+            self.unit_spec if self.run_unit else None,
+        )
+
+    def _results(self, fresh: list[dict]) -> tuple[list[dict], Optional[dict]]:
+        """
+        (io_results aligned with the bundle's test cases, unit_result)
+        """
+        if self.stand_in is not None:
+            return [self.stand_in for _ in self.test_cases], (self.stand_in if self.unit_spec else None)
+
+        io_fresh, unit_fresh = _split_results(
+            self.submission,
+            self.bundle.assignment,
+            self.stale_cases,
+            self.unit_spec if self.run_unit else None,
+            fresh,
+        )
+        by_case = dict(self.reused)
+        by_case.update((tc.id, result) for tc, result in zip(self.stale_cases, io_fresh))
+        io_results = [by_case[tc.id] for tc in self.test_cases]
+        return io_results, (unit_fresh if self.run_unit else self.unit_result)
+
+    def finish(self, db: Session, gr: GradingRun, fresh: list[dict]) -> dict:
+        """
+        Score the plan's reused and `fresh` results (aligned with
+        executions()) into `gr` and complete it.
+        """
+        io_results, unit_result = self._results(fresh)
+        static_result = self.static_result
+        if static_result is None:
+            static_result = _static_result(self.submission, self.bundle.static_rule, self.static_future)
+        return _finalize_run(
+            db, self.submission, gr, self.bundle.assignment, self.test_cases, self.unit_spec,
+            io_results, unit_result,
+            static_rule=self.bundle.static_rule,
+            static_result=static_result,
+            rejection=self.rejection,
+        )
+
+
+def grade_plans(
+    db: Session,
+    plans: list[GradingPlan],
+    open_run: Callable[[GradingPlan], Optional[GradingRun]],
+) -> list[dict]:
+    """
+    Grade one or more submissions: every execution the plans need goes out
+    in one _execute_all call while static analysis runs in its pool, then
+    each plan is scored into the GradingRun `open_run(plan)` returns, in
+    its own transaction. `open_run` may return None to drop a plan.
+
+    Outcomes are aligned with `plans`. A plan that fails is rolled back and
+    reported as {"ok": False, "error": ...} without affecting the others.
+    """
+    for plan in plans:
+        if plan.static_result is None:
+            plan.static_future = _start_static_analysis(plan.submission, plan.bundle.static_rule)
+
+    executions: list[dict] = []
+    spans = []
+    for plan in plans:
+        items = plan.executions()
+        plan.executed = len(items)
+        spans.append((len(executions), len(executions) + len(items)))
+        executions.extend(items)
+    results = _execute_all(executions) if executions else []
+
+    outcomes = []
+    for plan, (start, end) in zip(plans, spans):
+        submission_id = plan.submission.id
+        try:
+            gr = open_run(plan)
+            if gr is None:
+                outcomes.append({"ok": True, "submission_id": submission_id, "skipped": True})
+                continue
+            outcomes.append(plan.finish(db, gr, results[start:end]))
+        except Exception as e:
+            db.rollback()
+            logger.exception("Grading submission_id=%s failed", submission_id)
+            outcomes.append({"ok": False, "submission_id": submission_id, "error": str(e)})
+    return outcomes
+
+
+@celery_app.task(bind=True, max_retries=10)
+def grade_submission(self, submission_id: int):
+    """
+    Grade a submission against its assignment's current grading bundle.
+
+    - open a GradingRun pinned to the bundle's grading_version
+    - screen the code (syntax check, static rule hard gate): rejected code
+      fails every test without a single execution
+    - execute every IO test (batched through the IO driver when enabled)
+      and the unit harness, with static analysis running meanwhile
+    - score IO, unit and static results into the run (_finalize_run;
+      score_total is the weighted percentage)
+
+    GRADING_MODE "inline" executes and scores here; "callback"/"poller"
+    and "chord" only dispatch, and the run is finalized once every
+    execution has a result.
+    """
+    # Judge0 known-unhealthy: park the task instead of burning a worker
+    # slot (and the student's score) on calls the breaker would refuse
+    cooldown = breaker_cooldown()
+    if cooldown is not None and self.request.retries < self.max_retries:
+        raise self.retry(countdown=cooldown)
+
+    # The run and submission are only written by this task: no reload
+    # round trip after each commit
+    db: Session = SessionLocal(expire_on_commit=False)
     try:
         submission = db.query(Submission).filter(Submission.id == submission_id).first()
         if not submission:
             return {"ok": False, "error": "Submission not found"}
 
-        assignment = db.query(Assignment).filter(Assignment.id == submission.assignment_id).first()
-        if not assignment:
+        # Tests, unit spec and limits: cached per worker by grading_version
+        bundle = grading_bundle.get_bundle(db, submission.assignment_id)
+        if not bundle:
             submission.status = SubmissionStatus.failed.value
             db.commit()
             return {"ok": False, "error": "Assignment not found"}
+        assignment = bundle.assignment
+        test_cases = list(bundle.test_cases)
+        unit_spec = bundle.unit_spec
 
-        # Create grading run
+        # Create grading run, link submission to it + mark running (one
+        # transaction; the flush only fetches the run id)
         gr = GradingRun(
             submission_id=submission.id,
             status=GradingRunStatus.running.value,
+            grading_version=bundle.version,
+            unit_spec_version=unit_spec.version if unit_spec else None,
         )
         db.add(gr)
-        db.commit()
-        db.refresh(gr)
+        db.flush()
 
-        # Link submission to latest run + mark running
         submission.latest_grading_run_id = gr.id
         submission.status = SubmissionStatus.running.value
         db.commit()
 
-        # Fetch IO test cases for assignment (independent execution per case)
-        test_cases = (
-            db.query(IOTestCase)
-            .filter(IOTestCase.assignment_id == assignment.id)
-            .order_by(IOTestCase.order_index.asc(), IOTestCase.id.asc())
-            .all()
-        )
+        # Syntax errors and hard gate violations fail every test here,
+        # without a single execution
+        plan = GradingPlan(submission, bundle)
 
-        total_points_possible = sum(tc.points for tc in test_cases)
-        io_score = 0
-
-        # Breakdown summary (do not expose expected outputs)
-        visible_case_summaries = []
-        hidden_total = 0
-        hidden_passed = 0
-        hidden_points_awarded = 0
-
-        for tc in test_cases:
-            stdin = tc.stdin if tc.stdin is not None else None
-
-            token = None
-            result = None
-
-            try:
-                token = submit_code(submission.code_text, stdin=stdin)
-                result = poll_result(token)
-            except Exception as e:
-                # Controlled failure for this test only
-                result = {
-                    "stdout": "",
-                    "stderr": f"Execution failed: {e}",
-                    "status": "failed",
-                    "time": None,
-                    "memory": None,
+        # All IO tests + the unit harness go to Judge0 together
+        executions = plan.executions()
+
+        mode = _grading_mode()
+        if executions and mode != "inline":
+            io_dispatch = _io_dispatch(submission, assignment, test_cases)
+            if mode == "chord":
+                _dispatch_chord(db, gr, io_dispatch, executions)
+                return {
+                    "ok": True,
+                    "submission_id": submission.id,
+                    "grading_run_id": gr.id,
+                    "status": submission.status,
+                    "mode": mode,
+                }
+            if _dispatch_pending(db, gr, io_dispatch, executions, mode):
+                return {
+                    "ok": True,
+                    "submission_id": submission.id,
+                    "grading_run_id": gr.id,
+                    "status": submission.status,
+                    "mode": mode,
                 }
 
-            student_stdout_raw = result.get("stdout") or ""
-            student_stderr_raw = result.get("stderr") or ""
-            exec_status = result.get("status") or "Unknown"
+        outcome = grade_plans(db, [plan], lambda _plan: gr)[0]
+        if not outcome["ok"]:
+            raise RuntimeError(outcome["error"])
+        return outcome
 
-            student_stdout_norm = _normalize_output(student_stdout_raw)
-            expected_norm = _normalize_output(tc.expected_stdout)
+    except Exception as e:
+        # Do not crash worker. Mark failed.
+        try:
+            submission = db.query(Submission).filter(Submission.id == submission_id).first()
+            if submission:
+                submission.status = SubmissionStatus.failed.value
+                db.commit()
+        except Exception:
+            pass
+        return {"ok": False, "error": str(e)}
 
-            passed = (exec_status != "failed") and (student_stdout_norm == expected_norm)
-            points_awarded = tc.points if passed else 0
+    finally:
+        db.close()
 
-            # store per-test result
-            tcr = TestCaseResult(
-                grading_run_id=gr.id,
-                io_test_case_id=tc.id,
-                passed=passed,
-                points_awarded=points_awarded,
-                stdout=student_stdout_raw,
-                stderr=student_stderr_raw,
-                status=exec_status,
-                time_ms=_seconds_to_ms(result.get("time")),
-                memory_kb=result.get("memory"),
-            )
-            db.add(tcr)
 
-            io_score += points_awarded
+@celery_app.task(acks_late=True)
+def run_grading_execution(grading_run_id: int, position: int, item: dict):
+    """
+    Chord mode: run one execution of a grading run and record its result
+    on the PendingExecution row.
 
-            # Summaries: hide hidden tests details
-            if tc.is_hidden:
-                hidden_total += 1
-                if passed:
-                    hidden_passed += 1
-                hidden_points_awarded += points_awarded
-            else:
-                visible_case_summaries.append(
-                    {
-                        "test_case_id": tc.id,
-                        "name": tc.name,
-                        "passed": passed,
-                        "points_awarded": points_awarded,
-                        "status": exec_status,
-                        "time_ms": _seconds_to_ms(result.get("time")),
-                        "memory_kb": result.get("memory"),
-                    }
-                )
-
-        # ---------------------------
-        # UNIT TEST GRADING
-        # ---------------------------
-
-        unit_score = 0
-        unit_summary = None
-
-        unit_spec = (
-            db.query(UnitTestSpec)
-            .filter(UnitTestSpec.assignment_id == assignment.id)
-            .first()
+    Redelivery-safe: a row that already has a result is left alone (and
+    not executed again), and a row removed by finalization is simply gone.
+    Never raises, so the chord callback always fires.
+    """
+    db: Session = SessionLocal()
+    try:
+        row_filter = (
+            PendingExecution.grading_run_id == grading_run_id,
+            PendingExecution.position == position,
+            PendingExecution.completed_at.is_(None),
         )
+        if db.query(PendingExecution.id).filter(*row_filter).first() is None:
+            return {"ok": True, "grading_run_id": grading_run_id, "position": position, "skipped": True}
+        db.rollback()  # no transaction held while the code runs
 
-        if unit_spec:
+        try:
+            result = _execute_all([item])[0]
+        except Exception as e:
+            result = _failure_result(f"Execution failed: {e}")
 
-            harness_code = _build_unit_harness(
-                submission.code_text,
-                unit_spec.test_code
-            )
+        db.query(PendingExecution).filter(*row_filter).update(
+            {"result": result, "completed_at": func.now()},
+            synchronize_session=False,
+        )
+        db.commit()
+        return {"ok": True, "grading_run_id": grading_run_id, "position": position}
+
+    except Exception as e:
+        db.rollback()
+        logger.exception("Recording execution %s of grading_run_id=%s failed", position, grading_run_id)
+        return {"ok": False, "error": str(e)}
 
-            try:
-                token = submit_code(harness_code)
-                result = poll_result(token)
+    finally:
+        db.close()
 
-                stdout = (result.get("stdout") or "").strip()
-                stderr = (result.get("stderr") or "").strip()
-                status = result.get("status")
 
-                execution_status = status.get("description") if isinstance(status, dict) else status
+@celery_app.task
+def finalize_grading_run(grading_run_id: int):
+    """
+    Callback / poller / chord mode: fold PendingExecution results into
+    TestCaseResults and complete the grading run.
 
-                passed = False
-                failure_summary = None
+    Enqueued by the callback endpoint or the poller once every execution
+    has reported (scheduled as a fallback after dispatch; anything still
+    missing at that point is polled), or as the chord callback. Safe to run
+    more than once: the run is locked and only one that is still `running`
+    gets finalized, so redelivered executions never count twice.
+    """
+    db: Session = SessionLocal(expire_on_commit=False)
+    try:
+        gr = (
+            db.query(GradingRun)
+            .filter(GradingRun.id == grading_run_id)
+            .with_for_update()
+            .first()
+        )
+        if not gr:
+            return {"ok": False, "error": "Grading run not found"}
+        if gr.status != GradingRunStatus.running.value:
+            return {"ok": True, "grading_run_id": gr.id, "status": gr.status, "skipped": True}
 
-                if "UNIT_TESTS_PASSED" in stdout:
-                    passed = True
-                    unit_score = unit_spec.points
-                else:
-                    passed = False
-
-                    # Summarize failure safely
-                    if "AssertionError" in stdout:
-                        failure_summary = "Assertion failed"
-                    elif "SyntaxError" in stderr:
-                        failure_summary = "Syntax error"
-                    elif stderr:
-                        failure_summary = stderr.splitlines()[-1]
-                    else:
-                        failure_summary = "Unit tests failed"
-
-                unit_summary = {
-                    "passed": passed,
-                    "points_awarded": unit_score,
-                    "points_possible": unit_spec.points,
-                    "execution_status": execution_status,
-                    "failure_summary": failure_summary,
-                }
+        submission = db.query(Submission).filter(Submission.id == gr.submission_id).first()
 
-            except Exception as e:
-                unit_summary = {
-                    "passed": False,
-                    "points_awarded": 0,
-                    "points_possible": unit_spec.points,
-                    "execution_status": "error",
-                    "failure_summary": "Execution error",
-                }
-                unit_score = 0        
-        
-        # Commit all test case results
-        db.commit()
+        rows = (
+            db.query(PendingExecution)
+            .filter(PendingExecution.grading_run_id == gr.id)
+            .order_by(PendingExecution.position.asc())
+            .all()
+        )
 
-        # Update grading run scores (unit/static still placeholders)
-        gr.io_score = io_score
-        gr.unit_score = unit_score
-        gr.static_score = 0
-        gr.score_total = gr.io_score + gr.unit_score + gr.static_score
-
-        # Store IO, Unit, and Static summary in grading run (safe, no expected output)
-        gr.feedback_summary = {
-            "io": {
-                "io_score": io_score,
-                "io_points_possible": total_points_possible,
-                "total_tests": len(test_cases),
-                "visible_tests": len(visible_case_summaries),
-                "hidden_tests": hidden_total,
-                "hidden_passed": hidden_passed,
-                "hidden_points_awarded": hidden_points_awarded,
-                "visible_breakdown": visible_case_summaries,
-            },
-            "unit": unit_summary,
-
-            "note": "IO & UNIT grading complete. Static grading not enabled yet.",
-        }
+        bundle = grading_bundle.get_bundle(db, submission.assignment_id)
+        if not bundle:
+            raise ValueError("Assignment not found")
+        test_cases = list(bundle.test_cases)
+        unit_spec = bundle.unit_spec
+        static_future = _start_static_analysis(submission, bundle.static_rule)
 
-        gr.status = GradingRunStatus.completed.value
-        submission.status = SubmissionStatus.completed.value
+        # Polling fallback for tokens that never called back
+        missing = [row for row in rows if row.completed_at is None and row.token]
+        if missing:
+            logger.info(
+                "Polling %s execution(s) without callback for grading_run_id=%s",
+                len(missing),
+                gr.id,
+            )
+            deadline = execution_limits.poll_deadline(row.limits for row in missing)
+            tokens = [row.token for row in missing]
+            for row, result in zip(missing, get_backend().poll_batch(tokens, timeout_seconds=deadline)):
+                row.result = result
+                row.completed_at = func.now()
 
-        db.commit()
-        db.refresh(gr)
+        for row in rows:
+            if row.cache_key and row.result:
+                execution_cache.put_by_key(row.cache_key, row.result)
 
-        return {
-            "ok": True,
-            "submission_id": submission.id,
-            "io_score": io_score,
-            "io_total_points_possible": total_points_possible,
-            "unit_score": unit_score,
-            "unit_total_points_possible": unit_spec.points,
-            "static_score": 0,
-            "total_score": io_score + unit_score + 0,
-            "status": submission.status,
-        }
+        # Scored against what was dispatched (gr.grading_version), whatever
+        # the tests look like now
+        io_results, input_versions = _dispatched_io_results(
+            test_cases, [row for row in rows if row.kind == "io"]
+        )
+        unit_result = next((row.result for row in rows if row.kind == "unit"), None)
+        if unit_spec and unit_result is None:
+            unit_result = _failure_result("No execution result recorded")
+
+        judge0_governor.release([_lease_id(gr.id, row.position) for row in rows if row.token])
+        # One DELETE in the final transaction; polled results above were
+        # only needed in memory
+        for row in rows:
+            db.expunge(row)
+        db.query(PendingExecution).filter(PendingExecution.grading_run_id == gr.id).delete(
+            synchronize_session=False
+        )
+
+        return _finalize_run(
+            db, submission, gr, bundle.assignment, test_cases, unit_spec, io_results, unit_result,
+            static_rule=bundle.static_rule,
+            static_result=_static_result(submission, bundle.static_rule, static_future),
+            input_versions=input_versions,
+        )
 
     except Exception as e:
+        db.rollback()
         # Do not crash worker. Mark failed.
         try:
-            submission = db.query(Submission).filter(Submission.id == submission_id).first()
-            if submission:
-                submission.status = SubmissionStatus.failed.value
+            gr = db.query(GradingRun).filter(GradingRun.id == grading_run_id).first()
+            if gr:
+                gr.status = GradingRunStatus.failed.value
+                gr.error_message = str(e)
+                submission = db.query(Submission).filter(Submission.id == gr.submission_id).first()
+                if submission:
+                    submission.status = SubmissionStatus.failed.value
                 db.commit()
         except Exception:
             pass
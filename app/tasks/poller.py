@@ -0,0 +1,141 @@
+# app/tasks/poller.py
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.celery_app import celery_app
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models.models import PendingExecution
+from app.services.execution_backend import get_backend
+from app.services.judge0_client import Judge0ClientError, _failure_result
+from app.tasks.grading import finalize_grading_run
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(ignore_result=True)
+def poll_pending_executions():
+    """
+    Poller mode: one batched, non-blocking status check for the oldest
+    outstanding executions across all grading runs (at most
+    JUDGE0_POLLER_BATCH_SIZE per tick). Finished results are written to
+    their PendingExecution rows, and runs with nothing left outstanding are
+    handed to finalize_grading_run.
+
+    Nothing sleeps here; the beat schedule is the loop, so worker slots are
+    never held while Judge0 works. A tick claims its rows (claimed_at lease,
+    under SKIP LOCKED, committed at once) and fetches them outside any
+    transaction, so no row locks or connection are held across the Judge0
+    call and overlapping ticks never fetch the same token twice. A claim
+    left behind by a tick that died expires after JUDGE0_POLLER_LEASE_SECONDS.
+    """
+    if getattr(settings, "grading_mode", "inline") != "poller":
+        return {"ok": True, "skipped": True}
+
+    backend = get_backend()
+    if not backend.supports_callbacks:
+        return {"ok": True, "skipped": True}
+
+    batch_size = int(getattr(settings, "judge0_poller_batch_size", 200))
+    max_age = timedelta(seconds=float(getattr(settings, "judge0_poller_max_age_seconds", 300)))
+    lease = timedelta(seconds=float(getattr(settings, "judge0_poller_lease_seconds", 60)))
+
+    db: Session = SessionLocal()
+    try:
+        # 1) Claim
+        now = datetime.now(timezone.utc)
+        claimed = (
+            db.query(PendingExecution.id, PendingExecution.token, PendingExecution.created_at)
+            .filter(
+                PendingExecution.completed_at.is_(None),
+                PendingExecution.token.isnot(None),
+                or_(PendingExecution.claimed_at.is_(None), PendingExecution.claimed_at < now - lease),
+            )
+            .order_by(PendingExecution.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not claimed:
+            db.commit()
+            return {"ok": True, "polled": 0}
+        ids = [row_id for row_id, _, _ in claimed]
+        db.query(PendingExecution).filter(PendingExecution.id.in_(ids)).update(
+            {PendingExecution.claimed_at: now}, synchronize_session=False
+        )
+        db.commit()
+
+        # 2) Fetch (no transaction open)
+        try:
+            results = backend.fetch_batch([token for _, token, _ in claimed])
+        except Judge0ClientError as e:
+            # Leave everything outstanding; the next tick tries again
+            _release(db, ids)
+            logger.warning("Poller could not fetch %s execution(s): %s", len(claimed), e)
+            return {"ok": False, "error": str(e)}
+
+        # 3) Record finished results. A row completed meanwhile (by a
+        # callback) or already finalized is left alone
+        now = datetime.now(timezone.utc)
+        touched: set[int] = set()
+        for (row_id, _, created_at), result in zip(claimed, results):
+            if result is None and now - created_at > max_age:
+                result = _failure_result("Judge0 polling timeout exceeded")
+            if result is None:
+                continue
+            grading_run_id = db.execute(
+                update(PendingExecution)
+                .where(PendingExecution.id == row_id, PendingExecution.completed_at.is_(None))
+                .values(result=result, completed_at=func.now(), claimed_at=None)
+                .returning(PendingExecution.grading_run_id)
+            ).scalar_one_or_none()
+            if grading_run_id is not None:
+                touched.add(grading_run_id)
+        db.commit()
+        _release(db, ids)
+
+        # Wake aggregation for runs whose executions have all reported
+        ready: list[int] = []
+        if touched:
+            outstanding = {
+                run_id
+                for (run_id,) in db.query(PendingExecution.grading_run_id)
+                .filter(
+                    PendingExecution.grading_run_id.in_(touched),
+                    PendingExecution.completed_at.is_(None),
+                )
+                .distinct()
+            }
+            ready = sorted(touched - outstanding)
+        for grading_run_id in ready:
+            finalize_grading_run.delay(grading_run_id)
+
+        return {"ok": True, "polled": len(claimed), "finalized": len(ready)}
+
+    except Exception as e:
+        db.rollback()
+        logger.exception("Poller tick failed")
+        return {"ok": False, "error": str(e)}
+
+    finally:
+        db.close()
+
+
+def _release(db: Session, ids: list[int]) -> None:
+    """
+    Give this tick's claims on still outstanding rows back, so the next
+    tick polls them again right away.
+    """
+    db.rollback()
+    db.query(PendingExecution).filter(
+        PendingExecution.id.in_(ids),
+        PendingExecution.completed_at.is_(None),
+    ).update({PendingExecution.claimed_at: None}, synchronize_session=False)
+    db.commit()
@@ -0,0 +1,233 @@
+# app/tasks/regrade.py
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from celery.exceptions import Retry
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.celery_app import celery_app
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models.models import (
+    GradingRun,
+    GradingRunStatus,
+    RegradeJob,
+    RegradeJobStatus,
+    RegradeScope,
+    Submission,
+    SubmissionStatus,
+    TestCaseResult,
+)
+from app.services import grading_bundle
+from app.services.grading_bundle import GradingBundle
+from app.tasks.grading import GradingPlan, breaker_cooldown, grade_plans
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_STATUSES = (RegradeJobStatus.queued.value, RegradeJobStatus.running.value)
+
+
+def _wave_interval() -> float:
+    return float(getattr(settings, "regrade_wave_interval_seconds", 5.0))
+
+
+def _regrade_batch(db: Session, bundle: GradingBundle, submissions: list[Submission], full: bool) -> dict:
+    """
+    Regrade one batch of submissions through grade_plans: every execution
+    the batch needs goes out together; each submission then gets its new
+    run in its own transaction.
+    """
+    previous_runs = {
+        run.id: run
+        for run in db.query(GradingRun).filter(
+            GradingRun.id.in_([s.latest_grading_run_id for s in submissions])
+        )
+    }
+    rows_by_run: dict[int, dict[int, TestCaseResult]] = {}
+    for row in db.query(TestCaseResult).filter(TestCaseResult.grading_run_id.in_(list(previous_runs))):
+        rows_by_run.setdefault(row.grading_run_id, {})[row.io_test_case_id] = row
+
+    plans = []
+    for submission in submissions:
+        previous = previous_runs.get(submission.latest_grading_run_id)
+        if previous is None:
+            continue
+        if not full and previous.grading_version == bundle.version:
+            continue  # already graded against this suite
+        plans.append(GradingPlan(submission, bundle, previous, rows_by_run.get(previous.id, {}), full))
+
+    def open_run(plan: GradingPlan) -> Optional[GradingRun]:
+        gr = GradingRun(
+            submission_id=plan.submission.id,
+            status=GradingRunStatus.running.value,
+            grading_version=bundle.version,
+            unit_spec_version=plan.unit_spec.version if plan.unit_spec else None,
+        )
+        db.add(gr)
+        db.flush()
+
+        # The pointer flips in the same transaction that completes the
+        # new run, and only from the run this plan was built on
+        flipped = (
+            db.query(Submission)
+            .filter(
+                Submission.id == plan.submission.id,
+                Submission.latest_grading_run_id == plan.previous_run_id,
+            )
+            .update({"latest_grading_run_id": gr.id}, synchronize_session=False)
+        )
+        if not flipped:
+            db.rollback()
+            return None
+        set_committed_value(plan.submission, "latest_grading_run_id", gr.id)
+        return gr
+
+    outcomes = grade_plans(db, plans, open_run)
+    regraded = sum(1 for o in outcomes if o["ok"] and not o.get("skipped"))
+    failed = sum(1 for o in outcomes if not o["ok"])
+
+    return {
+        "regraded": regraded,
+        "skipped": len(submissions) - regraded - failed,
+        "failed": failed,
+        "executions": sum(plan.executed for plan in plans),
+    }
+
+
+def eligible_submissions(db: Session, assignment_id: int, scope: str):
+    """
+    Query of the submissions a regrade job covers: graded ones, or only
+    each student's latest (if that one is graded).
+    """
+    query = db.query(Submission).filter(
+        Submission.assignment_id == assignment_id,
+        Submission.status == SubmissionStatus.completed.value,
+        Submission.latest_grading_run_id.isnot(None),
+    )
+    if scope == RegradeScope.latest.value:
+        latest_ids = (
+            db.query(func.max(Submission.id))
+            .filter(Submission.assignment_id == assignment_id)
+            .group_by(Submission.student_id)
+        )
+        query = query.filter(Submission.id.in_(latest_ids))
+    return query
+
+
+def _finish_job(db: Session, job_id: int, status: str, error_message: Optional[str] = None) -> None:
+    db.query(RegradeJob).filter(
+        RegradeJob.id == job_id,
+        RegradeJob.status.in_(_ACTIVE_STATUSES),
+    ).update(
+        {"status": status, "finished_at": func.now(), "error_message": error_message},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+@celery_app.task(bind=True, max_retries=5)
+def run_regrade_wave(self, job_id: int):
+    """
+    Process the next wave (REGRADE_WAVE_SIZE submissions after the job's
+    cursor) of a bulk regrade job, then schedule the following wave
+    REGRADE_WAVE_INTERVAL_SECONDS later. Runs on the regrade queue, so
+    fresh submissions never wait behind a bulk regrade.
+
+    Each submission is regraded incrementally: only the IO tests whose
+    input changed (input_version), that are new, or whose recorded result
+    was an execution failure are executed, plus the unit harness if its
+    spec changed. Every other recorded output is reused and rescored
+    against the current expected output and points. A submission already
+    graded at the current grading_version is skipped unless the job is
+    `full` (re-execute everything, e.g. after a limit change).
+
+    Submissions go through grade_plans, like grade_submission (same
+    screening, execution and scoring). A cancelled job stops at the next
+    wave. While the Judge0 circuit breaker is open the next wave waits for
+    its cooldown; a wave that cannot run at all is retried with backoff
+    before the job fails.
+    """
+    db: Session = SessionLocal(expire_on_commit=False)
+    try:
+        job = db.query(RegradeJob).filter(RegradeJob.id == job_id).with_for_update().first()
+        if not job or job.status not in _ACTIVE_STATUSES:
+            db.rollback()
+            return {"ok": True, "job_id": job_id, "skipped": True}
+
+        # Judge0 known-unhealthy: hold the wave until the breaker's cooldown
+        # is over, without spending a retry
+        cooldown = breaker_cooldown()
+        if cooldown is not None:
+            db.rollback()
+            run_regrade_wave.apply_async((job_id,), countdown=cooldown)
+            return {"ok": True, "job_id": job_id, "deferred": True}
+
+        bundle = grading_bundle.get_bundle(db, job.assignment_id)
+        if not bundle:
+            db.rollback()
+            _finish_job(db, job_id, RegradeJobStatus.failed.value, "Assignment not found")
+            return {"ok": False, "error": "Assignment not found"}
+
+        if job.status == RegradeJobStatus.queued.value:
+            job.status = RegradeJobStatus.running.value
+            job.started_at = func.now()
+
+        wave_size = max(1, int(getattr(settings, "regrade_wave_size", 50)))
+        submissions = (
+            eligible_submissions(db, job.assignment_id, job.scope)
+            .filter(Submission.id > job.cursor)
+            .options(selectinload(Submission.code_blob))  # the wave's source in one query
+            .order_by(Submission.id.asc())
+            .limit(wave_size)
+            .all()
+        )
+        full = job.full
+        db.commit()  # the job row is not held while the wave runs
+
+        if not submissions:
+            _finish_job(db, job_id, RegradeJobStatus.completed.value)
+            return {"ok": True, "job_id": job_id, "status": RegradeJobStatus.completed.value}
+
+        try:
+            counts = _regrade_batch(db, bundle, submissions, full)
+        except Exception as e:
+            db.rollback()
+            if self.request.retries < self.max_retries:
+                logger.warning("Regrade wave of job_id=%s failed, retrying: %s", job_id, e)
+                raise self.retry(countdown=_wave_interval() * 2 ** (self.request.retries + 1))
+            raise
+
+        db.query(RegradeJob).filter(RegradeJob.id == job_id).update(
+            {
+                "done": RegradeJob.done + counts["regraded"] + counts["skipped"],
+                "failed": RegradeJob.failed + counts["failed"],
+                "cursor": submissions[-1].id,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+
+        logger.info("Regrade job_id=%s wave at grading_version=%s: %s", job_id, bundle.version, counts)
+        run_regrade_wave.apply_async((job_id,), countdown=_wave_interval())
+        return {"ok": True, "job_id": job_id, **counts}
+
+    except Retry:
+        raise
+
+    except Exception as e:
+        db.rollback()
+        logger.exception("Regrade job_id=%s failed", job_id)
+        try:
+            _finish_job(db, job_id, RegradeJobStatus.failed.value, str(e))
+        except Exception:
+            pass
+        return {"ok": False, "error": str(e)}
+
+    finally:
+        db.close()
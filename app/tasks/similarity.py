@@ -0,0 +1,101 @@
+# app/tasks/similarity.py
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.celery_app import celery_app
+from app.db import SessionLocal
+from app.models.models import Submission, SubmissionFingerprint
+from app.services import similarity
+
+logger = logging.getLogger(__name__)
+
+# Submissions loaded per query while backfilling
+BACKFILL_BATCH_SIZE = 200
+
+
+def unindexed_submissions(db: Session, assignment_id: int):
+    """
+    Query of the assignment's submissions that have no fingerprint yet
+    (uploaded before similarity indexing existed or while it was disabled).
+    """
+    return (
+        db.query(Submission)
+        .outerjoin(SubmissionFingerprint, SubmissionFingerprint.submission_id == Submission.id)
+        .filter(Submission.assignment_id == assignment_id, SubmissionFingerprint.id.is_(None))
+    )
+
+
+@celery_app.task(ignore_result=True)
+def index_submission_similarity(submission_id: int):
+    """
+    Add a new submission to its assignment's similarity index (MinHash
+    signature + LSH buckets) and record its near-duplicate pairs.
+    Safe to run more than once.
+    """
+    db: Session = SessionLocal()
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if not submission:
+            return {"ok": False, "error": "Submission not found"}
+
+        pairs = similarity.index_submission(db, submission)
+        db.commit()
+        return {"ok": True, "submission_id": submission_id, "pairs": pairs}
+
+    except Exception as e:
+        db.rollback()
+        logger.exception("Similarity indexing failed for submission_id=%s", submission_id)
+        return {"ok": False, "error": str(e)}
+
+    finally:
+        db.close()
+
+
+@celery_app.task(ignore_result=True)
+def backfill_similarity(assignment_id: int):
+    """
+    Index every submission of an assignment that is not indexed yet, oldest
+    first, in batches of BACKFILL_BATCH_SIZE. Each submission is committed
+    on its own, so the assignment lock is held briefly and new uploads keep
+    indexing meanwhile. Safe to run more than once.
+    """
+    db: Session = SessionLocal()
+    indexed = failed = pairs = 0
+    last_id = 0
+    try:
+        while True:
+            batch = (
+                unindexed_submissions(db, assignment_id)
+                .filter(Submission.id > last_id)
+                .options(selectinload(Submission.code_blob))
+                .order_by(Submission.id.asc())
+                .limit(BACKFILL_BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for submission in batch:
+                try:
+                    pairs += similarity.index_submission(db, submission)
+                    db.commit()
+                    indexed += 1
+                except Exception:
+                    db.rollback()
+                    failed += 1
+                    logger.exception("Similarity backfill failed for submission_id=%s", submission.id)
+            # Drop the batch from the identity map before loading the next one
+            db.expunge_all()
+
+        logger.info(
+            "Similarity backfill of assignment_id=%s: indexed=%s failed=%s pairs=%s",
+            assignment_id, indexed, failed, pairs,
+        )
+        return {"ok": True, "assignment_id": assignment_id, "indexed": indexed, "failed": failed, "pairs": pairs}
+
+    finally:
+        db.close()
@@ -0,0 +1,247 @@
+# scripts/bench_grading_writes.py
+"""
+DB time per graded submission: legacy result write path vs the current one.
+
+Needs a migrated database (DATABASE_URL, `alembic upgrade head`); no Judge0,
+Redis or Celery. Creates a throwaway instructor/assignment/student with the
+requested number of IO test cases, grades the same submission repeatedly
+with synthetic execution results, and removes everything afterwards:
+
+    python scripts/bench_grading_writes.py --tests 50 500 --runs 20
+
+"legacy" replays what the grader used to do: run creation and status link
+as separate commits with a refresh, one ORM TestCaseResult per test,
+a commit for the results and another for the scores plus a refresh.
+"current" is app.tasks.grading as shipped: one commit for the run setup
+and one transaction (multi-row INSERT + two UPDATEs) for the results.
+
+Reported per graded submission: wall time spent in the database layer,
+statements sent (an executemany counts once) and commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Ensure project root is in PYTHONPATH when running: python scripts/bench_grading_writes.py
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+# Only the database is used
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("JUDGE0_BASE_URL", "http://judge0.bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+os.environ["EXECUTION_CACHE_ENABLED"] = "false"
+
+from sqlalchemy import event
+
+from app.db import SessionLocal, engine
+from app.models.models import (
+    Assignment,
+    GradingRun,
+    GradingRunStatus,
+    IOTestCase,
+    Submission,
+    SubmissionStatus,
+    TestCaseResult,
+    User,
+)
+from app.services import code_storage
+from app.services.grading_bundle import BundleTestCase
+from app.tasks.grading import _finalize_run
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args, **kwargs) -> None:
+        self.statements += 1
+
+    def _on_commit(self, *args, **kwargs) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+
+def _results(tests: int) -> list[dict]:
+    # Half pass, half fail, realistic output sizes
+    return [
+        {
+            "stdout": f"{i}\n" if i % 2 == 0 else "wrong\n",
+            "stderr": "",
+            "status": "Accepted",
+            "time": "0.012",
+            "memory": 3000,
+        }
+        for i in range(tests)
+    ]
+
+
+def _setup(db, tests: int) -> tuple[int, int, int, list[BundleTestCase]]:
+    tag = uuid.uuid4().hex[:8]
+    instructor = User(email=f"bench-{tag}-i@bench.local", password_hash="x", role="instructor")
+    student = User(email=f"bench-{tag}-s@bench.local", password_hash="x", role="student")
+    db.add_all([instructor, student])
+    db.flush()
+
+    assignment = Assignment(instructor_id=instructor.id, title=f"bench {tag}", description="bench")
+    db.add(assignment)
+    db.flush()
+
+    cases = [
+        IOTestCase(
+            assignment_id=assignment.id,
+            name=f"case {i}",
+            stdin=f"{i}\n",
+            expected_stdout=f"{i}\n",
+            points=1,
+            is_hidden=i % 3 == 0,
+            order_index=i,
+        )
+        for i in range(tests)
+    ]
+    db.add_all(cases)
+    submission = Submission(
+        assignment_id=assignment.id,
+        student_id=student.id,
+        code_sha256=code_storage.put(db, "print(input())"),
+    )
+    db.add(submission)
+    db.commit()
+
+    bundle_cases = [
+        BundleTestCase(
+            id=tc.id,
+            name=tc.name,
+            stdin=tc.stdin,
+            expected_stdout=tc.expected_stdout,
+            points=tc.points,
+            is_hidden=tc.is_hidden,
+        )
+        for tc in cases
+    ]
+    return instructor.id, student.id, submission.id, bundle_cases
+
+
+def grade_legacy(submission_id: int, test_cases: list[BundleTestCase], results: list[dict]) -> None:
+    db = SessionLocal()
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+
+        gr = GradingRun(submission_id=submission.id, status=GradingRunStatus.running.value)
+        db.add(gr)
+        db.commit()
+        db.refresh(gr)
+
+        submission.latest_grading_run_id = gr.id
+        submission.status = SubmissionStatus.running.value
+        db.commit()
+
+        io_score = 0
+        for tc, result in zip(test_cases, results):
+            passed = result["stdout"].strip() == tc.expected_stdout.strip()
+            points = tc.points if passed else 0
+            db.add(
+                TestCaseResult(
+                    grading_run_id=gr.id,
+                    io_test_case_id=tc.id,
+                    passed=passed,
+                    points_awarded=points,
+                    stdout=result["stdout"],
+                    stderr=result["stderr"],
+                    status=result["status"],
+                    time_ms=12,
+                    memory_kb=result["memory"],
+                )
+            )
+            io_score += points
+        db.commit()
+
+        gr.io_score = io_score
+        gr.score_total = io_score
+        gr.feedback_summary = {"io": {"io_score": io_score}}
+        gr.status = GradingRunStatus.completed.value
+        submission.status = SubmissionStatus.completed.value
+        db.commit()
+        db.refresh(gr)
+    finally:
+        db.close()
+
+
+def grade_current(submission_id: int, test_cases: list[BundleTestCase], results: list[dict]) -> None:
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+
+        gr = GradingRun(submission_id=submission.id, status=GradingRunStatus.running.value)
+        db.add(gr)
+        db.flush()
+        submission.latest_grading_run_id = gr.id
+        submission.status = SubmissionStatus.running.value
+        db.commit()
+
+        _finalize_run(db, submission, gr, test_cases, None, results, None)
+    finally:
+        db.close()
+
+
+def _cleanup(user_ids: tuple[int, int]) -> None:
+    db = SessionLocal()
+    try:
+        # Cascades to the assignment, tests, submission, runs and results
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, nargs="+", default=[50, 500], help="IO test cases per submission")
+    parser.add_argument("--runs", type=int, default=20, help="graded submissions per path")
+    args = parser.parse_args()
+
+    counter = StatementCounter()
+    print(f"{'tests':>6} {'path':<8} {'ms/submission (median)':>23} {'p95 ms':>8} {'statements':>11} {'commits':>8}")
+
+    for tests in args.tests:
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            instructor_id, student_id, submission_id, test_cases = _setup(db, tests)
+        finally:
+            db.close()
+        results = _results(tests)
+
+        try:
+            for label, grade in (("legacy", grade_legacy), ("current", grade_current)):
+                grade(submission_id, test_cases, results)  # warm up connection + statement cache
+                timings = []
+                counter.reset()
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    grade(submission_id, test_cases, results)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                print(
+                    f"{tests:>6} {label:<8} {statistics.median(timings):>23.2f} {p95:>8.2f} "
+                    f"{counter.statements / args.runs:>11.1f} {counter.commits / args.runs:>8.1f}"
+                )
+        finally:
+            _cleanup((instructor_id, student_id))
+
+
+if __name__ == "__main__":
+    main()
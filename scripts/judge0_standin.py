@@ -0,0 +1,441 @@
+# scripts/judge0_standin.py
+"""
+Judge0-compatible stand-in server for load, latency and failure testing.
+
+Emulates the endpoints app.services.judge0_client uses:
+- POST /submissions, GET /submissions/{token}
+- POST /submissions/batch, GET /submissions/batch?tokens=...
+- GET /about, GET /workers (node health probes)
+- callback_url (PUT of the finished submission, base64 encoded like Judge0)
+
+Executions go through a fixed number of emulated Judge0 workers, so a
+burst queues up exactly like it would on a real instance.
+
+Run it and point the app at it:
+
+    python scripts/judge0_standin.py --port 2358 --workers 4 \\
+        --latency lognormal:0.02,0.5 --exec-time uniform:0.05,0.3 \\
+        --error-rate 0.01 --timeout-rate 0.005 --mode echo
+    JUDGE0_BASE_URL=http://127.0.0.1:2358
+
+or under uvicorn directly (configured through STANDIN_* env vars):
+
+    STANDIN_MODE=run uvicorn scripts.judge0_standin:app --port 2358
+
+Modes:
+- echo: stdout = stdin, status Accepted (no code runs; pure plumbing test)
+- run:  really runs the program with `python -I` in a subprocess
+        (NOT a sandbox: only for trusted code in CI/benchmarks)
+
+Distributions (seconds): "fixed:X", "uniform:A,B", "exp:MEAN",
+"lognormal:MEDIAN,SIGMA".
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from fastapi import Body, FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+STATUS_IN_QUEUE = {"id": 1, "description": "In Queue"}
+STATUS_PROCESSING = {"id": 2, "description": "Processing"}
+STATUS_ACCEPTED = {"id": 3, "description": "Accepted"}
+STATUS_TLE = {"id": 5, "description": "Time Limit Exceeded"}
+STATUS_NZEC = {"id": 11, "description": "Runtime Error (NZEC)"}
+
+
+# -------------------------
+# Configuration
+# -------------------------
+def parse_distribution(spec: str) -> Callable[[], float]:
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    kind = kind.strip().lower()
+
+    if kind == "fixed":
+        value = values[0] if values else 0.0
+        return lambda: value
+    if kind == "uniform":
+        low, high = values
+        return lambda: random.uniform(low, high)
+    if kind == "exp":
+        mean = values[0]
+        return lambda: random.expovariate(1.0 / mean) if mean > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown distribution: {spec!r}")
+
+
+@dataclass
+class StandinConfig:
+    workers: int = 4
+    latency: str = "fixed:0"
+    exec_time: str = "fixed:0.05"
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 30.0
+    mode: str = "echo"
+    cpu_time_limit: float = 5.0
+    batch_max_size: int = 20
+    retention_seconds: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> "StandinConfig":
+        """
+        Every field can be set as STANDIN_<FIELD>, e.g. STANDIN_ERROR_RATE=0.02.
+        """
+        config = cls()
+        for name, current in vars(config).items():
+            raw = os.getenv(f"STANDIN_{name.upper()}")
+            if raw is not None:
+                setattr(config, name, type(current)(raw))
+        return config
+
+
+@dataclass
+class Execution:
+    token: str
+    source_code: str
+    stdin: str
+    callback_url: Optional[str]
+    wall_time_limit: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+    status: dict = field(default_factory=lambda: dict(STATUS_IN_QUEUE))
+    stdout: Optional[str] = None
+    stderr: Optional[str] = None
+    time: Optional[str] = None
+    memory: Optional[int] = None
+    finished_at: Optional[float] = None
+
+
+class Standin:
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        self.latency = parse_distribution(config.latency)
+        self.exec_time = parse_distribution(config.exec_time)
+        self.executions: Dict[str, Execution] = {}
+        self.queued = 0
+        self.working = 0
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "timeouts": 0, "executions": 0}
+        self._workers: Optional[asyncio.Semaphore] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def workers(self) -> asyncio.Semaphore:
+        if self._workers is None:
+            self._workers = asyncio.Semaphore(max(1, self.config.workers))
+        return self._workers
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+
+    # ---- fault injection ----
+    async def inject(self) -> Optional[JSONResponse]:
+        self.stats["requests"] += 1
+        await asyncio.sleep(max(0.0, self.latency()))
+
+        roll = random.random()
+        if roll < self.config.timeout_rate:
+            self.stats["timeouts"] += 1
+            await asyncio.sleep(self.config.timeout_seconds)
+            return JSONResponse({"error": "injected timeout"}, status_code=504)
+        roll -= self.config.timeout_rate
+        if roll < self.config.throttle_rate:
+            self.stats["throttled"] += 1
+            return JSONResponse({"error": "injected throttle"}, status_code=429, headers={"Retry-After": "1"})
+        roll -= self.config.throttle_rate
+        if roll < self.config.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"error": "injected server error"}, status_code=503)
+        return None
+
+    # ---- execution ----
+    def create(self, item: dict, encoded: bool) -> Execution:
+        decode = _b64decode if encoded else (lambda v: v or "")
+        execution = Execution(
+            token=str(uuid.uuid4()),
+            source_code=decode(item.get("source_code")),
+            stdin=decode(item.get("stdin")),
+            callback_url=item.get("callback_url"),
+            wall_time_limit=item.get("wall_time_limit"),
+        )
+        self.executions[execution.token] = execution
+        self.queued += 1
+        asyncio.get_running_loop().create_task(self._process(execution))
+        return execution
+
+    async def _process(self, execution: Execution) -> None:
+        async with self.workers:
+            self.queued -= 1
+            self.working += 1
+            execution.status = dict(STATUS_PROCESSING)
+            try:
+                if self.config.mode == "run":
+                    await self._run(execution)
+                else:
+                    elapsed = max(0.0, self.exec_time())
+                    await asyncio.sleep(elapsed)
+                    execution.stdout = execution.stdin
+                    execution.stderr = None
+                    execution.time = f"{elapsed:.3f}"
+                    execution.memory = 3000
+                    execution.status = dict(STATUS_ACCEPTED)
+            finally:
+                self.working -= 1
+                execution.finished_at = time.time()
+                self.stats["executions"] += 1
+
+        if execution.callback_url:
+            await self._callback(execution)
+        self._expire()
+
+    async def _run(self, execution: Execution) -> None:
+        started = time.monotonic()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-I",
+            "-c",
+            execution.source_code,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            out, err = await asyncio.wait_for(
+                proc.communicate(execution.stdin.encode("utf-8")),
+                timeout=execution.wall_time_limit or self.config.cpu_time_limit,
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            execution.stdout, execution.stderr = "", ""
+            execution.status = dict(STATUS_TLE)
+        else:
+            execution.stdout = out.decode("utf-8", errors="replace")
+            execution.stderr = err.decode("utf-8", errors="replace") or None
+            execution.status = dict(STATUS_ACCEPTED if proc.returncode == 0 else STATUS_NZEC)
+        execution.time = f"{time.monotonic() - started:.3f}"
+        execution.memory = 0
+
+    async def _callback(self, execution: Execution) -> None:
+        try:
+            await self.http.put(execution.callback_url, json=render(execution, encoded=True))
+        except httpx.HTTPError as e:
+            print(f"callback to {execution.callback_url} failed: {e}", file=sys.stderr)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.config.retention_seconds
+        stale = [t for t, e in self.executions.items() if e.finished_at and e.finished_at < cutoff]
+        for token in stale:
+            del self.executions[token]
+
+
+def _b64encode(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def _b64decode(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return base64.b64decode(value).decode("utf-8", errors="replace")
+
+
+def render(execution: Execution, encoded: bool, fields: Optional[List[str]] = None) -> dict:
+    encode = _b64encode if encoded else (lambda v: v)
+    full = {
+        "token": execution.token,
+        "source_code": encode(execution.source_code),
+        "stdin": encode(execution.stdin),
+        "stdout": encode(execution.stdout),
+        "stderr": encode(execution.stderr),
+        "compile_output": None,
+        "message": None,
+        "status": execution.status,
+        "status_id": execution.status["id"],
+        "time": execution.time,
+        "memory": execution.memory,
+        "language_id": 71,
+    }
+    if fields:
+        return {k: v for k, v in full.items() if k in fields}
+    return full
+
+
+def _fields(raw: Optional[str]) -> Optional[List[str]]:
+    if not raw or raw == "*":
+        return None
+    return [f.strip() for f in raw.split(",") if f.strip()]
+
+
+def _encoded(value: Optional[str]) -> bool:
+    return (value or "false").lower() == "true"
+
+
+# -------------------------
+# ASGI app
+# -------------------------
+def create_app(config: Optional[StandinConfig] = None) -> FastAPI:
+    standin = Standin(config or StandinConfig.from_env())
+    api = FastAPI(title="Judge0 stand-in")
+    api.state.standin = standin
+
+    @api.on_event("shutdown")
+    async def _shutdown():
+        await standin.close()
+
+    @api.get("/about")
+    async def about():
+        return {"version": "standin", "homepage": "", "source_code": "", "maintainer": ""}
+
+    @api.get("/workers")
+    async def workers():
+        return [
+            {
+                "queue": "default",
+                "size": standin.queued,
+                "available": standin.config.workers,
+                "idle": standin.config.workers - standin.working,
+                "working": standin.working,
+                "paused": 0,
+                "failed": 0,
+            }
+        ]
+
+    @api.get("/standin/stats")
+    async def stats():
+        return {**standin.stats, "queued": standin.queued, "working": standin.working}
+
+    @api.post("/submissions", status_code=201)
+    async def create_submission(
+        payload: dict = Body(...),
+        base64_encoded: Optional[str] = Query(default="false"),
+        wait: Optional[str] = Query(default="false"),
+        fields: Optional[str] = Query(default=None),
+    ):
+        injected = await standin.inject()
+        if injected is not None:
+            return injected
+
+        execution = standin.create(payload, _encoded(base64_encoded))
+        if _encoded(wait):
+            while execution.finished_at is None:
+                await asyncio.sleep(0.01)
+            return render(execution, _encoded(base64_encoded), _fields(fields))
+        return {"token": execution.token}
+
+    @api.post("/submissions/batch", status_code=201)
+    async def create_batch(
+        payload: dict = Body(...),
+        base64_encoded: Optional[str] = Query(default="false"),
+    ):
+        injected = await standin.inject()
+        if injected is not None:
+            return injected
+
+        items = payload.get("submissions") or []
+        if len(items) > standin.config.batch_max_size:
+            raise HTTPException(
+                status_code=422,
+                detail=f"number of submissions in a batch should be less than or equal to {standin.config.batch_max_size}",
+            )
+        encoded = _encoded(base64_encoded)
+        return [{"token": standin.create(item, encoded).token} for item in items]
+
+    @api.get("/submissions/batch")
+    async def get_batch(
+        tokens: str = Query(...),
+        base64_encoded: Optional[str] = Query(default="false"),
+        fields: Optional[str] = Query(default=None),
+    ):
+        injected = await standin.inject()
+        if injected is not None:
+            return injected
+
+        encoded, wanted = _encoded(base64_encoded), _fields(fields)
+        submissions = []
+        for token in tokens.split(","):
+            execution = standin.executions.get(token.strip())
+            submissions.append(render(execution, encoded, wanted) if execution else None)
+        return {"submissions": submissions}
+
+    @api.get("/submissions/{token}")
+    async def get_submission(
+        token: str,
+        base64_encoded: Optional[str] = Query(default="false"),
+        fields: Optional[str] = Query(default=None),
+    ):
+        injected = await standin.inject()
+        if injected is not None:
+            return injected
+
+        execution = standin.executions.get(token)
+        if execution is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return render(execution, _encoded(base64_encoded), _fields(fields))
+
+    return api
+
+
+app = create_app()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2358)
+    parser.add_argument("--workers", type=int, help="emulated Judge0 workers (concurrent executions)")
+    parser.add_argument("--latency", help="added per-request latency distribution")
+    parser.add_argument("--exec-time", help="execution time distribution (echo mode)")
+    parser.add_argument("--error-rate", type=float, help="fraction of requests answered 503")
+    parser.add_argument("--throttle-rate", type=float, help="fraction of requests answered 429")
+    parser.add_argument("--timeout-rate", type=float, help="fraction of requests that hang")
+    parser.add_argument("--timeout-seconds", type=float, help="how long an injected timeout hangs")
+    parser.add_argument("--mode", choices=["echo", "run"])
+    parser.add_argument("--cpu-time-limit", type=float, help="run mode: kill programs after this long (unless the submission sets wall_time_limit)")
+    args = parser.parse_args()
+
+    for name in (
+        "workers",
+        "latency",
+        "exec_time",
+        "error_rate",
+        "throttle_rate",
+        "timeout_rate",
+        "timeout_seconds",
+        "mode",
+        "cpu_time_limit",
+    ):
+        value = getattr(args, name)
+        if value is not None:
+            os.environ[f"STANDIN_{name.upper()}"] = str(value)
+
+    import uvicorn
+
+    uvicorn.run(create_app(StandinConfig.from_env()), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,7 @@ from sqlalchemy import select
 from passlib.context import CryptContext
 from app.db import SessionLocal
 from app.models.models import User, Assignment, IOTestCase, UnitTestSpec, StaticRule
+from app.services.grading_bundle import bump_grading_version
 
 
 # -----------------------------
@@ -277,6 +278,9 @@ def main():
         # Static Rules (1)
         get_or_create_static_rules(db, assignment_id=assignment.id)
 
+        # Re-seeding may have changed tests/rules of an existing assignment
+        bump_grading_version(assignment)
+
         db.commit()
 
         print("✅ Seed completed successfully.")